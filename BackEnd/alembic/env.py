@@ -33,6 +33,8 @@ users_mod = load_module_directly('users', os.path.join(models_path, 'users.py'))
 doctor_mod = load_module_directly('doctor', os.path.join(models_path, 'doctor.py'))
 appointment_mod = load_module_directly('appointment', os.path.join(models_path, 'appointment.py'))
 notification_mod = load_module_directly('notification', os.path.join(models_path, 'notification.py'))
+rate_limit_mod = load_module_directly('rate_limit', os.path.join(models_path, 'rate_limit.py'))
+slot_cache_mod = load_module_directly('slot_cache', os.path.join(models_path, 'slot_cache.py'))
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,48 @@
+"""Rate limit buckets
+
+Table of middleware/rate_limit_store.PostgresRateLimitStore, which used to
+create it on first use. UNLOGGED on Postgres; IF NOT EXISTS keeps the
+upgrade working where the store already created it.
+
+Revision ID: a1c7e5d92b40
+Revises: f2a9d6c31b85
+Create Date: 2026-10-17 14:06:51.204318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c7e5d92b40'
+down_revision: Union[str, Sequence[str], None] = 'f2a9d6c31b85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets ("
+            " key text NOT NULL,"
+            " tat double precision NOT NULL,"
+            " tolerance double precision NOT NULL,"
+            " CONSTRAINT rate_limit_buckets_pkey PRIMARY KEY (key))"
+        )
+    else:
+        op.create_table(
+            'rate_limit_buckets',
+            sa.Column('key', sa.Text(), nullable=False),
+            sa.Column('tat', sa.Double(), nullable=False),
+            sa.Column('tolerance', sa.Double(), nullable=False),
+            sa.PrimaryKeyConstraint('key'),
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_limit_buckets')
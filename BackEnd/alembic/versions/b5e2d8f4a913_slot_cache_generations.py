@@ -0,0 +1,37 @@
+"""Slot cache generations
+
+Per-doctor invalidation counter read by core/slot_cache.py on every lookup,
+so a booking or schedule change on one worker retires every worker's cached
+slots for that doctor.
+
+Revision ID: b5e2d8f4a913
+Revises: a1c7e5d92b40
+Create Date: 2026-10-17 16:12:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e2d8f4a913'
+down_revision: Union[str, Sequence[str], None] = 'a1c7e5d92b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'slot_cache_generations',
+        sa.Column('doctor_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('generation', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('doctor_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('slot_cache_generations')
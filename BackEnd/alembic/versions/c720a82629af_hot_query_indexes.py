@@ -0,0 +1,48 @@
+"""Hot query indexes
+
+Composite indexes in the keyset order of the appointment, notification and
+admin user listings, plus partial indexes for active bookings, unread
+notifications and doctors awaiting approval. Check the plans with
+benchmarks/check_query_plans.py.
+
+Revision ID: c720a82629af
+Revises: b049aac0039f
+Create Date: 2026-10-17 02:14:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c720a82629af'
+down_revision: Union[str, Sequence[str], None] = 'b049aac0039f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists: create_all may already have built them from the models
+    op.create_index('ix_appointments_doctor_id_appointment_date', 'appointments', ['doctor_id', 'appointment_date', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_appointments_patient_id_appointment_date', 'appointments', ['patient_id', 'appointment_date', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_appointments_doctor_id_active', 'appointments', ['doctor_id', 'appointment_date'], unique=False, if_not_exists=True, postgresql_where=sa.text("status IN ('PENDING', 'CONFIRMED')"), sqlite_where=sa.text("status IN ('PENDING', 'CONFIRMED')"))
+    op.create_index('ix_notifications_target_user_id_created_at', 'notifications', ['target_user_id', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_notifications_target_user_id_unread', 'notifications', ['target_user_id', 'created_at'], unique=False, if_not_exists=True, postgresql_where=sa.text('is_read = false'), sqlite_where=sa.text('is_read = 0'))
+    op.create_index('ix_doctor_availabilities_doctor_id_date', 'doctor_availabilities', ['doctor_id', 'date'], unique=False, if_not_exists=True)
+    op.create_index('ix_doctors_unverified', 'doctors', ['doctor_id'], unique=False, if_not_exists=True, postgresql_where=sa.text('is_verified = false'), sqlite_where=sa.text('is_verified = 0'))
+    op.create_index('ix_users_created_at', 'users', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_index('ix_doctors_unverified', table_name='doctors')
+    op.drop_index('ix_doctor_availabilities_doctor_id_date', table_name='doctor_availabilities')
+    op.drop_index('ix_notifications_target_user_id_unread', table_name='notifications')
+    op.drop_index('ix_notifications_target_user_id_created_at', table_name='notifications')
+    op.drop_index('ix_appointments_doctor_id_active', table_name='appointments')
+    op.drop_index('ix_appointments_patient_id_appointment_date', table_name='appointments')
+    op.drop_index('ix_appointments_doctor_id_appointment_date', table_name='appointments')
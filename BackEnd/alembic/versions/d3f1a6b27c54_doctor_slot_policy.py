@@ -0,0 +1,34 @@
+"""Doctor slot policy
+
+Per-doctor appointment slot length and buffer time, read by the slot
+engine in utils/slots.py. Existing doctors keep 30-minute slots with no
+buffer.
+
+Revision ID: d3f1a6b27c54
+Revises: c720a82629af
+Create Date: 2026-10-17 03:05:41.274019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f1a6b27c54'
+down_revision: Union[str, Sequence[str], None] = 'c720a82629af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('doctors', sa.Column('slot_minutes', sa.Integer(), server_default='30', nullable=False))
+    op.add_column('doctors', sa.Column('buffer_minutes', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('doctors', 'buffer_minutes')
+    op.drop_column('doctors', 'slot_minutes')
@@ -0,0 +1,45 @@
+"""Materialized doctor slots
+
+doctor_slots holds each doctor's free slots from today up to
+doctors.slot_horizon (core/slot_horizon.py). Existing doctors start with no
+horizon; the background extension fills their slots after the upgrade.
+
+Revision ID: e8b4c19d0a7f
+Revises: d3f1a6b27c54
+Create Date: 2026-10-17 09:12:37.508114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4c19d0a7f'
+down_revision: Union[str, Sequence[str], None] = 'd3f1a6b27c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'doctor_slots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.doctor_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('doctor_id', 'start_time', name='uq_doctor_slots_doctor_id_start_time')
+    )
+    op.create_index('ix_doctor_slots_start_time', 'doctor_slots', ['start_time'], unique=False)
+    op.add_column('doctors', sa.Column('slot_horizon', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('doctors', 'slot_horizon')
+    op.drop_index('ix_doctor_slots_start_time', table_name='doctor_slots')
+    op.drop_table('doctor_slots')
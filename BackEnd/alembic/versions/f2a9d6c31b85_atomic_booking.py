@@ -0,0 +1,80 @@
+"""Atomic booking
+
+One active booking per doctor and start time: the partial index on active
+appointments becomes unique. Duplicates already present are resolved
+first by cancelling every active booking of a slot but the oldest; the
+cancelled ids are logged as a warning so the patients can be contacted. Adds
+slot_holds for short-lived reservations during checkout (core/booking.py).
+
+Revision ID: f2a9d6c31b85
+Revises: e8b4c19d0a7f
+Create Date: 2026-10-17 11:48:02.731940
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9d6c31b85'
+down_revision: Union[str, Sequence[str], None] = 'e8b4c19d0a7f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('PENDING', 'CONFIRMED')"
+
+# Active bookings of a slot that an older active booking already holds
+DUPLICATES = (
+    f"{ACTIVE} AND EXISTS ("
+    "SELECT 1 FROM appointments AS earlier "
+    "WHERE earlier.doctor_id = appointments.doctor_id "
+    "AND earlier.appointment_date = appointments.appointment_date "
+    "AND earlier.status IN ('PENDING', 'CONFIRMED') "
+    "AND earlier.id < appointments.id)"
+)
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    duplicates = [] if context.is_offline_mode() else op.get_bind().execute(sa.text(
+        f"SELECT id, doctor_id, appointment_date FROM appointments WHERE {DUPLICATES} ORDER BY id"
+    )).all()
+    for appointment_id, doctor_id, appointment_date in duplicates:
+        logger.warning(
+            "Cancelling appointment %s: doctor %s is already booked at %s",
+            appointment_id, doctor_id, appointment_date
+        )
+    op.execute(f"UPDATE appointments SET status = 'CANCELLED' WHERE {DUPLICATES}")
+    op.drop_index('ix_appointments_doctor_id_active', table_name='appointments',
+                  postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE))
+    op.create_index('uq_appointments_doctor_id_active_slot', 'appointments', ['doctor_id', 'appointment_date'],
+                    unique=True, postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE))
+    op.create_table(
+        'slot_holds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['patient_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('doctor_id', 'start_time', name='uq_slot_holds_doctor_id_start_time')
+    )
+    op.create_index('ix_slot_holds_expires_at', 'slot_holds', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_slot_holds_expires_at', table_name='slot_holds')
+    op.drop_table('slot_holds')
+    op.drop_index('uq_appointments_doctor_id_active_slot', table_name='appointments',
+                  postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE))
+    op.create_index('ix_appointments_doctor_id_active', 'appointments', ['doctor_id', 'appointment_date'],
+                    unique=False, postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE))
@@ -0,0 +1,169 @@
+"""
+Appointment upcoming/history listings: ORM loading vs a joined column projection.
+
+Seeds one doctor with --appointments appointments (half past, half upcoming)
+spread over --patients patients, then builds the doctor's history and upcoming
+listings three ways and reports statements executed and latency:
+
+  lazy        select(Appointment), names read through lazy-loaded relationships
+  selectin    select(Appointment) with selectinload() on patient and doctor
+  projection  appointment_listing_query(): one joined statement, rows built
+              into AppointmentListItem (what the endpoints run now)
+
+Lazy loads only hit the database once per distinct user thanks to the
+identity map, so its count grows with --patients rather than with rows.
+
+Runs against DATABASE_URL with the schema migrated (alembic upgrade head),
+so point it at a scratch database. The seeded users
+(bench-listing-*@example.invalid) and their appointments are deleted
+afterwards.
+
+Run from BackEnd/:
+    python -m benchmarks.bench_appointment_listing [--appointments 10000] [--patients 500] [--rounds 5]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import selectinload
+
+import models  # noqa: F401 - registers every mapper
+from core.database import SessionLocal
+from core.principal_cache import Principal
+from models.appointment import Appointment, AppointmentStatus
+from models.users import User, UserRole
+from routers.v1.appointments import appointment_listing_query, scope_to_user, to_list_item
+from utils.query_budget import QueryCounter
+
+EMAIL_PREFIX = "bench-listing-"
+
+
+def seed(appointments: int, patients: int) -> int:
+    with SessionLocal() as db:
+        doctor = User(
+            email=f"{EMAIL_PREFIX}doctor@example.invalid",
+            fname="Bench", lname="Doctor", role=UserRole.DOCTOR,
+        )
+        db.add(doctor)
+        db.flush()
+        db.execute(insert(User), [
+            {
+                "email": f"{EMAIL_PREFIX}patient-{n}@example.invalid",
+                "fname": "Patient", "lname": str(n), "role": UserRole.PATIENT,
+            }
+            for n in range(patients)
+        ])
+        patient_ids = db.scalars(
+            select(User.id).where(User.email.like(f"{EMAIL_PREFIX}patient-%"))
+        ).all()
+
+        now = datetime.utcnow()
+        db.execute(insert(Appointment), [
+            {
+                "patient_id": patient_ids[n % len(patient_ids)],
+                "doctor_id": doctor.id,
+                # Alternate past and upcoming, an hour apart
+                "appointment_date": now + timedelta(hours=(n // 2 + 1) * (1 if n % 2 else -1)),
+                "reason": "Check-up",
+                "status": AppointmentStatus.CONFIRMED,
+            }
+            for n in range(appointments)
+        ])
+        db.commit()
+        return doctor.id
+
+
+def cleanup():
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%"))
+        db.execute(delete(Appointment).where(Appointment.doctor_id.in_(user_ids)))
+        db.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        db.commit()
+
+
+def listing_filters(query, upcoming: bool):
+    if upcoming:
+        return query.where(
+            Appointment.appointment_date > datetime.utcnow(),
+            Appointment.status.in_(["confirmed", "pending"])
+        ).order_by(Appointment.appointment_date)
+    return query.where(
+        Appointment.appointment_date < datetime.utcnow()
+    ).order_by(Appointment.appointment_date.desc())
+
+
+def orm_listing(db, principal, upcoming: bool, eager: bool):
+    query = select(Appointment)
+    if eager:
+        query = query.options(selectinload(Appointment.patient), selectinload(Appointment.doctor))
+    query = listing_filters(scope_to_user(query, principal), upcoming)
+    return [
+        {
+            "id": appointment.id,
+            "patient_name": f"{appointment.patient.fname} {appointment.patient.lname}",
+            "doctor_name": f"{appointment.doctor.fname} {appointment.doctor.lname}",
+            "appointment_date": appointment.appointment_date,
+            "reason": appointment.reason,
+            "status": appointment.status.value,
+            "notes": appointment.notes
+        }
+        for appointment in db.scalars(query).all()
+    ]
+
+
+def projection_listing(db, principal, upcoming: bool):
+    query = listing_filters(scope_to_user(appointment_listing_query(), principal), upcoming)
+    return [to_list_item(row) for row in db.execute(query)]
+
+
+VARIANTS = {
+    "lazy": lambda db, principal, upcoming: orm_listing(db, principal, upcoming, eager=False),
+    "selectin": lambda db, principal, upcoming: orm_listing(db, principal, upcoming, eager=True),
+    "projection": projection_listing,
+}
+
+
+def measure(variant, principal, upcoming: bool, rounds: int) -> dict:
+    timings = []
+    for _ in range(rounds):
+        # A fresh session per round, as each request gets one
+        with SessionLocal() as db, QueryCounter() as counter:
+            started = time.perf_counter()
+            rows = variant(db, principal, upcoming)
+            timings.append(time.perf_counter() - started)
+    return {
+        "rows": len(rows),
+        "queries": counter.count,
+        "mean": statistics.fmean(timings) * 1000,
+        "best": min(timings) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--appointments", type=int, default=10000)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    cleanup()
+    doctor_id = seed(args.appointments, args.patients)
+    principal = Principal(id=doctor_id, role=UserRole.DOCTOR, is_active=True, is_profile_complete=True)
+    try:
+        print(f"{args.appointments} appointments for one doctor, {args.patients} patients, {args.rounds} rounds")
+        print(f"{'listing':<9} {'variant':<11} {'rows':>6} {'queries':>8} {'mean':>10} {'best':>10}")
+        for listing, upcoming in (("history", False), ("upcoming", True)):
+            for name, variant in VARIANTS.items():
+                result = measure(variant, principal, upcoming, args.rounds)
+                print(
+                    f"{listing:<9} {name:<11} {result['rows']:>6} {result['queries']:>8} "
+                    f"{result['mean']:>8.1f}ms {result['best']:>8.1f}ms"
+                )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Concurrent booking: --bookers patients racing for --slots slots of one doctor.
+
+Every booker picks one of the slots at random and all of them start at once
+(asyncio.gather), each through its own session and the handlers themselves
+(no HTTP, no middleware), the way concurrent requests would:
+
+  book      POST /appointments/ - core/booking.book(): validate the slot,
+            insert, and let the unique index on active (doctor_id,
+            appointment_date) refuse the losers with 409
+  hold      POST /appointments/holds then /holds/{id}/confirm - the slot is
+            claimed with one upsert and booked on confirm
+  locked    the naive alternative for comparison: lock the doctor row
+            (FOR UPDATE, a no-op on SQLite), check for an active booking,
+            then insert. No slot validation, no doctor_slots upkeep
+
+Reports throughput and the outcome counts of each variant, then checks that
+no slot ended up with more than one active booking and that exactly one
+booker won each contested slot.
+
+Runs against DATABASE_URL with the schema migrated (alembic upgrade head),
+so point it at a scratch database. The seeded users
+(bench-booking-*@example.invalid) and their rows are deleted afterwards.
+
+Run from BackEnd/:
+    python -m benchmarks.bench_booking [--bookers 500] [--slots 10]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import datetime, time as clock, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+
+import models  # noqa: F401 - registers every mapper
+from core.database import SessionLocal, async_engine, new_async_session
+from core.principal_cache import Principal
+from core.slot_horizon import ACTIVE_STATUSES, materialize
+from models.appointment import Appointment, AppointmentStatus, SlotHold
+from models.doctor import Doctor, DoctorAvailability, DoctorSlot
+from models.users import User, UserRole
+from routers.v1 import appointments
+
+EMAIL_PREFIX = "bench-booking-"
+SLOT_MINUTES = 30
+
+
+def seed(bookers: int, slots: int):
+    """Returns (doctor_id, doctor user id, patient user ids, slot starts)"""
+    day = datetime.utcnow().date() + timedelta(days=1)
+    first = datetime.combine(day, clock(8))
+    starts = [first + timedelta(minutes=SLOT_MINUTES * k) for k in range(slots)]
+    with SessionLocal() as db:
+        doctor_user = User(email=f"{EMAIL_PREFIX}doctor@example.invalid", fname="Doctor", lname="Popular",
+                           role=UserRole.DOCTOR)
+        db.add(doctor_user)
+        db.flush()
+        doctor = Doctor(user_id=doctor_user.id, is_verified=True, slot_minutes=SLOT_MINUTES, slot_horizon=day)
+        db.add(doctor)
+        db.flush()
+        db.add(DoctorAvailability(
+            doctor_id=doctor.doctor_id,
+            date=datetime.combine(day, clock()),
+            start_time=clock(8),
+            end_time=(first + timedelta(minutes=SLOT_MINUTES * slots)).time()
+        ))
+        db.execute(insert(User), [
+            {
+                "email": f"{EMAIL_PREFIX}patient-{n}@example.invalid",
+                "fname": "Patient", "lname": str(n), "role": UserRole.PATIENT,
+            }
+            for n in range(bookers)
+        ])
+        patient_ids = db.scalars(
+            select(User.id).where(User.email.like(f"{EMAIL_PREFIX}patient-%"))
+        ).all()
+        db.commit()
+        return doctor.doctor_id, doctor_user.id, patient_ids, starts
+
+
+def cleanup():
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%"))
+        doctor_ids = select(Doctor.doctor_id).where(Doctor.user_id.in_(user_ids))
+        db.execute(delete(SlotHold).where(SlotHold.doctor_id.in_(user_ids)))
+        db.execute(delete(Appointment).where(Appointment.doctor_id.in_(user_ids)))
+        db.execute(delete(DoctorSlot).where(DoctorSlot.doctor_id.in_(doctor_ids)))
+        db.execute(delete(DoctorAvailability).where(DoctorAvailability.doctor_id.in_(doctor_ids)))
+        db.execute(delete(Doctor).where(Doctor.user_id.in_(user_ids)))
+        db.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        db.commit()
+
+
+async def reset(doctor_id: int, doctor_user_id: int, starts: list):
+    """Drop the previous variant's bookings and holds and rebuild the stored slots"""
+    db = new_async_session()
+    try:
+        await db.execute(delete(SlotHold).where(SlotHold.doctor_id == doctor_user_id))
+        await db.execute(delete(Appointment).where(Appointment.doctor_id == doctor_user_id))
+        await materialize(db, [doctor_id], starts[0].date(), starts[0].date())
+        await db.commit()
+    finally:
+        await db.close()
+    await appointments.slot_cache.invalidate_doctor(doctor_id)
+
+
+async def handler(call, *args):
+    """Run one handler in its own session; returns "ok" or the HTTP status"""
+    db = new_async_session()
+    try:
+        result = await call(*args, db)
+        return "ok", result
+    except HTTPException as e:
+        await db.rollback()
+        return str(e.status_code), None
+    except Exception as e:
+        await db.rollback()
+        return type(e).__name__, None
+    finally:
+        await db.close()
+
+
+async def book(doctor_user_id: int, patient: Principal, start: datetime) -> str:
+    outcome, _ = await handler(appointments.create_appointment, doctor_user_id, start, None, patient)
+    return outcome
+
+
+async def hold_and_confirm(doctor_user_id: int, patient: Principal, start: datetime) -> str:
+    outcome, hold = await handler(appointments.hold_slot, doctor_user_id, start, patient)
+    if outcome != "ok":
+        return outcome
+    outcome, _ = await handler(appointments.confirm_slot_hold, hold.id, None, patient)
+    return outcome
+
+
+async def locked(doctor_user_id: int, patient: Principal, start: datetime) -> str:
+    async def check_then_insert(db):
+        await db.execute(select(Doctor.doctor_id).where(Doctor.user_id == doctor_user_id).with_for_update())
+        taken = await db.scalar(select(Appointment.id).where(
+            Appointment.doctor_id == doctor_user_id,
+            Appointment.appointment_date == start,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ))
+        if taken is not None:
+            raise HTTPException(status_code=409, detail="Slot already booked")
+        db.add(Appointment(patient_id=patient.id, doctor_id=doctor_user_id, appointment_date=start,
+                           status=AppointmentStatus.PENDING))
+        await db.commit()
+
+    outcome, _ = await handler(check_then_insert)
+    return outcome
+
+
+async def double_bookings(doctor_user_id: int) -> int:
+    db = new_async_session()
+    try:
+        return len((await db.execute(select(Appointment.appointment_date).where(
+            Appointment.doctor_id == doctor_user_id,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ).group_by(Appointment.appointment_date).having(func.count() > 1))).all())
+    finally:
+        await db.close()
+
+
+async def run(args):
+    doctor_id, doctor_user_id, patient_ids, starts = seed(args.bookers, args.slots)
+    patients = [
+        Principal(id=patient_id, role=UserRole.PATIENT, is_active=True, is_profile_complete=True)
+        for patient_id in patient_ids
+    ]
+    # Every slot gets at least one booker, the rest pick at random
+    rng = random.Random(3)
+    choices = [starts[n] if n < len(starts) else rng.choice(starts) for n in range(len(patients))]
+    contested = len(set(choices))
+
+    print(f"{len(patients)} bookers for {len(starts)} slots")
+    print(f"{'variant':<8} {'seconds':>8} {'per sec':>8} {'booked':>7} {'409':>5} {'other':>6} {'double':>7}")
+    failed = False
+    for name, attempt in {"book": book, "hold": hold_and_confirm, "locked": locked}.items():
+        await reset(doctor_id, doctor_user_id, starts)
+        started = time.perf_counter()
+        outcomes = Counter(await asyncio.gather(*[
+            attempt(doctor_user_id, patient, start) for patient, start in zip(patients, choices)
+        ]))
+        elapsed = time.perf_counter() - started
+        doubles = await double_bookings(doctor_user_id)
+        others = sum(count for outcome, count in outcomes.items() if outcome not in ("ok", "409"))
+        print(
+            f"{name:<8} {elapsed:>8.2f} {len(patients) / elapsed:>8.0f} {outcomes['ok']:>7} "
+            f"{outcomes['409']:>5} {others:>6} {doubles:>7}"
+        )
+        if others:
+            print(f"         other outcomes: {dict(outcomes)}")
+        if doubles or outcomes["ok"] > contested or (not others and outcomes["ok"] != contested):
+            failed = True
+    if async_engine is not None:
+        await async_engine.dispose()
+    assert not failed, "double booking or a slot left unbooked"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookers", type=int, default=500)
+    parser.add_argument("--slots", type=int, default=10)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
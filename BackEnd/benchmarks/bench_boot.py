@@ -0,0 +1,105 @@
+"""
+Worker boot time: what a fresh (or recycled) worker pays before serving.
+
+Each run imports main in a new interpreter under -X importtime, as a gunicorn
+worker without --preload does after every --max-requests recycle:
+
+  fast-boot   FAST_BOOT=true, heavy dependencies deferred to first use
+  eager       FAST_BOOT=false, create_app() loads them up front
+
+Also times Base.metadata.create_all() against the existing schema, the
+catalog round trips every worker used to make on boot, and prints the
+import-time breakdown by top-level package for the fast-boot mode.
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_boot [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+IMPORT_MAIN = "import main"
+CREATE_ALL = (
+    "import time, main; from core.database import Base, engine; "
+    "started = time.perf_counter(); Base.metadata.create_all(bind=engine); "
+    "print(f'create_all {time.perf_counter() - started}')"
+)
+
+
+def run(code: str, fast_boot: bool):
+    env = dict(os.environ, FAST_BOOT="true" if fast_boot else "false", PYTHONWARNINGS="ignore")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return result.stdout, result.stderr
+
+
+def parse_importtime(stderr: str):
+    """(total microseconds importing main, self microseconds per top-level package)"""
+    total, packages = 0, defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        module = name.strip()
+        packages[module.split(".")[0]] += self_us
+        if module == "main":
+            total = cumulative_us
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = {}
+    for name, fast_boot in (("fast-boot", True), ("eager", False)):
+        run(IMPORT_MAIN, fast_boot)  # warm the bytecode cache
+        totals, breakdown = [], defaultdict(list)
+        for _ in range(args.runs):
+            total, packages = parse_importtime(run(IMPORT_MAIN, fast_boot)[1])
+            totals.append(total / 1000)
+            for package, self_us in packages.items():
+                breakdown[package].append(self_us / 1000)
+        results[name] = (totals, breakdown)
+
+    create_all = []
+    for _ in range(args.runs):
+        stdout, _ = run(CREATE_ALL, True)
+        create_all.append(float(stdout.split("create_all ")[-1]) * 1000)
+
+    print(f"import main, {args.runs} runs (ms)")
+    print(f"{'mode':<10} {'mean':>8} {'min':>8}")
+    for name, (totals, _) in results.items():
+        print(f"{name:<10} {statistics.fmean(totals):>8.1f} {min(totals):>8.1f}")
+    print(f"create_all on an existing schema (no longer run at boot): {statistics.fmean(create_all):.1f} ms mean")
+
+    breakdown = results["fast-boot"][1]
+    eager_breakdown = results["eager"][1]
+    deferred = sum(
+        statistics.fmean(samples) for package, samples in eager_breakdown.items() if package not in breakdown
+    )
+    print(f"packages only imported in eager mode: {deferred:.1f} ms")
+    print(f"\nfast-boot import time by top-level package (ms, self time, mean of {args.runs})")
+    print(f"{'package':<24} {'fast-boot':>10} {'eager':>10}")
+    ranked = sorted(
+        set(breakdown) | set(eager_breakdown),
+        key=lambda package: -statistics.fmean(eager_breakdown.get(package) or [0]),
+    )
+    for package in ranked[:args.top]:
+        fast = statistics.fmean(breakdown[package]) if package in breakdown else 0.0
+        eager = statistics.fmean(eager_breakdown[package]) if package in eager_breakdown else 0.0
+        print(f"{package:<24} {fast:>10.1f} {eager:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-request logging overhead: synchronous handlers vs the queued setup.
+
+Emits the two access-log records RequestPipelineMiddleware writes per request
+("Request started" / "Request completed", with the same extra fields) and
+times them on the calling thread, which is the cost the event loop pays:
+
+  sync    the five sinks from build_log_handlers() attached to the root logger
+  queued  setup_logging(): one DroppingQueueHandler, sinks on a listener thread
+
+Log files go to a temporary directory; console output is discarded.
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_logging [--requests 20000]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from core.logging_config import build_log_handlers, get_log_stats, setup_logging, stop_logging
+
+logger = logging.getLogger("middleware.pipeline")
+
+
+def log_request(n: int):
+    request_id = f"bench-{n}"
+    logger.info(
+        "Request started: GET /api/v1/appointments/",
+        extra={
+            "request_id": request_id,
+            "method": "GET",
+            "path": "/api/v1/appointments/",
+            "query_string": "status=pending",
+            "client_ip": "10.0.0.1",
+        },
+    )
+    logger.info(
+        "Request completed: GET /api/v1/appointments/ - 200",
+        extra={
+            "request_id": request_id,
+            "method": "GET",
+            "path": "/api/v1/appointments/",
+            "status_code": 200,
+            "process_time": 0.0042,
+            "response_size": 512,
+        },
+    )
+
+
+def install_sync():
+    stop_logging()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(logging.INFO)
+    for handler in build_log_handlers():
+        root.addHandler(handler)
+
+
+def measure(requests: int) -> dict:
+    timings = []
+    for n in range(requests):
+        started = time.perf_counter()
+        log_request(n)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings) * 1_000_000,
+        "p50": timings[len(timings) // 2] * 1_000_000,
+        "p99": timings[int(len(timings) * 0.99)] * 1_000_000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    stdout = sys.stdout
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.chdir(log_dir)
+        # Console output would time the terminal; StreamHandler binds
+        # sys.stderr when it is created
+        sys.stderr = open(os.devnull, "w")
+
+        install_sync()
+        measure(500)
+        sync = measure(args.requests)
+
+        setup_logging()
+        measure(500)
+        queued = measure(args.requests)
+        stats = get_log_stats()
+        stop_logging()
+
+        sys.stderr.close()
+        sys.stderr = sys.__stderr__
+
+    print(f"{args.requests} requests, 2 records each (microseconds per request on the caller)", file=stdout)
+    print(f"{'mode':<8} {'mean':>9} {'p50':>9} {'p99':>9}", file=stdout)
+    for name, result in (("sync", sync), ("queued", queued)):
+        print(f"{name:<8} {result['mean']:>7.1f}us {result['p50']:>7.1f}us {result['p99']:>7.1f}us", file=stdout)
+    print(f"queued records dropped: {stats['dropped']} (queue capacity {stats['capacity']})", file=stdout)
+
+
+if __name__ == "__main__":
+    main()
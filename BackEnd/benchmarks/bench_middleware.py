@@ -0,0 +1,200 @@
+"""
+Per-request middleware overhead on /health: legacy stack vs RequestPipelineMiddleware.
+
+Calls each ASGI app directly with a synthetic scope (no HTTP client in the
+loop), rotating the client IP so neither stack trips the rate limiter:
+
+  bare      /health with no middleware (baseline)
+  legacy    the four @app.middleware("http") handlers the pipeline replaced,
+            kept here as the baseline
+  pipeline  the single pure-ASGI RequestPipelineMiddleware
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_middleware [--requests 20000]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from core.logging_config import get_logger
+from middleware.pipeline import RequestPipelineMiddleware
+from middleware.rate_limiting import DEFAULT_ENDPOINT_LIMIT, endpoint_limiter, rate_limiter
+from middleware.security import security_middleware
+
+logger = get_logger(__name__)
+
+
+# ----------------------
+# Legacy stack (baseline)
+# ----------------------
+async def request_logging_middleware(request: Request, call_next):
+    """Log all API requests and responses"""
+    request_id = str(uuid.uuid4())
+    start_time = time.time()
+    logger.info(
+        f"Request started: {request.method} {request.url.path}",
+        extra={
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "query_params": dict(request.query_params),
+            "client_ip": request.client.host,
+            "user_agent": request.headers.get("user-agent", ""),
+        }
+    )
+    response = await call_next(request)
+    process_time = time.time() - start_time
+    logger.info(
+        f"Request completed: {request.method} {request.url.path} - {response.status_code}",
+        extra={
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": response.status_code,
+            "process_time": process_time,
+            "response_size": response.headers.get("content-length", 0),
+        }
+    )
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+async def security_middleware_handler(request: Request, call_next):
+    """Security middleware to detect and prevent attacks"""
+    if request.url.path.startswith("/docs") or request.url.path.startswith("/redoc") or request.url.path.startswith("/openapi.json"):
+        return await call_next(request)
+
+    client_ip = request.client.host
+    if security_middleware.is_ip_blocked(client_ip):
+        return JSONResponse(
+            status_code=403,
+            content={"error": True, "message": "Access denied", "status_code": 403}
+        )
+    if security_middleware.is_too_long(request.url.path, request.scope.get("query_string", b"")):
+        return JSONResponse(
+            status_code=414,
+            content={"error": True, "message": "Request URI too long", "status_code": 414}
+        )
+    if security_middleware.is_suspicious_request(request):
+        security_middleware.block_ip(client_ip, "Suspicious request pattern")
+        return JSONResponse(
+            status_code=403,
+            content={"error": True, "message": "Request blocked due to security concerns", "status_code": 403}
+        )
+
+    response = await call_next(request)
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["X-XSS-Protection"] = "1; mode=block"
+    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    response.headers["Content-Security-Policy"] = "default-src 'self'"
+    return response
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    """Rate limiting middleware"""
+    if not rate_limiter.is_allowed(request.client.host, max_requests=100, window_seconds=3600):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"error": True, "message": "Rate limit exceeded. Please try again later.", "status_code": 429}
+        )
+    return await call_next(request)
+
+
+async def endpoint_rate_limit_middleware(request: Request, call_next):
+    """Endpoint-specific rate limiting, keyed on the raw path"""
+    path = request.url.path
+    max_requests, window_seconds = endpoint_limiter.limits.get(path, DEFAULT_ENDPOINT_LIMIT)
+    if not rate_limiter.is_allowed(request.client.host, max_requests, window_seconds):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "error": True,
+                "message": f"Rate limit exceeded for {path}. Please try again later.",
+                "status_code": 429,
+                "retry_after": window_seconds
+            }
+        )
+    return await call_next(request)
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy", "message": "BukCare API is running"}
+
+    if mode == "legacy":
+        app.middleware("http")(request_logging_middleware)
+        app.middleware("http")(security_middleware_handler)
+        app.middleware("http")(rate_limit_middleware)
+        app.middleware("http")(endpoint_rate_limit_middleware)
+    elif mode == "pipeline":
+        app.add_middleware(RequestPipelineMiddleware)
+    return app
+
+
+async def drive(app, requests: int, ip_offset: int) -> list:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    latencies = []
+    for i in range(requests):
+        n = ip_offset + i
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/health",
+            "raw_path": b"/health",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+            "client": (f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}", 50000),
+            "server": ("bench", 80),
+        }
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--log-level", default="WARNING", help="root log level while measuring")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(args.log_level)
+
+    modes = ("bare", "legacy", "pipeline")
+    apps = {mode: build_app(mode) for mode in modes}
+    for index, mode in enumerate(modes):
+        await drive(apps[mode], 1000, ip_offset=(index + 1) * 1_000_000)  # warm up routing and JSON paths
+
+    results = {}
+    print(f"{'mode':<9} {'mean':>9} {'p50':>9} {'p99':>9} {'overhead':>9}")
+    for index, mode in enumerate(modes):
+        latencies = sorted(await drive(apps[mode], args.requests, ip_offset=(index + 1) * 2_000_000))
+        mean = sum(latencies) / len(latencies)
+        results[mode] = mean
+        overhead = mean - results["bare"]
+        print(
+            f"{mode:<9} {mean * 1e6:>7.1f}us {latencies[len(latencies) // 2] * 1e6:>7.1f}us "
+            f"{latencies[int(len(latencies) * 0.99)] * 1e6:>7.1f}us {overhead * 1e6:>7.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
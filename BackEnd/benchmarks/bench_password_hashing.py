@@ -0,0 +1,135 @@
+"""
+Login latency under background traffic: inline bcrypt vs the bounded hash pool.
+
+Each mode mounts one login route next to the same background routes and
+drives them in-process through httpx's ASGI transport:
+
+  event-loop  async handler calling verify_password inline (blocks the loop)
+  threadpool  sync handler calling verify_password (shares anyio's threadpool)
+  hash-pool   async handler awaiting verify_password_async
+
+Background traffic is a mix of async and sync (threadpool) handlers, the sync
+one sleeping briefly to stand in for a database round trip.
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_password_hashing [--logins 40] [--rounds 3]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from core.security import (
+    get_password_hash,
+    password_hash_pool,
+    verify_password,
+    verify_password_async,
+)
+
+PASSWORD = "correct-horse-battery"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_app(mode: str, hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/ping-sync")
+    def ping_sync():
+        time.sleep(0.002)
+        return {"ok": True}
+
+    if mode == "event-loop":
+        @app.post("/login")
+        async def login():
+            return {"ok": verify_password(PASSWORD, hashed)}
+    elif mode == "threadpool":
+        @app.post("/login")
+        def login():
+            return {"ok": verify_password(PASSWORD, hashed)}
+    else:
+        @app.post("/login")
+        async def login():
+            return {"ok": await verify_password_async(PASSWORD, hashed)}
+
+    return app
+
+
+async def run_mode(mode: str, hashed: str, logins: int, rounds: int, background: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(mode, hashed))
+    login_latencies, background_latencies = [], []
+    statuses = {}
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def background_worker(path):
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.get(path)
+                background_latencies.append(time.perf_counter() - started)
+                # In-process requests may never suspend; leave room for the other clients
+                await asyncio.sleep(0.001)
+
+        async def one_login():
+            started = time.perf_counter()
+            response = await client.post("/login")
+            login_latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        workers = [
+            asyncio.create_task(background_worker("/ping" if i % 2 else "/ping-sync"))
+            for i in range(background)
+        ]
+        await asyncio.sleep(0.2)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*workers)
+
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "login_p50_ms": percentile(login_latencies, 50) * 1000,
+        "login_p99_ms": percentile(login_latencies, 99) * 1000,
+        "background_p50_ms": statistics.median(background_latencies) * 1000,
+        "background_p99_ms": percentile(background_latencies, 99) * 1000,
+        "statuses": statuses,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40, help="concurrent logins per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--background", type=int, default=20, help="concurrent background clients")
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    print(f"{'mode':<11} {'elapsed':>8} {'login p50':>10} {'login p99':>10} {'bg p50':>8} {'bg p99':>8}  statuses")
+    for mode in ("event-loop", "threadpool", "hash-pool"):
+        result = await run_mode(mode, hashed, args.logins, args.rounds, args.background)
+        print(
+            f"{result['mode']:<11} {result['elapsed_s']:>7.2f}s "
+            f"{result['login_p50_ms']:>8.1f}ms {result['login_p99_ms']:>8.1f}ms "
+            f"{result['background_p50_ms']:>6.1f}ms {result['background_p99_ms']:>6.1f}ms  {result['statuses']}"
+        )
+    print(f"hash pool rejections: {password_hash_pool.rejected}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
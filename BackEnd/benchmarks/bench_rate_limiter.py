@@ -0,0 +1,82 @@
+"""
+Memory and throughput of the rate limiters with many distinct clients.
+
+Replays the same traffic against RateLimiter (sliding window) and
+TokenBucketRateLimiter: every IP makes --per-ip requests against the global
+limit (100/hour), interleaved across all IPs. Reports throughput of
+is_allowed, retained memory (tracemalloc, measured in a separate replay) and
+the time a background cleanup pass takes.
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_rate_limiter [--ips 100000] [--per-ip 20]
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from middleware.rate_limiting import RateLimiter, TokenBucketRateLimiter
+
+
+def ip_for(n: int) -> str:
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def replay(limiter, ips: list, per_ip: int) -> int:
+    allowed = 0
+    for _ in range(per_ip):
+        for ip in ips:
+            allowed += limiter.is_allowed(ip, max_requests=100, window_seconds=3600)
+    return allowed
+
+
+def run(limiter_cls, ips: list, per_ip: int) -> dict:
+    # Throughput without tracemalloc, which would dominate the timings
+    gc.collect()
+    started = time.perf_counter()
+    allowed = replay(limiter_cls(), ips, per_ip)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    limiter = limiter_cls()
+    replay(limiter, ips, per_ip)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    cleanup_started = time.perf_counter()
+    asyncio.run(limiter.cleanup())
+    cleanup_elapsed = time.perf_counter() - cleanup_started
+
+    calls = per_ip * len(ips)
+    return {
+        "calls": calls,
+        "allowed": allowed,
+        "ops_per_s": calls / elapsed,
+        "retained_mb": retained / 1024 / 1024,
+        "bytes_per_ip": retained / len(ips),
+        "cleanup_ms": cleanup_elapsed * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ips", type=int, default=100_000)
+    parser.add_argument("--per-ip", type=int, default=20)
+    args = parser.parse_args()
+
+    ips = [ip_for(n) for n in range(args.ips)]
+    print(f"{args.ips} distinct IPs x {args.per_ip} requests")
+    print(f"{'limiter':<15} {'ops/s':>11} {'retained':>10} {'bytes/ip':>9} {'cleanup':>9}")
+    for name, limiter_cls in (("sliding_window", RateLimiter), ("token_bucket", TokenBucketRateLimiter)):
+        result = run(limiter_cls, ips, args.per_ip)
+        print(
+            f"{name:<15} {result['ops_per_s']:>11,.0f} {result['retained_mb']:>8.1f}MB "
+            f"{result['bytes_per_ip']:>9.0f} {result['cleanup_ms']:>7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cost of the attack-pattern screen on long and adversarial query strings.
+
+Compares the previous implementation (seven re.search calls on the path and
+on every query parameter, rebuilt from the parsed QueryParams) with
+SecurityMiddleware.is_suspicious, which decodes and scans each raw parameter
+once.
+Both must agree on every case before timings are printed.
+
+Run from BackEnd/ with the usual .env in place:
+    python -m benchmarks.bench_security_screen [--repeat 200]
+"""
+import argparse
+import re
+import time
+
+from starlette.datastructures import QueryParams
+
+from middleware.security import MAX_SCAN_LENGTH, security_middleware
+
+LEGACY_PATTERNS = [
+    r'<script.*?>.*?</script>',
+    r'union.*select',
+    r'<iframe.*?>',
+    r'javascript:',
+    r'vbscript:',
+    r'onload=',
+    r'onerror=',
+]
+
+
+def legacy_is_suspicious(path: str, query_string: bytes) -> bool:
+    """The pre-compiled-matcher screen, kept here as the baseline"""
+    path = path.lower()
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, path, re.IGNORECASE):
+            return True
+    for _, value in QueryParams(query_string).items():
+        value = value.lower()
+        for pattern in LEGACY_PATTERNS:
+            if re.search(pattern, value, re.IGNORECASE):
+                return True
+    return False
+
+
+def fill(unit: str, length: int) -> bytes:
+    return (unit * (length // len(unit) + 1))[:length].encode()
+
+
+CASES = {
+    "short clean": b"status=pending&page=2",
+    "many params": fill("field=value&", MAX_SCAN_LENGTH),
+    "one long value": b"q=" + fill("a", MAX_SCAN_LENGTH - 2),
+    "repeated 'union'": b"q=" + fill("union", MAX_SCAN_LENGTH - 2),
+    "repeated '<script'": b"q=" + fill("%3Cscript", MAX_SCAN_LENGTH - 2),
+    "sql injection": b"id=1+UNION+SELECT+password+FROM+users",
+    "encoded xss": b"next=%3Cscript%3Ealert(1)%3C%2Fscript%3E",
+    "encoded '&' in xss": b"q=%3Cscript%3Ea%26b%3C%2Fscript%3E",
+    "split across params": b"a=union&b=select",
+    "split across lines": b"q=union%0Aselect",
+}
+
+
+def measure(screen, query_string: bytes, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        screen("/api/v1/appointments/", query_string)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, query_string in CASES.items():
+        expected = legacy_is_suspicious("/api/v1/appointments/", query_string)
+        actual = security_middleware.is_suspicious("/api/v1/appointments/", query_string)
+        if expected != actual:
+            raise SystemExit(f"Screens disagree on {name!r}: legacy={expected} new={actual}")
+
+    print(f"{'case':<20} {'bytes':>6} {'flagged':>8} {'legacy':>11} {'compiled':>11} {'speedup':>8}")
+    for name, query_string in CASES.items():
+        legacy = measure(legacy_is_suspicious, query_string, args.repeat)
+        compiled = measure(security_middleware.is_suspicious, query_string, args.repeat)
+        flagged = security_middleware.is_suspicious("/api/v1/appointments/", query_string)
+        print(
+            f"{name:<20} {len(query_string):>6} {str(flagged):>8} "
+            f"{legacy:>9.1f}us {compiled:>9.1f}us {legacy / compiled:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Response serialization: hand-built dicts vs typed response models.
+
+Serves the same --items appointments (the GET /api/v1/appointments/ payload)
+from a bare FastAPI app four ways and times full requests through
+TestClient, so validation, serialization and rendering are all included:
+
+  dict        handler builds dicts, response_model=List[dict], stock
+              JSONResponse (what the routers did before)
+  typed       ORM objects returned, response_model=List[AppointmentResponse],
+              stock JSONResponse
+  typed-fast  the same with FastJSONResponse (main.app's default class)
+  typed-json  typed_json(): one pydantic-core validate-and-dump pass, what
+              the list endpoints return now
+
+Building one model per row in Python (Model.model_validate in a loop) is
+slower than any of these; let pydantic-core validate the whole list.
+
+The appointments are transient ORM objects, so no database is needed. The
+script also checks that every variant returns the same appointments.
+
+Run from BackEnd/:
+    python -m benchmarks.bench_serialization [--items 5000] [--rounds 20]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from pydantic import TypeAdapter
+
+from core.responses import FastJSONResponse, typed_json
+from models.appointment import Appointment, AppointmentStatus
+from schemas.appointment import AppointmentResponse
+
+STATUSES = list(AppointmentStatus)
+
+
+def make_appointments(items: int) -> list:
+    now = datetime.utcnow()
+    return [
+        Appointment(
+            id=n + 1,
+            patient_id=n % 500 + 1,
+            doctor_id=n % 40 + 1,
+            appointment_date=now + timedelta(minutes=30 * n),
+            reason="Follow-up consultation" if n % 3 else None,
+            status=STATUSES[n % len(STATUSES)],
+            notes="Bring previous lab results" if n % 5 == 0 else None,
+            created_at=now - timedelta(days=n % 90),
+            updated_at=now - timedelta(days=n % 30),
+        )
+        for n in range(items)
+    ]
+
+
+def as_dict(appointment: Appointment) -> dict:
+    return {
+        "id": appointment.id,
+        "patient_id": appointment.patient_id,
+        "doctor_id": appointment.doctor_id,
+        "appointment_date": appointment.appointment_date,
+        "reason": appointment.reason,
+        "status": appointment.status.value,
+        "notes": appointment.notes,
+        "created_at": appointment.created_at,
+        "updated_at": appointment.updated_at
+    }
+
+
+APPOINTMENT_LIST = TypeAdapter(List[AppointmentResponse])
+VARIANTS = ("dict", "typed", "typed-fast", "typed-json")
+
+
+def build_app(appointments: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/dict", response_model=List[dict], response_class=JSONResponse)
+    def dict_listing():
+        return [as_dict(appointment) for appointment in appointments]
+
+    @app.get("/typed", response_model=List[AppointmentResponse], response_class=JSONResponse)
+    def typed_listing():
+        return appointments
+
+    @app.get("/typed-fast", response_model=List[AppointmentResponse], response_class=FastJSONResponse)
+    def typed_fast_listing():
+        return appointments
+
+    @app.get("/typed-json", response_model=List[AppointmentResponse])
+    def typed_json_listing():
+        return typed_json(APPOINTMENT_LIST, appointments)
+
+    return app
+
+
+def measure(client: TestClient, path: str, rounds: int) -> dict:
+    client.get(path)  # warm up
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - started)
+    return {
+        "body": response.content,
+        "mean": statistics.fmean(timings) * 1000,
+        "best": min(timings) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(make_appointments(args.items)))
+    results = {name: measure(client, f"/{name}", args.rounds) for name in VARIANTS}
+
+    expected = json.loads(results["dict"]["body"])
+    for name in VARIANTS[1:]:
+        assert json.loads(results[name]["body"]) == expected, f"{name} payload differs from dict"
+
+    baseline = results["dict"]["mean"]
+    print(f"GET of {args.items} appointments, {args.rounds} rounds")
+    print(f"{'variant':<11} {'bytes':>9} {'mean':>10} {'best':>10} {'speedup':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<11} {len(result['body']):>9} {result['mean']:>8.1f}ms "
+            f"{result['best']:>8.1f}ms {baseline / result['mean']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Per-doctor-per-day slot cache: GET /schedules/doctor/{id}/available-slots
+for one popular doctor, with and without core/slot_cache.py.
+
+Seeds a doctor with 08:00-20:00 weekly rules, 5-minute slots and --booked of
+next week's slots taken, materializes that week into doctor_slots, then
+serves --requests lookups spread over the week's days through the handler
+itself (no HTTP, no middleware) with each cache:
+
+  uncached   a cache that never stores: every lookup runs the doctor_slots
+             range scan
+  memory     InMemorySlotCache (per worker); a hit runs one query, the
+             doctor's slot_cache_generations row
+
+Every --write-every lookups a booking is created and cancelled through the
+appointment handlers, which invalidates the day it lands on. The script
+checks that every variant returns the same slots as an uncached lookup.
+
+Runs against DATABASE_URL with the schema migrated (alembic upgrade head),
+so point it at a scratch database. The seeded users
+(bench-slot-cache-*@example.invalid) and their rows are deleted afterwards.
+
+Run from BackEnd/:
+    python -m benchmarks.bench_slot_cache [--requests 2000] [--booked 0.3] [--write-every 50]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, time as clock, timedelta
+
+from sqlalchemy import delete, select
+
+import models  # noqa: F401 - registers every mapper
+from core.database import SessionLocal, async_engine, get_autocommit_engine, new_async_session
+from core.principal_cache import Principal
+from core.slot_cache import InMemorySlotCache, SlotCache
+from core.slot_horizon import materialize
+from models.appointment import Appointment, AppointmentStatus
+from models.doctor import Doctor, DoctorAvailability, DoctorSlot
+from models.slot_cache import SlotCacheGeneration
+from models.users import User, UserRole
+from routers.v1 import appointments, schedules
+
+EMAIL_PREFIX = "bench-slot-cache-"
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+class UncachedSlotCache(SlotCache):
+    """Counts lookups but never stores anything (nor reads generations)"""
+
+    async def _generation(self, doctor_id):
+        return 0
+
+    async def _bump(self, doctor_id):
+        pass
+
+    async def _get(self, key):
+        return None
+
+    async def _set(self, key, entry):
+        pass
+
+    async def _invalidate(self, keys):
+        pass
+
+    async def _invalidate_doctor(self, doctor_id):
+        pass
+
+
+def seed(booked: float, rng: random.Random):
+    """Returns (doctor_id, doctor user, patient user, days)"""
+    today = datetime.utcnow().date()
+    days = [today + timedelta(days=n) for n in range(1, 8)]
+    with SessionLocal() as db:
+        doctor_user = User(email=f"{EMAIL_PREFIX}doctor@example.invalid", fname="Doctor", lname="Popular",
+                           role=UserRole.DOCTOR)
+        patient_user = User(email=f"{EMAIL_PREFIX}patient@example.invalid", fname="Patient", lname="One",
+                            role=UserRole.PATIENT)
+        db.add_all([doctor_user, patient_user])
+        db.flush()
+        doctor = Doctor(user_id=doctor_user.id, is_verified=True, slot_minutes=5, slot_horizon=days[-1])
+        db.add(doctor)
+        db.flush()
+        db.add_all([
+            DoctorAvailability(doctor_id=doctor.doctor_id, day_of_week=day, start_time=clock(8), end_time=clock(20))
+            for day in WEEKDAYS
+        ])
+        # 12:00 stays free for the bookings made during the run
+        grid = [
+            datetime.combine(day, clock(8)) + timedelta(minutes=5 * k)
+            for day in days for k in range(144) if k != 48
+        ]
+        db.add_all([
+            Appointment(patient_id=patient_user.id, doctor_id=doctor_user.id, appointment_date=start,
+                        status=AppointmentStatus.CONFIRMED)
+            for start in rng.sample(grid, int(len(grid) * booked))
+        ])
+        db.commit()
+        return doctor.doctor_id, doctor_user.id, patient_user.id, days
+
+
+def cleanup():
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%"))
+        doctor_ids = select(Doctor.doctor_id).where(Doctor.user_id.in_(user_ids))
+        db.execute(delete(Appointment).where(Appointment.doctor_id.in_(user_ids)))
+        db.execute(delete(DoctorSlot).where(DoctorSlot.doctor_id.in_(doctor_ids)))
+        db.execute(delete(SlotCacheGeneration).where(SlotCacheGeneration.doctor_id.in_(doctor_ids)))
+        db.execute(delete(DoctorAvailability).where(DoctorAvailability.doctor_id.in_(doctor_ids)))
+        db.execute(delete(Doctor).where(Doctor.user_id.in_(user_ids)))
+        db.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        db.commit()
+
+
+async def lookup(doctor_id: int, day) -> list:
+    db = new_async_session()
+    try:
+        response = await schedules.get_available_slots(doctor_id, day.isoformat(), db)
+        return [slot.datetime for slot in response.available_slots]
+    finally:
+        await db.close()
+
+
+async def book_and_cancel(doctor_user_id: int, patient: Principal, when: datetime):
+    db = new_async_session()
+    try:
+        created = await appointments.create_appointment(doctor_user_id, when, None, patient, db)
+    finally:
+        await db.close()
+    db = new_async_session()
+    try:
+        await appointments.cancel_appointment(created.id, patient, db)
+    finally:
+        await db.close()
+
+
+async def run_variant(cache: SlotCache, seeded, args) -> dict:
+    doctor_id, doctor_user_id, patient_id, days = seeded
+    patient = Principal(id=patient_id, role=UserRole.PATIENT, is_active=True, is_profile_complete=True)
+    schedules.slot_cache = appointments.slot_cache = cache
+    rng = random.Random(11)
+    timings = []
+    for n in range(args.requests):
+        if n and n % args.write_every == 0:
+            day = rng.choice(days)
+            await book_and_cancel(doctor_user_id, patient, datetime.combine(day, clock(12)))
+        started = time.perf_counter()
+        await lookup(doctor_id, rng.choice(days))
+        timings.append(time.perf_counter() - started)
+
+    # Every cached day must match a fresh computation
+    schedules.slot_cache = UncachedSlotCache()
+    expected = {day: await lookup(doctor_id, day) for day in days}
+    schedules.slot_cache = cache
+    for day in days:
+        assert await lookup(doctor_id, day) == expected[day], f"{day}: cached slots differ"
+
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings) * 1000,
+        "p50": timings[len(timings) // 2] * 1000,
+        "p99": timings[int(len(timings) * 0.99)] * 1000,
+        "hit_ratio": cache.get_stats()["hit_ratio"] or 0.0,
+    }
+
+
+async def run(args):
+    seeded = seed(args.booked, random.Random(7))
+    doctor_id, _, _, days = seeded
+    db = new_async_session()
+    try:
+        await materialize(db, [doctor_id], days[0], days[-1])
+        await db.commit()
+    finally:
+        await db.close()
+
+    variants = {"uncached": UncachedSlotCache(), "memory": InMemorySlotCache(maxsize=10000, ttl=600)}
+
+    print(f"{args.requests} lookups over {len(days)} days, a booking every {args.write_every}")
+    print(f"{'variant':<9} {'mean':>9} {'p50':>9} {'p99':>9} {'hits':>6}")
+    for name, cache in variants.items():
+        result = await run_variant(cache, seeded, args)
+        print(
+            f"{name:<9} {result['mean']:>7.2f}ms {result['p50']:>7.2f}ms "
+            f"{result['p99']:>7.2f}ms {result['hit_ratio']:>6.1%}"
+        )
+    if async_engine is not None:
+        await async_engine.dispose()
+    autocommit_engine = get_autocommit_engine()
+    if hasattr(autocommit_engine, "sync_engine"):
+        await autocommit_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--booked", type=float, default=0.3)
+    parser.add_argument("--write-every", type=int, default=50)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Slot generation: the old per-slot scan vs the interval sweep in utils/slots.py.
+
+First checks the engine on --cases random days:
+
+  legacy      on inputs the old code handled correctly (disjoint windows a
+              whole number of slots long, bookings on the grid, no buffer)
+              the engine returns exactly the old slots
+  reference   on arbitrary inputs (overlapping windows, off-grid bookings,
+              buffers, odd slot lengths) it matches a brute-force reference
+              that tests every grid point against every booking
+
+Then times a clinic-sized day: --doctors doctors with 12 hours of
+availability in 5-minute slots (split into overlapping morning/afternoon/
+evening windows) and --booked of the slots taken:
+
+  legacy      the old get_available_slots loop, slot length parameterised,
+              any() over the day's appointments for every slot
+  engine      utils.slots.free_slots
+
+No database is needed. Run from BackEnd/:
+    python -m benchmarks.bench_slots [--doctors 50] [--booked 0.5] [--rounds 20] [--cases 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from utils.slots import SlotPolicy, free_slots, merge_intervals
+
+DAY = datetime(2026, 10, 19)
+
+
+def legacy_slots(windows, bookings, slot_minutes=30):
+    """The old loop: each window in slot steps, each step checked against every booking"""
+    length = timedelta(minutes=slot_minutes)
+    slots = []
+    for window_start, window_end in windows:
+        current_time = window_start
+        while current_time < window_end:
+            slot_end = current_time + length
+            is_booked = any(
+                booked <= current_time < booked + length
+                for booked in bookings
+            )
+            if not is_booked:
+                slots.append((current_time, slot_end))
+            current_time += length
+    return slots
+
+
+def reference_slots(windows, bookings, policy):
+    """Every grid point of every merged window, kept if it fits and clears all bookings"""
+    length, buffer = policy.length, policy.buffer
+    slots = []
+    for window_start, window_end in merge_intervals(windows):
+        start = window_start
+        while start + length <= window_end:
+            end = start + length
+            if all(end <= booked - buffer or booked + length + buffer <= start for booked in bookings):
+                slots.append((start, end))
+            start = end
+    return slots
+
+
+def minutes(n):
+    return DAY + timedelta(minutes=n)
+
+
+def legacy_case(rng):
+    slot = rng.choice([10, 15, 20, 30, 45, 60])
+    windows, cursor = [], rng.randrange(0, 120, slot)
+    for _ in range(rng.randint(0, 4)):
+        start = cursor + rng.randrange(0, 4) * slot
+        end = start + rng.randint(1, 12) * slot
+        windows.append((minutes(start), minutes(end)))
+        cursor = end
+    rng.shuffle(windows)  # the old code kept database order; compare sorted
+    grid = [k * slot for k in range(cursor // slot + 2)]
+    bookings = [minutes(rng.choice(grid)) for _ in range(rng.randint(0, 10))]
+    return windows, bookings, SlotPolicy(slot_minutes=slot)
+
+
+def general_case(rng):
+    policy = SlotPolicy(slot_minutes=rng.choice([5, 7, 15, 25, 30, 50]), buffer_minutes=rng.choice([0, 0, 5, 10, 13]))
+    windows = []
+    for _ in range(rng.randint(0, 5)):
+        start = rng.randint(0, 600)
+        windows.append((minutes(start), minutes(start + rng.randint(-10, 240))))  # some empty or reversed
+    bookings = [minutes(rng.randint(-60, 900)) for _ in range(rng.randint(0, 15))]
+    return windows, bookings, policy
+
+
+def check(cases: int):
+    rng = random.Random(2026)
+    for n in range(cases):
+        windows, bookings, policy = legacy_case(rng)
+        expected = sorted(legacy_slots(windows, bookings, policy.slot_minutes))
+        actual = free_slots(windows, bookings, policy)
+        assert actual == expected, f"legacy case {n}: {windows} {bookings} {policy}"
+
+        windows, bookings, policy = general_case(rng)
+        expected = reference_slots(windows, bookings, policy)
+        actual = free_slots(windows, bookings, policy)
+        assert actual == expected, f"reference case {n}: {windows} {bookings} {policy}"
+    print(f"{cases} legacy-equivalence and {cases} reference cases passed")
+
+
+def clinic_day(doctors: int, booked: float, rng):
+    """Per doctor: 08:00-20:00 in three overlapping windows, a share of 5-minute slots booked"""
+    days = []
+    for _ in range(doctors):
+        windows = [(minutes(8 * 60), minutes(12 * 60 + 30)), (minutes(12 * 60), minutes(16 * 60 + 15)),
+                   (minutes(16 * 60), minutes(20 * 60))]
+        grid = [minutes(8 * 60 + 5 * k) for k in range(12 * 12)]
+        bookings = rng.sample(grid, int(len(grid) * booked))
+        days.append((windows, bookings))
+    return days
+
+
+def measure(fn, days, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for windows, bookings in days:
+            fn(windows, bookings)
+        timings.append(time.perf_counter() - started)
+    return statistics.fmean(timings) * 1000, min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--booked", type=float, default=0.5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--cases", type=int, default=2000)
+    args = parser.parse_args()
+
+    check(args.cases)
+
+    policy = SlotPolicy(slot_minutes=5)
+    days = clinic_day(args.doctors, args.booked, random.Random(7))
+    variants = {
+        "legacy": lambda windows, bookings: legacy_slots(windows, bookings, policy.slot_minutes),
+        "engine": lambda windows, bookings: free_slots(windows, bookings, policy),
+    }
+    bookings = sum(len(day[1]) for day in days)
+    print(f"{args.doctors} doctors x 12h in 5-minute slots, {bookings} bookings, {args.rounds} rounds")
+    print(f"{'variant':<8} {'mean':>10} {'best':>10}")
+    results = {name: measure(fn, days, args.rounds) for name, fn in variants.items()}
+    for name, (mean, best) in results.items():
+        print(f"{name:<8} {mean:>8.1f}ms {best:>8.1f}ms")
+    print(f"speedup {results['legacy'][0] / results['engine'][0]:.1f}x (legacy also repeats slots where windows overlap)")
+
+
+if __name__ == "__main__":
+    main()
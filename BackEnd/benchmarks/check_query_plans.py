@@ -0,0 +1,259 @@
+"""
+Query plan regression check: fails if a hot query falls back to a sequential scan.
+
+Seeds a realistically shaped data set, runs ANALYZE, then EXPLAINs the
+statements the listing endpoints build (through the routers' own query
+helpers, so a change there is checked too). Any full table scan makes the
+script print the offending plans and exit with status 1:
+
+  Postgres  EXPLAIN (FORMAT JSON), any "Seq Scan" node
+  sqlite    EXPLAIN QUERY PLAN, any "SCAN <table>" step not using an index
+
+Runs against DATABASE_URL with the schema migrated (alembic upgrade head), so
+point it at a scratch database. The seeded users (bench-plans-*@example.invalid)
+and their rows are deleted afterwards.
+
+tests/test_query_plans.py runs the same check under pytest on Postgres.
+
+Run from BackEnd/:
+    python -m benchmarks.check_query_plans [--doctors 1000] [--patients 4000] [--appointments 40000]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import delete, func, insert, select, text
+
+import models  # noqa: F401 - registers every mapper
+from core.config import settings
+from core.database import SessionLocal, engine
+from core.principal_cache import Principal
+from models.appointment import Appointment, AppointmentStatus
+from models.doctor import Doctor, DoctorAvailability, DoctorSlot
+from models.notification import Notification
+from models.users import User, UserRole
+from routers.v1.admin.admin import USERS_NEWEST_FIRST
+from routers.v1.appointments import (
+    APPOINTMENTS_LATEST_FIRST,
+    APPOINTMENTS_SOONEST_FIRST,
+    appointment_listing_query,
+    scope_to_user,
+)
+from routers.v1.notifications import NOTIFICATIONS_NEWEST_FIRST
+from utils.pagination import PageRequest
+
+EMAIL_PREFIX = "bench-plans-"
+STATUSES = list(AppointmentStatus)
+
+
+def seed(doctors: int, patients: int, appointments: int):
+    """Returns (doctor user id, doctor_id, patient user id) to query for"""
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {
+                "email": f"{EMAIL_PREFIX}doctor-{n}@example.invalid",
+                "fname": "Doctor", "lname": str(n), "role": UserRole.DOCTOR,
+                "created_at": now - timedelta(minutes=n),
+            }
+            for n in range(doctors)
+        ] + [
+            {
+                "email": f"{EMAIL_PREFIX}patient-{n}@example.invalid",
+                "fname": "Patient", "lname": str(n), "role": UserRole.PATIENT,
+                "created_at": now - timedelta(minutes=n),
+            }
+            for n in range(patients)
+        ])
+        doctor_users = db.scalars(select(User.id).where(
+            User.email.like(f"{EMAIL_PREFIX}doctor-%")
+        ).order_by(User.id)).all()
+        patient_users = db.scalars(select(User.id).where(
+            User.email.like(f"{EMAIL_PREFIX}patient-%")
+        ).order_by(User.id)).all()
+
+        # One doctor in twenty is waiting for approval
+        db.execute(insert(Doctor), [
+            {"user_id": user_id, "is_verified": n % 20 != 0}
+            for n, user_id in enumerate(doctor_users)
+        ])
+        doctor_ids = db.scalars(select(Doctor.doctor_id).where(
+            Doctor.user_id.in_(doctor_users)
+        ).order_by(Doctor.doctor_id)).all()
+
+        day = datetime.combine(now.date(), datetime.min.time())
+        db.execute(insert(DoctorAvailability), [
+            {
+                "doctor_id": doctor_ids[n % len(doctor_ids)],
+                "date": day + timedelta(days=n // len(doctor_ids) - 10),
+                "start_time": datetime.min.time().replace(hour=9),
+                "end_time": datetime.min.time().replace(hour=12),
+                "is_available": True,
+            }
+            for n in range(len(doctor_ids) * 20)
+        ])
+
+        # Two weeks of materialized 09:00-12:00 half-hour slots
+        db.execute(insert(DoctorSlot), [
+            {
+                "doctor_id": doctor_id,
+                "start_time": day + timedelta(days=d, hours=9, minutes=30 * k),
+                "end_time": day + timedelta(days=d, hours=9, minutes=30 * k + 30),
+            }
+            for doctor_id in doctor_ids
+            for d in range(14)
+            for k in range(6)
+        ])
+
+        # A year either side of today; most past bookings are completed or cancelled
+        db.execute(insert(Appointment), [
+            {
+                "patient_id": patient_users[n % len(patient_users)],
+                "doctor_id": doctor_users[n % len(doctor_users)],
+                "appointment_date": now + timedelta(hours=(n * 7919) % 17520 - 8760),
+                "status": STATUSES[n % len(STATUSES)],
+            }
+            for n in range(appointments)
+        ])
+
+        db.execute(insert(Notification), [
+            {
+                "target_user_id": patient_users[n % len(patient_users)],
+                "title": "Appointment update",
+                "message": "Your appointment was updated",
+                "is_read": n % 10 != 0,
+                "created_at": now - timedelta(minutes=n),
+            }
+            for n in range(appointments)
+        ])
+        db.commit()
+        return doctor_users[1], doctor_ids[1], patient_users[1]
+
+
+def cleanup():
+    with SessionLocal() as db:
+        user_ids = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%"))
+        doctor_ids = select(Doctor.doctor_id).where(Doctor.user_id.in_(user_ids))
+        db.execute(delete(Notification).where(Notification.target_user_id.in_(user_ids)))
+        db.execute(delete(Appointment).where(Appointment.doctor_id.in_(user_ids)))
+        db.execute(delete(DoctorAvailability).where(DoctorAvailability.doctor_id.in_(doctor_ids)))
+        db.execute(delete(DoctorSlot).where(DoctorSlot.doctor_id.in_(doctor_ids)))
+        db.execute(delete(Doctor).where(Doctor.user_id.in_(user_ids)))
+        db.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        db.commit()
+
+
+def hot_queries(doctor_user_id: int, doctor_id: int, patient_id: int) -> dict:
+    """The statements behind the listing endpoints, first and later pages"""
+    doctor = Principal(id=doctor_user_id, role=UserRole.DOCTOR, is_active=True, is_profile_complete=True)
+    patient = Principal(id=patient_id, role=UserRole.PATIENT, is_active=True, is_profile_complete=True)
+    now = datetime.utcnow()
+    day = datetime.combine(now.date(), datetime.min.time())
+    first = PageRequest(limit=settings.PAGE_SIZE_DEFAULT)
+
+    def after(keyset, **values):
+        return PageRequest(limit=settings.PAGE_SIZE_DEFAULT, cursor=keyset.encode(SimpleNamespace(**values)))
+
+    history = appointment_listing_query().where(Appointment.appointment_date < now)
+    upcoming = appointment_listing_query().where(
+        Appointment.appointment_date > now,
+        Appointment.status.in_(["confirmed", "pending"])
+    )
+    return {
+        "appointments (doctor)": APPOINTMENTS_LATEST_FIRST.paginate(
+            scope_to_user(select(Appointment), doctor), first),
+        "appointments (patient)": APPOINTMENTS_LATEST_FIRST.paginate(
+            scope_to_user(select(Appointment), patient), first),
+        "history (doctor)": APPOINTMENTS_LATEST_FIRST.paginate(scope_to_user(history, doctor), first),
+        "history page 2 (doctor)": APPOINTMENTS_LATEST_FIRST.paginate(
+            scope_to_user(history, doctor),
+            after(APPOINTMENTS_LATEST_FIRST, appointment_date=now - timedelta(days=30), id=1)),
+        "history (patient)": APPOINTMENTS_LATEST_FIRST.paginate(scope_to_user(history, patient), first),
+        "upcoming (doctor)": APPOINTMENTS_SOONEST_FIRST.paginate(scope_to_user(upcoming, doctor), first),
+        "upcoming (patient)": APPOINTMENTS_SOONEST_FIRST.paginate(scope_to_user(upcoming, patient), first),
+        "booked slots (doctor, day)": select(Appointment).where(
+            Appointment.doctor_id == doctor_user_id,
+            Appointment.appointment_date >= day,
+            Appointment.appointment_date < day + timedelta(days=1),
+            Appointment.status.in_(["confirmed", "pending"])
+        ),
+        "schedules (doctor, day)": select(DoctorAvailability).where(
+            DoctorAvailability.doctor_id == doctor_id,
+            DoctorAvailability.date == day,
+            DoctorAvailability.is_available == True
+        ),
+        "stored slots (doctor, day)": select(DoctorSlot.start_time, DoctorSlot.end_time).where(
+            DoctorSlot.doctor_id == doctor_id,
+            DoctorSlot.start_time >= day,
+            DoctorSlot.start_time < day + timedelta(days=1)
+        ).order_by(DoctorSlot.start_time),
+        "notifications": NOTIFICATIONS_NEWEST_FIRST.paginate(
+            select(Notification).where(Notification.target_user_id == patient_id), first),
+        "notifications page 2": NOTIFICATIONS_NEWEST_FIRST.paginate(
+            select(Notification).where(Notification.target_user_id == patient_id),
+            after(NOTIFICATIONS_NEWEST_FIRST, created_at=now - timedelta(days=1), id=1)),
+        "unread count": select(func.count(Notification.id)).where(
+            Notification.target_user_id == patient_id,
+            Notification.is_read == False
+        ),
+        "doctors pending approval": select(Doctor).join(User).where(
+            User.role == UserRole.DOCTOR,
+            Doctor.is_verified == False
+        ),
+        "admin users": USERS_NEWEST_FIRST.paginate(select(User), first),
+        "admin users page 2": USERS_NEWEST_FIRST.paginate(
+            select(User), after(USERS_NEWEST_FIRST, created_at=now - timedelta(days=1), id=1)),
+    }
+
+
+def sequential_scans(conn, sql: str):
+    """(full scans, printable plan) for one statement"""
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans, stack = [], [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(node["Relation Name"])
+            stack.extend(node.get("Plans", []))
+        text_plan = "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}"))
+        return scans, text_plan
+
+    steps = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    scans = [step for step in steps if step.startswith("SCAN ") and " USING " not in step]
+    return scans, "\n".join(steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=1000)
+    parser.add_argument("--patients", type=int, default=4000)
+    parser.add_argument("--appointments", type=int, default=40000)
+    args = parser.parse_args()
+
+    cleanup()
+    ids = seed(args.doctors, args.patients, args.appointments)
+    failures = []
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+            for name, statement in hot_queries(*ids).items():
+                sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+                scans, plan = sequential_scans(conn, sql)
+                print(f"{'SEQ SCAN' if scans else 'ok':<8} {name}")
+                if scans:
+                    failures.append((name, scans, plan))
+    finally:
+        cleanup()
+
+    for name, scans, plan in failures:
+        print(f"\n{name}: full scan of {', '.join(scans)}\n{plan}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# core/booking.py
+"""
+Booking appointment slots: short-lived holds, then an atomic insert.
+
+Double bookings are ruled out by unique indexes rather than by
+check-then-insert under a lock:
+
+- appointments (doctor_id, appointment_date) WHERE status is pending or
+  confirmed: one active booking per doctor and start time. The losing
+  insert of a race fails with an IntegrityError, answered with 409.
+- slot_holds (doctor_id, start_time): one hold per slot.
+
+A hold is claimed with a single upsert that only takes over an expired
+hold (or the patient's own), and lasts BOOKING_HOLD_SECONDS. A patient keeps
+at most one hold per doctor (a new one replaces it) and
+BOOKING_HOLDS_PER_PATIENT in all, so nobody can sit on a doctor's day; a
+patient's claims are serialized on their users row, which keeps the cap
+exact under concurrent requests.
+Confirming a hold deletes it and inserts the appointment in one transaction.
+A direct booking skips the hold but is refused while another patient holds
+the slot.
+
+Slot times are naive UTC, like every other timestamp here: day_windows
+builds them from availability rows, and the past-slot and hold-expiry checks
+compare them with datetime.utcnow(); see as_slot_time().
+
+Either way the start must be one of the doctor's free slots at the time
+(core/slot_horizon.day_slots), and the stored slots are then updated with
+block_booking_slots(), whose FOR SHARE lock lets bookings of one doctor run
+side by side.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from core.config import settings
+from core.database import engine, new_async_session
+from core.slot_cache import slot_cache
+from core.slot_horizon import ACTIVE_STATUSES, block_booking_slots, day_slots, refresh_booking_slots
+from models.appointment import Appointment, AppointmentStatus, SlotHold
+from models.doctor import Doctor
+from models.users import User
+
+# (doctor_id, days) whose cached slots a booking change made stale
+Affected = Tuple[int, List]
+
+
+def as_slot_time(value: datetime) -> datetime:
+    """
+    A requested start on the naive UTC grid of the doctor's slots. An offset
+    is converted first: 17:00+08:00 is the 09:00 slot. Naive input is taken
+    as UTC already
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(tzinfo=None)
+
+
+def upsert(table):
+    """INSERT ... ON CONFLICT for the configured database"""
+    if engine.dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+
+async def bookable_doctor(db, doctor_user_id: int, start: datetime) -> Doctor:
+    """The doctor behind a user id, if `start` is one of their free slots"""
+    doctor = await db.scalar(select(Doctor).where(Doctor.user_id == doctor_user_id))
+    if doctor is None or not doctor.is_verified or doctor.is_accepting_patients is False:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    if start < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot book a time in the past"
+        )
+    if not any(slot_start == start for slot_start, _ in await day_slots(db, doctor, start.date(), include_held=True)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="That time is not an available slot"
+        )
+    return doctor
+
+
+async def hold_days(db, holds) -> List[Affected]:
+    """(doctor_id, days) of the doctors whose (doctor user id, start_time) holds changed"""
+    days = defaultdict(set)
+    for doctor_user_id, start in holds:
+        days[doctor_user_id].add(start.date())
+    if not days:
+        return []
+    doctor_ids = dict((await db.execute(
+        select(Doctor.user_id, Doctor.doctor_id).where(Doctor.user_id.in_(list(days)))
+    )).all())
+    return [(doctor_ids[user_id], sorted(held_days)) for user_id, held_days in days.items() if user_id in doctor_ids]
+
+
+async def claim_hold(db, doctor_user_id: int, patient_id: int, start: datetime) -> Tuple[SlotHold, Affected]:
+    """
+    Hold a free slot for BOOKING_HOLD_SECONDS, replacing the patient's other
+    hold with this doctor; 409 while someone else holds it or when the
+    patient already holds BOOKING_HOLDS_PER_PATIENT slots. The caller commits
+    """
+    doctor = await bookable_doctor(db, doctor_user_id, start)
+    # Claims of one patient run one at a time, so no concurrent claim can slip
+    # in between the count below and the upsert. The patient row is locked
+    # rather than their holds: with no hold yet there would be nothing to lock
+    await db.execute(select(User.id).where(User.id == patient_id).with_for_update(key_share=True))
+    now = datetime.utcnow()
+    replaced = (await db.scalars(delete(SlotHold).where(
+        SlotHold.doctor_id == doctor_user_id,
+        SlotHold.patient_id == patient_id,
+        SlotHold.start_time != start
+    ).returning(SlotHold.start_time))).all()
+    held = await db.scalar(select(func.count(SlotHold.id)).where(
+        SlotHold.patient_id == patient_id,
+        SlotHold.doctor_id != doctor_user_id,
+        SlotHold.expires_at > now
+    ))
+    if held >= settings.BOOKING_HOLDS_PER_PATIENT:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Too many slots held; confirm or release one first"
+        )
+    statement = upsert(SlotHold).values(
+        doctor_id=doctor_user_id,
+        patient_id=patient_id,
+        start_time=start,
+        expires_at=now + timedelta(seconds=settings.BOOKING_HOLD_SECONDS),
+        created_at=now
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[SlotHold.doctor_id, SlotHold.start_time],
+        set_={
+            "patient_id": statement.excluded.patient_id,
+            "expires_at": statement.excluded.expires_at,
+            "created_at": statement.excluded.created_at,
+        },
+        # Only an expired hold, or the patient's own, can be taken over
+        where=or_(SlotHold.expires_at <= now, SlotHold.patient_id == patient_id)
+    ).returning(SlotHold)
+    hold = (await db.execute(statement)).scalar()
+    if hold is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="That slot is being booked by another patient"
+        )
+    return hold, (doctor.doctor_id, sorted({start.date(), *(held.date() for held in replaced)}))
+
+
+async def release_hold(db, hold_id: int, patient_id: int) -> Optional[List[Affected]]:
+    """Drop a patient's own hold; None when there is none. The caller commits"""
+    released = (await db.execute(delete(SlotHold).where(
+        SlotHold.id == hold_id,
+        SlotHold.patient_id == patient_id
+    ).returning(SlotHold.doctor_id, SlotHold.start_time))).all()
+    if not released:
+        return None
+    return await hold_days(db, released)
+
+
+async def insert_booking(db, doctor: Doctor, patient_id: int, start: datetime, reason: Optional[str]) -> Tuple[Appointment, Affected]:
+    """Insert an active appointment and update stored slots; 409 if the slot was just taken"""
+    appointment = Appointment(
+        patient_id=patient_id,
+        doctor_id=doctor.user_id,
+        appointment_date=start,
+        reason=reason,
+        status=AppointmentStatus.PENDING
+    )
+    db.add(appointment)
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="That slot has just been booked"
+        )
+    return appointment, await block_booking_slots(db, doctor, start)
+
+
+async def book(db, doctor_user_id: int, patient_id: int, start: datetime, reason: Optional[str]) -> Tuple[Appointment, Affected]:
+    """Book directly (no hold); the caller commits"""
+    doctor = await bookable_doctor(db, doctor_user_id, start)
+    held_by_other = await db.scalar(select(SlotHold.id).where(
+        SlotHold.doctor_id == doctor_user_id,
+        SlotHold.start_time == start,
+        SlotHold.patient_id != patient_id,
+        SlotHold.expires_at > datetime.utcnow()
+    ))
+    if held_by_other is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="That slot is being booked by another patient"
+        )
+    await db.execute(delete(SlotHold).where(
+        SlotHold.doctor_id == doctor_user_id,
+        SlotHold.start_time == start
+    ))
+    return await insert_booking(db, doctor, patient_id, start, reason)
+
+
+async def confirm_hold(db, hold_id: int, patient_id: int, reason: Optional[str]) -> Tuple[Appointment, Affected]:
+    """Turn a live hold into a pending appointment; the caller commits"""
+    hold = (await db.execute(delete(SlotHold).where(
+        SlotHold.id == hold_id,
+        SlotHold.patient_id == patient_id,
+        SlotHold.expires_at > datetime.utcnow()
+    ).returning(SlotHold.doctor_id, SlotHold.start_time))).first()
+    if hold is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found or expired"
+        )
+    doctor = await db.scalar(select(Doctor).where(Doctor.user_id == hold.doctor_id))
+    if doctor is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    return await insert_booking(db, doctor, patient_id, hold.start_time, reason)
+
+
+async def set_status(db, appointment: Appointment, new_status: AppointmentStatus) -> Optional[Affected]:
+    """
+    Change an appointment's status and update stored slots when it starts or
+    stops holding its slot; the caller commits
+    """
+    was_active = appointment.status in ACTIVE_STATUSES
+    appointment.status = new_status
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another booking already holds that slot"
+        )
+    if was_active and new_status not in ACTIVE_STATUSES:
+        # A freed slot can only be found by rebuilding the day
+        return await refresh_booking_slots(db, appointment.doctor_id, appointment.appointment_date)
+    if not was_active and new_status in ACTIVE_STATUSES:
+        doctor = await db.scalar(select(Doctor).where(Doctor.user_id == appointment.doctor_id))
+        if doctor is not None:
+            return await block_booking_slots(db, doctor, appointment.appointment_date)
+    return None
+
+
+async def purge_expired_holds() -> int:
+    """Delete expired holds and drop the cached slots they were hiding"""
+    db = new_async_session()
+    try:
+        purged = (await db.execute(delete(SlotHold).where(
+            SlotHold.expires_at <= datetime.utcnow()
+        ).returning(SlotHold.doctor_id, SlotHold.start_time))).all()
+        affected = await hold_days(db, purged)
+        await db.commit()
+    finally:
+        await db.close()
+    for doctor_id, days in affected:
+        await slot_cache.invalidate(doctor_id, days)
+    return len(purged)
+
+
+async def run_hold_cleanup(interval: int):
+    """Background loop started from the app lifespan"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await purge_expired_holds()
+        except Exception as e:
+            logging.error(f"Slot hold cleanup failed: {str(e)}")
@@ -1,9 +1,17 @@
-import cloudinary
 from core.config import settings
+from core.lazy_imports import deferred
 
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True
-)
+
+@deferred("cloudinary")
+def cloudinary_uploader():
+    """cloudinary.uploader, configured from settings on first use"""
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET,
+        secure=True
+    )
+    return cloudinary.uploader
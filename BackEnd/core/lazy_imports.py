@@ -0,0 +1,71 @@
+# core/lazy_imports.py
+"""
+Deferred imports for heavy dependencies only a few endpoints need.
+
+google.auth (with requests and certifi), cloudinary and passlib add tens of
+milliseconds to every worker boot, including each --max-requests recycle.
+Modules wrap them in a @deferred loader that imports and configures on first
+call and caches the result:
+
+    @deferred("cloudinary")
+    def cloudinary_uploader():
+        import cloudinary.uploader
+        ...
+        return cloudinary.uploader
+
+With FAST_BOOT on (the default) that first call happens on the first request
+that needs it. With it off, create_app() runs every loader up front, which
+is worth it under gunicorn --preload, where the master pays once for all
+workers (gunicorn.conf.py turns it off for that reason). get_import_stats() reports what was loaded and how long each took.
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+_loaders: Dict[str, Callable] = {}
+_load_seconds: Dict[str, float] = {}
+
+
+def deferred(name: str):
+    """Cache a loader's result and time its first call"""
+
+    def decorate(loader: Callable) -> Callable:
+        lock = threading.Lock()
+        loaded = []
+
+        def get():
+            if loaded:
+                return loaded[0]
+            # Threadpool handlers may race on the first call
+            with lock:
+                if not loaded:
+                    started = time.perf_counter()
+                    loaded.append(loader())
+                    _load_seconds[name] = time.perf_counter() - started
+            return loaded[0]
+
+        get.__name__ = loader.__name__
+        get.__doc__ = loader.__doc__
+        _loaders[name] = get
+        return get
+
+    return decorate
+
+
+def load_all():
+    """Run every registered loader now instead of on first use"""
+    for get in _loaders.values():
+        get()
+
+
+def get_import_stats(boot_seconds: Optional[float] = None) -> dict:
+    """Deferred imports of this worker: load time in ms, or None if not loaded yet"""
+    stats = {
+        "deferred": {
+            name: round(_load_seconds[name] * 1000, 1) if name in _load_seconds else None
+            for name in _loaders
+        }
+    }
+    if boot_seconds is not None:
+        stats["boot_ms"] = round(boot_seconds * 1000, 1)
+    return stats
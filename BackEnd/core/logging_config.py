@@ -1,17 +1,25 @@
 # core/logging_config.py
+import atexit
+import copy
 import logging
 import logging.handlers
 import os
+import queue
 from pathlib import Path
 from datetime import datetime
 import json
 
+from pydantic_core import to_json
+
+from core.config import settings
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
     def format(self, record):
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Time the record was created, not when the listener thread got to it
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -23,6 +31,9 @@ class JSONFormatter(logging.Formatter):
         # Add exception info if present
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by DroppingQueueHandler.prepare
+            log_entry["exception"] = record.exc_text
         
         # Add extra fields if present
         if hasattr(record, 'user_id'):
@@ -32,22 +43,51 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, 'ip_address'):
             log_entry["ip_address"] = record.ip_address
         
-        return json.dumps(log_entry)
+        # pydantic_core's encoder is ~3x faster than json.dumps for these records
+        return to_json(log_entry, fallback=str).decode()
 
-def setup_logging():
-    """Setup comprehensive logging configuration"""
-    
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue that drops records instead of blocking.
+
+    The caller only copies the record onto the queue; formatting and file I/O
+    happen on the QueueListener thread. When the listener falls behind and the
+    queue is full, the record is discarded and counted in `dropped`.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Merge args and render the traceback here (they may not be picklable or
+        # may change later), but leave formatting to each sink's own formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# Queue handler and listener installed by setup_logging
+_queue_handler = None
+_listener = None
+
+def build_log_handlers() -> list:
+    """The console and file sinks, each with its own level and formatter"""
     # Create logs directory
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    
-    # Clear existing handlers
-    root_logger.handlers.clear()
-    
     # Console handler for development
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
@@ -55,7 +95,6 @@ def setup_logging():
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler for general logs
     file_handler = logging.handlers.RotatingFileHandler(
@@ -68,7 +107,6 @@ def setup_logging():
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
     
     # JSON file handler for structured logs
     json_handler = logging.handlers.RotatingFileHandler(
@@ -79,7 +117,6 @@ def setup_logging():
     json_handler.setLevel(logging.INFO)
     json_formatter = JSONFormatter()
     json_handler.setFormatter(json_formatter)
-    root_logger.addHandler(json_handler)
     
     # Error file handler
     error_handler = logging.handlers.RotatingFileHandler(
@@ -89,7 +126,6 @@ def setup_logging():
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(json_formatter)
-    root_logger.addHandler(error_handler)
     
     # Security log handler
     security_handler = logging.handlers.RotatingFileHandler(
@@ -99,7 +135,36 @@ def setup_logging():
     )
     security_handler.setLevel(logging.WARNING)
     security_handler.setFormatter(json_formatter)
-    root_logger.addHandler(security_handler)
+    
+    return [console_handler, file_handler, json_handler, error_handler, security_handler]
+
+def setup_logging():
+    """
+    Setup comprehensive logging configuration.
+
+    The root logger gets a single non-blocking queue handler; the sinks from
+    build_log_handlers() run on a background QueueListener thread so request
+    handlers never wait on file writes or rotation.
+    """
+    global _queue_handler, _listener
+    
+    # Configure root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    
+    # Clear existing handlers
+    root_logger.handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+    
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAXSIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    root_logger.addHandler(_queue_handler)
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, *build_log_handlers(), respect_handler_level=True
+    )
+    _listener.start()
     
     # Configure specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -108,6 +173,25 @@ def setup_logging():
     
     return root_logger
 
+def stop_logging():
+    """Flush queued records to the sinks and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+def get_log_stats() -> dict:
+    """Queue depth and dropped-record count for this worker process"""
+    if _queue_handler is None:
+        return {"queued": 0, "capacity": settings.LOG_QUEUE_MAXSIZE, "dropped": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance"""
     return logging.getLogger(name)
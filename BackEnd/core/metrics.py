@@ -0,0 +1,502 @@
+# core/metrics.py
+"""
+Request, database and runtime metrics.
+
+RequestPipelineMiddleware records every request's status and latency here,
+keyed on (method, route template), and the engine event hooks count queries
+and their duration per request. Readings are per worker process:
+
+- /health/latency serves p50/p90/p99 per route for the answering worker.
+- /metrics serves everything in the Prometheus text format, aggregated across
+  the Gunicorn workers. Each worker periodically writes a snapshot to
+  METRICS_DIR; counters and histograms are summed over every snapshot
+  (including workers that have exited), gauges are reported per live worker
+  with a pid label. Monotonic readings of other components (hash pool
+  rejections, slot cache hits, IP blocks, ...) are counters too, so they
+  survive worker restarts.
+"""
+import asyncio
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+
+# Upper bounds in seconds (the last bucket catches everything above)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+# Queries issued by one request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf"))
+# Event-loop lag in seconds
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf"))
+# Seconds between event-loop lag probes
+LOOP_LAG_PROBE_INTERVAL = 0.5
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+
+class RouteLatency:
+    """Latency histograms keyed on (method, route template)."""
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, seconds: float):
+        histogram = self.histograms.get((method, route))
+        if histogram is None:
+            histogram = self.histograms[(method, route)] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            f"{method} {route}": {
+                "count": histogram.count,
+                "mean_ms": round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0,
+                "p50_ms": round(histogram.quantile(0.5) * 1000, 3),
+                "p90_ms": round(histogram.quantile(0.9) * 1000, 3),
+                "p99_ms": round(histogram.quantile(0.99) * 1000, 3),
+            }
+            for (method, route), histogram in sorted(self.histograms.items())
+        }
+
+    def clear(self):
+        self.histograms.clear()
+
+
+route_latency = RouteLatency()
+
+
+# ----------------------
+# Per-request query stats
+# ----------------------
+class QueryStats:
+    """Queries issued while serving one request, with a count per statement text"""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed more than threshold times (likely N+1 lazy loads)"""
+        if self.count <= threshold:
+            return []
+        return [(statement, count) for statement, count in self.statements.items() if count > threshold]
+
+
+# Set by RequestPipelineMiddleware; engine events running in the request's task
+# (or in threadpool workers, which copy the context) update the same object
+current_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class Metrics:
+    """Counters and histograms for this worker process."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.route_latency = route_latency
+        self.queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = Histogram(LATENCY_BUCKETS)
+        self.queries = 0
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.last_loop_lag = 0.0
+        # Engine events fire on threadpool workers too
+        self._db_lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float,
+                        query_stats: Optional[QueryStats] = None):
+        key = (method, route, str(status_code))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.route_latency.observe(method, route, seconds)
+        if query_stats is not None:
+            self.queries_per_request.observe(query_stats.count)
+
+    def observe_query(self, statement: str, seconds: float):
+        with self._db_lock:
+            self.queries += 1
+            self.query_seconds.observe(seconds)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            # Bound parameters are placeholders, so the text is the statement's shape
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    def observe_loop_lag(self, seconds: float):
+        self.last_loop_lag = seconds
+        self.loop_lag.observe(seconds)
+
+    def snapshot(self) -> dict:
+        """This worker's readings in the on-disk snapshot format"""
+        histograms = {
+            "bukcare_http_request_duration_seconds": [
+                ({"method": method, "route": route}, histogram)
+                for (method, route), histogram in self.route_latency.histograms.items()
+            ],
+            "bukcare_db_queries_per_request": [({}, self.queries_per_request)],
+            "bukcare_db_query_duration_seconds": [({}, self.query_seconds)],
+            "bukcare_event_loop_lag_seconds": [({}, self.loop_lag)],
+        }
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "counters": {
+                "bukcare_http_requests_total": [
+                    [{"method": method, "route": route, "status": status_code}, value]
+                    for (method, route, status_code), value in self.requests.items()
+                ],
+                "bukcare_db_queries_total": [[{}, self.queries]],
+                **collect_counters(),
+            },
+            "histograms": {
+                name: [
+                    [labels, list(histogram.buckets), list(histogram.counts), histogram.sum, histogram.count]
+                    for labels, histogram in series
+                ]
+                for name, series in histograms.items()
+            },
+            "gauges": collect_gauges(),
+        }
+
+    async def run_loop_lag_monitor(self, interval: float):
+        """Background loop started from the app lifespan"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.observe_loop_lag(max(loop.time() - started - interval, 0.0))
+
+    async def run_flush(self, interval: int):
+        """Background loop started from the app lifespan"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Read on the event loop, write from the threadpool
+                await run_in_threadpool(self.flush, self.snapshot())
+            except Exception as e:
+                logging.error(f"Metrics flush failed: {str(e)}")
+
+    def flush(self, snapshot: Optional[dict] = None):
+        """Write this worker's snapshot (taken now unless given) to METRICS_DIR"""
+        metrics_dir = Path(settings.METRICS_DIR)
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        path = metrics_dir / f"worker-{os.getpid()}-{int(self.started * 1000)}.json"
+        tmp_path = path.with_suffix(".tmp")
+        # json writes the +Inf bucket bound as Infinity, which json.loads reads back
+        tmp_path.write_text(json.dumps(snapshot or self.snapshot()))
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+
+
+# ----------------------
+# Engine instrumentation
+# ----------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics.observe_query(statement, time.perf_counter() - context._query_started)
+
+def instrument_engine(engine):
+    """Count queries and their duration on a sync Engine (or AsyncEngine.sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ----------------------
+# Counters and gauges of other components
+# ----------------------
+def collect_counters() -> Dict[str, List[list]]:
+    """Monotonic totals kept by the caches, pools and blocklist of this worker"""
+    # Imported here: these modules import core.metrics themselves
+    from core.logging_config import get_log_stats
+    from core.slot_cache import slot_cache
+    from core.security import password_hash_pool
+    from middleware.security import security_middleware
+
+    blocklist = security_middleware.get_stats()
+    return {
+        "bukcare_password_hash_rejected_total": [[{}, password_hash_pool.rejected]],
+        "bukcare_slot_cache_hits_total": [[{}, slot_cache.hits]],
+        "bukcare_slot_cache_misses_total": [[{}, slot_cache.misses]],
+        "bukcare_slot_cache_invalidations_total": [[{}, slot_cache.invalidations]],
+        "bukcare_ip_blocks_total": [[{}, blocklist["blocks"]]],
+        "bukcare_ip_blocklist_evictions_total": [[{}, blocklist["evictions"]]],
+        "bukcare_log_records_dropped_total": [[{}, get_log_stats()["dropped"]]],
+    }
+
+
+def collect_gauges() -> Dict[str, List[list]]:
+    """Point-in-time readings from the pools, caches and limiters of this worker"""
+    # Imported here: these modules import core.metrics themselves
+    import anyio.to_thread
+    from core.database import get_pool_status
+    from core.logging_config import get_log_stats
+    from core.principal_cache import principal_cache
+    from core.slot_cache import slot_cache
+    from core.security import password_hash_pool
+    from middleware.rate_limit_store import rate_limit_store
+    from middleware.security import security_middleware
+
+    gauges: Dict[str, List[list]] = {}
+
+    def add(name: str, value, **labels):
+        gauges.setdefault(name, []).append([labels, value])
+
+    for engine_name, pool in get_pool_status().items():
+        if not isinstance(pool, dict):
+            continue
+        for field in ("pool_size", "checked_out", "idle", "overflow"):
+            add(f"bukcare_db_pool_{field}", pool[field], engine=engine_name)
+
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        add("bukcare_threadpool_busy_threads", limiter.borrowed_tokens)
+        add("bukcare_threadpool_max_threads", limiter.total_tokens)
+    except RuntimeError:
+        # No running event loop (flush at exit)
+        pass
+
+    add("bukcare_password_hash_in_flight", password_hash_pool.in_flight)
+    add("bukcare_principal_cache_entries", len(principal_cache))
+
+    slot_cache_entries = slot_cache.size()
+    if slot_cache_entries is not None:
+        add("bukcare_slot_cache_entries", slot_cache_entries)
+
+    limiter_keys = rate_limit_store.size()
+    if limiter_keys is not None:
+        add("bukcare_rate_limiter_keys", limiter_keys)
+
+    blocklist = security_middleware.get_stats()
+    add("bukcare_blocked_ips", blocklist["blocked_ips"])
+    add("bukcare_tracked_ips", blocklist["tracked_ips"])
+
+    log_queue = get_log_stats()
+    add("bukcare_log_queue_depth", log_queue["queued"])
+
+    add("bukcare_event_loop_lag_last_seconds", metrics.last_loop_lag)
+    return gauges
+
+
+# ----------------------
+# Aggregation and exposition
+# ----------------------
+ARCHIVE_FILE = "archive.json"
+
+METRIC_HELP = {
+    "bukcare_http_requests_total": ("counter", "HTTP requests by method, route template and status"),
+    "bukcare_db_queries_total": ("counter", "SQL statements executed"),
+    "bukcare_http_request_duration_seconds": ("histogram", "HTTP request latency by method and route template"),
+    "bukcare_db_queries_per_request": ("histogram", "SQL statements executed per HTTP request"),
+    "bukcare_db_query_duration_seconds": ("histogram", "SQL statement execution time"),
+    "bukcare_event_loop_lag_seconds": ("histogram", "Delay of the event loop in waking a sleeping task"),
+    "bukcare_password_hash_rejected_total": ("counter", "Password hashes refused because the hashing pool was full"),
+    "bukcare_slot_cache_hits_total": ("counter", "Free-slot lookups answered from the slot cache"),
+    "bukcare_slot_cache_misses_total": ("counter", "Free-slot lookups that missed the slot cache"),
+    "bukcare_slot_cache_invalidations_total": ("counter", "Slot cache invalidations after booking or schedule changes"),
+    "bukcare_ip_blocks_total": ("counter", "Client IPs blocked by the security screen"),
+    "bukcare_ip_blocklist_evictions_total": ("counter", "Blocked IPs evicted early because the blocklist was full"),
+    "bukcare_log_records_dropped_total": ("counter", "Log records dropped because the log queue was full"),
+}
+
+
+def _labels_key(labels: dict) -> LabelSet:
+    return tuple(sorted(labels.items()))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(total: dict, snapshot: dict):
+    """Add a snapshot's counters and histograms into total"""
+    for name, series in snapshot.get("counters", {}).items():
+        merged = total["counters"].setdefault(name, {})
+        for labels, value in series:
+            key = _labels_key(labels)
+            merged[key] = merged.get(key, 0) + value
+    for name, series in snapshot.get("histograms", {}).items():
+        merged = total["histograms"].setdefault(name, {})
+        for labels, buckets, counts, hist_sum, count in series:
+            key = _labels_key(labels)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = [list(buckets), list(counts), hist_sum, count]
+            else:
+                current[1] = [a + b for a, b in zip(current[1], counts)]
+                current[2] += hist_sum
+                current[3] += count
+
+
+def _to_snapshot(total: dict) -> dict:
+    return {
+        "counters": {
+            name: [[dict(key), value] for key, value in series.items()]
+            for name, series in total["counters"].items()
+        },
+        "histograms": {
+            name: [[dict(key), *values] for key, values in series.items()]
+            for name, series in total["histograms"].items()
+        },
+    }
+
+
+@contextmanager
+def _locked(metrics_dir: Path):
+    with open(metrics_dir / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def aggregate(snapshot: Optional[dict] = None) -> dict:
+    """
+    Combine every worker snapshot in METRICS_DIR, after writing this worker's
+    (snapshot, or one taken now).
+
+    Snapshots of exited workers are folded into an archive file so their
+    counts survive Gunicorn's --max-requests restarts without the directory
+    growing. Blocks on file I/O and the directory lock: call it from a thread.
+    """
+    metrics.flush(snapshot)
+    metrics_dir = Path(settings.METRICS_DIR)
+    total = {"counters": {}, "histograms": {}, "gauges": {}}
+
+    with _locked(metrics_dir):
+        archive_path = metrics_dir / ARCHIVE_FILE
+        archive = {"counters": {}, "histograms": {}}
+        if archive_path.exists():
+            _merge(archive, json.loads(archive_path.read_text()))
+
+        dead = []
+        for path in metrics_dir.glob("worker-*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(snapshot["pid"]) and (
+                snapshot["pid"] != os.getpid() or snapshot["started"] == metrics.started
+            ):
+                _merge(total, snapshot)
+                for name, series in snapshot.get("gauges", {}).items():
+                    for labels, value in series:
+                        total["gauges"].setdefault(name, []).append(
+                            [{**labels, "pid": str(snapshot["pid"])}, value]
+                        )
+            else:
+                _merge(archive, snapshot)
+                dead.append(path)
+
+        if dead:
+            tmp_path = archive_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(_to_snapshot(archive)))
+            os.replace(tmp_path, archive_path)
+            for path in dead:
+                path.unlink(missing_ok=True)
+
+    _merge(total, _to_snapshot(archive))
+    return total
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelSet, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(total: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines: List[str] = []
+
+    def header(name: str, kind: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for name, series in sorted(total["counters"].items()):
+        header(name, "counter", METRIC_HELP.get(name, ("", name))[1])
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for name, series in sorted(total["histograms"].items()):
+        header(name, "histogram", METRIC_HELP.get(name, ("", name))[1])
+        for labels, (buckets, counts, hist_sum, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                le = _format_bound(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist_sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    for name, series in sorted(total["gauges"].items()):
+        header(name, "gauge", name.replace("bukcare_", "").replace("_", " "))
+        for labels, value in sorted(series, key=lambda item: _labels_key(item[0])):
+            lines.append(f"{name}{_format_labels(_labels_key(labels))} {value}")
+
+    return "\n".join(lines) + "\n"
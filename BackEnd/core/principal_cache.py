@@ -0,0 +1,70 @@
+# core/principal_cache.py
+"""
+Short-TTL cache of authenticated principals.
+
+get_current_principal reads the slim snapshot from here so most authenticated
+requests skip the users SELECT. The cache is per worker process: handlers that
+change role, is_active or is_profile_complete must call
+principal_cache.invalidate(user_id) after committing, and the TTL bounds how
+long other workers can serve a stale snapshot.
+"""
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from cachetools import TTLCache
+
+from core.config import settings
+from models.users import UserRole
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only identity snapshot of a user row."""
+    id: int
+    role: UserRole
+    is_active: bool
+    is_profile_complete: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            is_active=bool(user.is_active),
+            is_profile_complete=bool(user.is_profile_complete),
+        )
+
+
+class PrincipalCache:
+    """Bounded TTL cache (LRU eviction when full) keyed on user_id."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Sync dependencies run on threadpool workers, and TTLCache is not thread-safe
+        self._lock = Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            return self._cache.get(user_id)
+
+    def set(self, principal: Principal):
+        with self._lock:
+            self._cache[principal.id] = principal
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
@@ -0,0 +1,40 @@
+# core/responses.py
+"""
+JSON rendering through pydantic-core.
+
+FastAPI validates a handler's return value against its response_model,
+serializes it to JSON-compatible Python objects, and the stock JSONResponse
+then walks those again with the stdlib json module. FastJSONResponse, the
+app's default response class, renders them with pydantic_core.to_json
+instead (same compact UTF-8 output).
+
+The list endpoints go one step further with typed_json(): it validates and
+dumps straight to bytes in a single pydantic-core pass and returns the
+Response itself, so FastAPI's own validate/serialize/render round trip is
+skipped. Routes keep their response_model, which still documents the payload.
+"""
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def typed_json(adapter: TypeAdapter, content: Any, response: Optional[Response] = None) -> Response:
+    """
+    Render content (models, ORM objects or dicts) as adapter's type.
+
+    Headers set on the injected `response` (such as X-Next-Cursor) are
+    carried over; FastAPI only merges them into responses it builds itself.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    rendered = Response(body, media_type="application/json")
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
@@ -1,15 +1,21 @@
 # core/security.py
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from core.config import settings
+from core.lazy_imports import deferred
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (passlib loads on first use; see core/lazy_imports.py)
+@deferred("passlib")
+def pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT settings
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_ACCESS_TOKEN_LIFETIME_MINUTES
@@ -29,7 +35,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not plain_password or not hashed_password:
         return False
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return pwd_context().verify(plain_password, hashed_password)
     except Exception:
         return False
 
@@ -39,7 +45,78 @@ def get_password_hash(password: str) -> str:
         raise ValueError("Password cannot be empty")
     if len(password) < settings.PASSWORD_MIN_LENGTH:
         raise ValueError(f"Password must be at least {settings.PASSWORD_MIN_LENGTH} characters long")
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+# ----------------------
+# Bounded password hashing pool
+# ----------------------
+class PasswordHashPool:
+    """
+    Dedicated bcrypt executor with a queue-depth limit.
+
+    bcrypt holds a thread for ~100ms+ per call. Running it here keeps it off
+    the event loop and out of the Starlette threadpool, and once
+    `workers + max_pending` jobs are in flight new callers get a 503 instead
+    of queueing behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._capacity = workers + max_pending
+        self._slots = threading.BoundedSemaphore(self._capacity)
+        # Jobs holding a slot; done callbacks run on the pool's threads
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _acquire(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._count_lock:
+            self._in_flight += 1
+        return True
+
+    def _release(self, _future=None):
+        with self._count_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn, *args):
+        if not self._acquire():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # Release on completion, not on await, so cancelled requests keep their slot until bcrypt finishes
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bounded hashing pool. Raises 503 when saturated."""
+    if not plain_password or not hashed_password:
+        return False
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bounded hashing pool. Raises 503 when saturated."""
+    return await password_hash_pool.run(get_password_hash, password)
 
 # ----------------------
 # JWT token creation
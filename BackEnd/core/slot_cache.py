@@ -0,0 +1,185 @@
+"""
+Read-through cache of one doctor's free slots for one day.
+
+GET /schedules/doctor/{id}/available-slots looks here first, keyed on
+(doctor_id, day). A hit costs one primary-key read of the doctor's row in
+slot_cache_generations; neither the doctor row nor its slots are read.
+
+Every invalidation bumps that per-doctor generation in the database, and
+each entry remembers the generation it was computed under, so an entry
+cached by any worker stops matching as soon as another worker writes. The
+generation is read before the slots are computed: a write that commits in
+between leaves the entry stale from the start, never the other way round.
+
+Writers invalidate after committing:
+
+- appointment create / status change / cancel: the days the booking spans
+  (as returned by core/booking.py)
+- schedule create / update / delete: the row's date, or every cached day of
+  the doctor for a weekly rule
+- slot policy change (slot length or buffer): every cached day of the doctor
+- slot hold claim / release, and the expiry sweep (run_hold_cleanup): the
+  days of the holds involved, since held slots are left out of the list
+
+Entries also expire after SLOT_CACHE_TTL; run_cleanup() sweeps them out.
+
+The only backend is an in-process bounded LRU with TTL (SLOT_CACHE_STORE
+"memory"). Storing the slot lists themselves in a shared Postgres table was
+tried and dropped: a lookup there costs a round-trip much like the indexed
+doctor_slots range scan it would save (benchmarks/bench_slot_cache.py).
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import date
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import text
+
+from core.config import settings
+from core.database import execute_autocommit
+from utils.slots import Interval
+
+Key = Tuple[int, date]
+# (generation the slots were computed under, slots)
+Entry = Tuple[int, List[Interval]]
+
+READ_GENERATION = text(
+    "SELECT generation FROM slot_cache_generations WHERE doctor_id = :doctor_id"
+)
+BUMP_GENERATION = text(
+    "INSERT INTO slot_cache_generations (doctor_id, generation) VALUES (:doctor_id, 1) "
+    "ON CONFLICT (doctor_id) DO UPDATE SET generation = slot_cache_generations.generation + 1"
+)
+
+
+class SlotCache(ABC):
+    """Where cached slot lists live; subclasses implement the _-prefixed methods"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, doctor_id: int, day: date) -> Tuple[Optional[List[Interval]], int]:
+        """
+        The cached slots (None on a miss) and the doctor's current generation,
+        which a miss passes back to set() with the slots it computes
+        """
+        generation = await self._generation(doctor_id)
+        entry = await self._get((doctor_id, day))
+        if entry is None or entry[0] != generation:
+            self.misses += 1
+            return None, generation
+        self.hits += 1
+        return entry[1], generation
+
+    async def set(self, doctor_id: int, day: date, generation: int, slots: List[Interval]):
+        await self._set((doctor_id, day), (generation, slots))
+
+    async def invalidate(self, doctor_id: int, days: Iterable[date]):
+        """Retire the doctor's entries on every worker; this worker also drops these days"""
+        self.invalidations += 1
+        await self._bump(doctor_id)
+        await self._invalidate([(doctor_id, day) for day in days])
+
+    async def invalidate_doctor(self, doctor_id: int):
+        """Retire every entry of the doctor (weekly rules and policy changes touch all days)"""
+        self.invalidations += 1
+        await self._bump(doctor_id)
+        await self._invalidate_doctor(doctor_id)
+
+    async def _generation(self, doctor_id: int) -> int:
+        rows = await execute_autocommit(READ_GENERATION, {"doctor_id": doctor_id}, fetch=True)
+        return rows[0][0] if rows else 0
+
+    async def _bump(self, doctor_id: int):
+        await execute_autocommit(BUMP_GENERATION, {"doctor_id": doctor_id})
+
+    async def cleanup(self):
+        """Purge expired entries; a no-op where the backend expires them itself"""
+
+    def size(self) -> Optional[int]:
+        """Entries held by this process, or None when they live elsewhere"""
+        return None
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "store": settings.SLOT_CACHE_STORE,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "entries": self.size(),
+        }
+
+    async def run_cleanup(self, interval: int):
+        """Background loop started from the app lifespan"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.cleanup()
+            except Exception as e:
+                logging.error(f"Slot cache cleanup failed: {str(e)}")
+
+    @abstractmethod
+    async def _get(self, key: Key) -> Optional[Entry]:
+        ...
+
+    @abstractmethod
+    async def _set(self, key: Key, entry: Entry):
+        ...
+
+    @abstractmethod
+    async def _invalidate(self, keys: List[Key]):
+        ...
+
+    @abstractmethod
+    async def _invalidate_doctor(self, doctor_id: int):
+        ...
+
+
+class InMemorySlotCache(SlotCache):
+    """Per-process bounded TTL cache (LRU eviction when full)"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        super().__init__()
+        self._cache: Dict[Key, Entry] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+
+    async def _get(self, key: Key) -> Optional[Entry]:
+        with self._lock:
+            return self._cache.get(key)
+
+    async def _set(self, key: Key, entry: Entry):
+        with self._lock:
+            self._cache[key] = entry
+
+    async def _invalidate(self, keys: List[Key]):
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+
+    async def _invalidate_doctor(self, doctor_id: int):
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == doctor_id]:
+                self._cache.pop(key, None)
+
+    async def cleanup(self):
+        with self._lock:
+            self._cache.expire()
+
+    def size(self) -> Optional[int]:
+        return len(self._cache)
+
+
+def create_slot_cache(backend: str) -> SlotCache:
+    """Build the cache selected by SLOT_CACHE_STORE"""
+    if backend == "memory":
+        return InMemorySlotCache(settings.SLOT_CACHE_MAXSIZE, settings.SLOT_CACHE_TTL)
+    raise ValueError(f"Unknown slot cache store '{backend}'. Use 'memory'")
+
+slot_cache = create_slot_cache(settings.SLOT_CACHE_STORE)
@@ -0,0 +1,283 @@
+# core/slot_horizon.py
+"""
+Rolling table of precomputed free slots (doctor_slots).
+
+Each doctor's weekly rules, date-specific rows and bookings are expanded with
+utils/slots.py into free slots and stored from today up to Doctor.slot_horizon,
+so a lookup inside the horizon is one indexed range scan:
+
+    SELECT start_time, end_time FROM doctor_slots
+    WHERE doctor_id = ? AND start_time >= ? AND start_time < ?
+
+Keeping it current:
+
+- SlotHorizon.run_extend(), started from the app lifespan, moves every
+  doctor's horizon to today + SLOT_HORIZON_WEEKS, materializing only the
+  new days, and drops days that have passed. Each worker runs it; a
+  compare-and-set on slot_horizon lets one worker claim a batch and the
+  rest skip it.
+- Handlers that change availability rows, a slot policy or cancel a booking
+  call refresh_slots() / refresh_booking_slots() in the same transaction,
+  which rebuilds the affected days inside the horizon. New bookings call
+  block_booking_slots(), which only deletes the slots they overlap.
+
+Days beyond the horizon (or doctors the job has not reached yet) are
+computed on the fly with compute_slots(), the same expansion.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+
+from core.config import settings
+from core.database import new_async_session
+from models.appointment import Appointment, AppointmentStatus, SlotHold
+from models.doctor import Doctor, DoctorAvailability, DoctorSlot
+from utils.slots import Interval, SlotPolicy, booking_days, day_windows, iter_free_slots
+
+ACTIVE_STATUSES = [AppointmentStatus.CONFIRMED, AppointmentStatus.PENDING]
+
+
+def midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def days_between(first_day: date, last_day: date) -> List[date]:
+    return [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+
+
+async def compute_slots(db, doctor_clauses: list, first_day: date, last_day: date) -> Dict[int, Iterator[Interval]]:
+    """
+    Lazy free-slot streams for every doctor matching doctor_clauses that has
+    availability over [first_day, last_day], in two queries: availability
+    rows (date-specific in range plus weekly rules) with the doctor's slot
+    policy, then active bookings.
+    """
+    range_start, range_end = midnight(first_day), midnight(last_day) + timedelta(days=1)
+    rows = defaultdict(list)
+    policies = {}
+    for row in await db.execute(select(
+        Doctor.doctor_id, Doctor.slot_minutes, Doctor.buffer_minutes,
+        DoctorAvailability.date, DoctorAvailability.day_of_week,
+        DoctorAvailability.start_time, DoctorAvailability.end_time,
+        DoctorAvailability.is_available, DoctorAvailability.is_active
+    ).join(DoctorAvailability, DoctorAvailability.doctor_id == Doctor.doctor_id).where(
+        *doctor_clauses,
+        or_(
+            and_(DoctorAvailability.date >= range_start, DoctorAvailability.date < range_end),
+            and_(DoctorAvailability.date.is_(None), DoctorAvailability.day_of_week.isnot(None))
+        )
+    )):
+        rows[row.doctor_id].append(row)
+        policies[row.doctor_id] = SlotPolicy(slot_minutes=row.slot_minutes, buffer_minutes=row.buffer_minutes)
+
+    bookings = defaultdict(list)
+    if rows:
+        for doctor_id, appointment_date in await db.execute(select(
+            Doctor.doctor_id, Appointment.appointment_date
+        ).join(Doctor, Doctor.user_id == Appointment.doctor_id).where(
+            Doctor.doctor_id.in_(list(rows)),
+            # A booking just before the range can still block its first slot
+            Appointment.appointment_date >= range_start - timedelta(days=1),
+            Appointment.appointment_date < range_end,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        )):
+            bookings[doctor_id].append(appointment_date)
+
+    days = days_between(first_day, last_day)
+    return {
+        doctor_id: iter_free_slots(
+            [window for day in days for window in day_windows(doctor_rows, day)],
+            bookings[doctor_id],
+            policies[doctor_id]
+        )
+        for doctor_id, doctor_rows in rows.items()
+    }
+
+
+async def materialize(db, doctor_ids: List[int], first_day: date, last_day: date) -> int:
+    """Replace the doctors' stored slots over [first_day, last_day]; returns slots written"""
+    if not doctor_ids or last_day < first_day:
+        return 0
+    range_start, range_end = midnight(first_day), midnight(last_day) + timedelta(days=1)
+    await db.execute(delete(DoctorSlot).where(
+        DoctorSlot.doctor_id.in_(doctor_ids),
+        DoctorSlot.start_time >= range_start,
+        DoctorSlot.start_time < range_end
+    ))
+    slots = [
+        {"doctor_id": doctor_id, "start_time": start, "end_time": end}
+        for doctor_id, stream in (await compute_slots(
+            db, [Doctor.doctor_id.in_(doctor_ids)], first_day, last_day
+        )).items()
+        for start, end in stream
+    ]
+    if slots:
+        await db.execute(insert(DoctorSlot), slots)
+    return len(slots)
+
+
+async def refresh_slots(db, doctor_id: int, first_day: Optional[date] = None, last_day: Optional[date] = None):
+    """
+    Rebuild a doctor's stored days in [first_day, last_day] (default: all of
+    them) after a change, as part of the caller's transaction
+    """
+    # Pending changes must be visible to compute_slots
+    await db.flush()
+    # Row lock: a concurrent horizon extension waits for this transaction and
+    # then reads its changes
+    horizon = await db.scalar(
+        select(Doctor.slot_horizon).where(Doctor.doctor_id == doctor_id).with_for_update()
+    )
+    if horizon is None:
+        return
+    today = datetime.utcnow().date()
+    first_day = max(first_day or today, today)
+    last_day = min(last_day or horizon, horizon)
+    await materialize(db, [doctor_id], first_day, last_day)
+
+
+async def refresh_booking_slots(db, doctor_user_id: int, appointment_date: datetime) -> Optional[Tuple[int, List[date]]]:
+    """
+    Rebuild the days a booking by this doctor's user id can block; returns
+    (doctor_id, days) for cache invalidation, or None for an unknown doctor
+    """
+    doctor = await db.scalar(select(Doctor).where(Doctor.user_id == doctor_user_id))
+    if doctor is None:
+        return None
+    days = booking_days(appointment_date, SlotPolicy(doctor.slot_minutes, doctor.buffer_minutes))
+    await refresh_slots(db, doctor.doctor_id, days[0], days[-1])
+    return doctor.doctor_id, days
+
+
+async def day_slots(db, doctor: Doctor, day: date, include_held: bool = False) -> List[Interval]:
+    """
+    A doctor's free slots on one day: stored inside the horizon, computed
+    outside it. Slots under a live hold are left out unless include_held is
+    set (booking checks holds itself, to tell "held" from "taken")
+    """
+    now = datetime.utcnow()
+    day_start = midnight(day)
+    day_end = day_start + timedelta(days=1)
+    if doctor.slot_horizon is not None and now.date() <= day <= doctor.slot_horizon:
+        # One range scan on (doctor_id, start_time)
+        query = select(DoctorSlot.start_time, DoctorSlot.end_time).where(
+            DoctorSlot.doctor_id == doctor.doctor_id,
+            DoctorSlot.start_time >= day_start,
+            DoctorSlot.start_time < day_end
+        )
+        if not include_held:
+            query = query.where(~select(SlotHold.id).where(
+                SlotHold.doctor_id == doctor.user_id,
+                SlotHold.start_time == DoctorSlot.start_time,
+                SlotHold.expires_at > now
+            ).exists())
+        return [tuple(row) for row in await db.execute(query.order_by(DoctorSlot.start_time))]
+    computed = await compute_slots(db, [Doctor.doctor_id == doctor.doctor_id], day, day)
+    slots = list(computed.get(doctor.doctor_id, []))
+    if include_held or not slots:
+        return slots
+    held = set((await db.scalars(select(SlotHold.start_time).where(
+        SlotHold.doctor_id == doctor.user_id,
+        SlotHold.start_time >= day_start,
+        SlotHold.start_time < day_end,
+        SlotHold.expires_at > now
+    ))).all())
+    return [slot for slot in slots if slot[0] not in held]
+
+
+async def block_booking_slots(db, doctor: Doctor, appointment_date: datetime) -> Tuple[int, List[date]]:
+    """
+    Drop the stored slots a new booking overlaps; returns (doctor_id, days)
+    for cache invalidation.
+
+    Adding a booking only ever removes free slots (the grid is anchored at
+    each window's start), so there is no need to rebuild the day. The FOR
+    SHARE lock lets concurrent bookings of one doctor proceed side by side
+    while still waiting for a horizon extension or rebuild in progress.
+    """
+    policy = SlotPolicy(doctor.slot_minutes, doctor.buffer_minutes)
+    horizon = await db.scalar(
+        select(Doctor.slot_horizon).where(Doctor.doctor_id == doctor.doctor_id).with_for_update(read=True)
+    )
+    if horizon is not None:
+        await db.execute(delete(DoctorSlot).where(
+            DoctorSlot.doctor_id == doctor.doctor_id,
+            DoctorSlot.start_time < appointment_date + policy.length + policy.buffer,
+            DoctorSlot.end_time > appointment_date - policy.buffer
+        ))
+    return doctor.doctor_id, booking_days(appointment_date, policy)
+
+
+class SlotHorizon:
+    """Background extension of every doctor's materialized horizon"""
+
+    def __init__(self, weeks: int, batch_size: int):
+        self.weeks = weeks
+        self.batch_size = batch_size
+
+    def target(self, today: date) -> date:
+        return today + timedelta(weeks=self.weeks) - timedelta(days=1)
+
+    async def extend(self) -> int:
+        """Materialize every doctor up to the target horizon; returns doctors extended"""
+        today = datetime.utcnow().date()
+        target = self.target(today)
+        db = new_async_session()
+        try:
+            await db.execute(delete(DoctorSlot).where(DoctorSlot.start_time < midnight(today)))
+            await db.commit()
+            behind = (await db.execute(select(Doctor.doctor_id, Doctor.slot_horizon).where(
+                or_(Doctor.slot_horizon.is_(None), Doctor.slot_horizon < target)
+            ))).all()
+        finally:
+            await db.close()
+
+        by_horizon = defaultdict(list)
+        for doctor_id, horizon in behind:
+            by_horizon[horizon].append(doctor_id)
+
+        extended = 0
+        for horizon, doctor_ids in by_horizon.items():
+            for i in range(0, len(doctor_ids), self.batch_size):
+                extended += await self.extend_batch(doctor_ids[i:i + self.batch_size], horizon, today, target)
+        return extended
+
+    async def extend_batch(self, doctor_ids: List[int], horizon: Optional[date], today: date, target: date) -> int:
+        db = new_async_session()
+        try:
+            # Claim the doctors still at the horizon we read; another worker
+            # may already have moved some of them
+            claimed = (await db.execute(
+                update(Doctor).where(
+                    Doctor.doctor_id.in_(doctor_ids),
+                    Doctor.slot_horizon.is_(None) if horizon is None else Doctor.slot_horizon == horizon
+                ).values(slot_horizon=target).returning(Doctor.doctor_id)
+                .execution_options(synchronize_session=False)
+            )).scalars().all()
+            first_day = today if horizon is None else max(horizon + timedelta(days=1), today)
+            await materialize(db, list(claimed), first_day, target)
+            await db.commit()
+            return len(claimed)
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+    async def run_extend(self, interval: int):
+        """Background loop started from the app lifespan; the first pass runs at startup"""
+        while True:
+            try:
+                extended = await self.extend()
+                if extended:
+                    logging.info(f"Slot horizon extended for {extended} doctors")
+            except Exception as e:
+                logging.error(f"Slot horizon extension failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+
+slot_horizon = SlotHorizon(settings.SLOT_HORIZON_WEEKS, settings.SLOT_HORIZON_BATCH_SIZE)
@@ -2,13 +2,7 @@ import getpass
 import models  # ensures single metadata instance
 from core.database import SessionLocal
 from models.users import User, UserRole
-from passlib.context import CryptContext
-
-# Password hasher
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from core.security import get_password_hash
 
 def create_admin():
     db = SessionLocal()
@@ -30,7 +24,7 @@ def create_admin():
             break
 
     # Hash the password
-    hashed_pw = hash_password(password)
+    hashed_pw = get_password_hash(password)
 
     # ✅ Create admin user with all required boolean fields set to True
     admin_user = User(
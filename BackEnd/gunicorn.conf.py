@@ -0,0 +1,39 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings used by the Docker image: gunicorn -c gunicorn.conf.py main:app
+
+preload_app imports main once in the master, so every worker, including the
+replacement for one recycled by max_requests, is a fork of an app that has
+already booted rather than a cold import. That is safe because nothing opens
+a database connection at import time (schema changes are the
+`alembic upgrade head` deploy step). Threads do not survive fork, so
+post_fork restarts the log listener in each worker.
+
+FAST_BOOT defaults to false here: the master then runs the deferred loaders
+(core/lazy_imports.py) before forking, so no worker pays for them on its
+first requests. Set FAST_BOOT=true explicitly to defer them anyway.
+
+max_requests_jitter staggers recycles so workers do not restart together,
+and a recycling worker finishes its in-flight requests (up to
+graceful_timeout) while the others keep serving.
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+graceful_timeout = 30
+keepalive = 2
+max_requests = 1000
+max_requests_jitter = 100
+preload_app = True
+
+# Read by core.config when the master preloads main
+os.environ.setdefault("FAST_BOOT", "false")
+
+
+def post_fork(server, worker):
+    from core.logging_config import setup_logging
+
+    setup_logging()
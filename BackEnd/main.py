@@ -1,47 +1,82 @@
+import time
+
+_boot_started = time.perf_counter()
+
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
+from core.booking import run_hold_cleanup
 from core.config import settings
-from core.database import Base, engine
-from core.logging_config import setup_logging, get_logger
-from middleware.rate_limiting import rate_limit_middleware, endpoint_rate_limit_middleware
-from middleware.security import security_middleware_handler
-from middleware.request_logging import request_logging_middleware
+from core.database import get_pool_status
+from core.lazy_imports import get_import_stats, load_all
+from core.responses import FastJSONResponse
+from core.slot_cache import slot_cache
+from core.slot_horizon import slot_horizon
+from core.metrics import LOOP_LAG_PROBE_INTERVAL, aggregate, metrics, render_prometheus, route_latency
+from core.logging_config import setup_logging, get_logger, get_log_stats
+from middleware.pipeline import RequestPipelineMiddleware
+from middleware.rate_limit_store import rate_limit_store
+from middleware.security import security_middleware
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
 import traceback
 
 # ✅ Import the full v1 router (which includes auth + doctors)
 from routers.v1 import router as v1_router
+from utils.pagination import NEXT_CURSOR_HEADER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start per-worker background tasks and cancel them on shutdown"""
+    tasks = [
+        asyncio.create_task(rate_limit_store.run_cleanup(settings.RATE_LIMIT_CLEANUP_INTERVAL)),
+        asyncio.create_task(metrics.run_flush(settings.METRICS_FLUSH_INTERVAL)),
+        asyncio.create_task(metrics.run_loop_lag_monitor(LOOP_LAG_PROBE_INTERVAL)),
+        asyncio.create_task(slot_horizon.run_extend(settings.SLOT_HORIZON_INTERVAL)),
+        asyncio.create_task(slot_cache.run_cleanup(settings.SLOT_CACHE_TTL)),
+        asyncio.create_task(run_hold_cleanup(settings.BOOKING_HOLD_CLEANUP_INTERVAL)),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Last snapshot so this worker's counts are kept after it exits
+    try:
+        metrics.flush()
+    except Exception as e:
+        logging.error(f"Metrics flush failed: {str(e)}")
 
 def create_app() -> FastAPI:
     # Setup logging
     setup_logging()
-    logger = get_logger(__name__)
     
     app = FastAPI(
         title="BukCare API",
         description="Online Appointment API",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse
     )
 
-    # Add middleware (order matters - first added is outermost)
-    app.middleware("http")(request_logging_middleware)
-    app.middleware("http")(security_middleware_handler)
-    app.middleware("http")(rate_limit_middleware)
-    app.middleware("http")(endpoint_rate_limit_middleware)
+    # Request id, security screening, rate limiting, security headers and
+    # access logging in one ASGI pass (stages toggled via MIDDLEWARE_* settings)
+    app.add_middleware(RequestPipelineMiddleware)
 
-    # ✅ Create all tables in the database
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
+    # Schema changes are a deploy step (alembic upgrade head), not a boot step
+    if not settings.FAST_BOOT:
+        load_all()
 
     # ✅ Configure CORS
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.allowed_origins_list,
+        allow_origins=settings.allowed_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     # ✅ Register versioned API routes
@@ -52,6 +87,47 @@ def create_app() -> FastAPI:
     def health_check():
         return {"status": "healthy", "message": "BukCare API is running"}
 
+    # Connection pool counters for this worker
+    @app.get("/health/db")
+    def db_health_check():
+        return {"status": "healthy", "pool": get_pool_status()}
+
+    # IP blocklist counters for this worker
+    @app.get("/health/security")
+    def security_health_check():
+        return {"status": "healthy", "blocklist": security_middleware.get_stats()}
+
+    # Log queue depth and dropped records for this worker
+    @app.get("/health/logging")
+    def logging_health_check():
+        return {"status": "healthy", "log_queue": get_log_stats()}
+
+    # Slot cache hit/miss counters for this worker
+    @app.get("/health/slot-cache")
+    def slot_cache_health_check():
+        return {"status": "healthy", "slot_cache": slot_cache.get_stats()}
+
+    # Boot time and deferred imports loaded so far by this worker
+    @app.get("/health/boot")
+    def boot_health_check():
+        return {"status": "healthy", "imports": get_import_stats(boot_seconds)}
+
+    # Per-route latency percentiles for this worker
+    @app.get("/health/latency")
+    def latency_health_check():
+        return {"status": "healthy", "routes": route_latency.snapshot()}
+
+    # Prometheus scrape target, aggregated across all workers. The snapshot is
+    # taken on the event loop so the threadpool gauges can be read; reading
+    # the other workers' files happens in the threadpool
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def prometheus_metrics():
+        total = await run_in_threadpool(aggregate, metrics.snapshot())
+        return PlainTextResponse(
+            render_prometheus(total),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
     # Global exception handlers
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
@@ -93,3 +169,5 @@ def create_app() -> FastAPI:
     return app
 
 app = create_app()
+boot_seconds = time.perf_counter() - _boot_started
+get_logger(__name__).info(f"App ready in {boot_seconds * 1000:.0f} ms")
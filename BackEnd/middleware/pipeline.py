@@ -0,0 +1,236 @@
+# middleware/pipeline.py
+import logging
+import random
+import time
+import uuid
+
+from fastapi.responses import JSONResponse
+
+from core.config import settings
+from core.logging_config import get_logger
+from core.metrics import QueryStats, current_query_stats, metrics
+from middleware.rate_limiting import endpoint_limiter, route_template
+from middleware.rate_limit_store import rate_limit_store
+from middleware.security import security_middleware
+from utils.validators import is_allowed_host
+
+logger = get_logger(__name__)
+
+# Paths that skip security screening and headers (API docs)
+SECURITY_EXEMPT_PREFIXES = ("/docs", "/redoc", "/openapi.json")
+# Paths that skip rate limiting (scraped by monitoring)
+RATE_LIMIT_EXEMPT_PATHS = frozenset({"/metrics"})
+
+SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"content-security-policy", b"default-src 'self'"),
+]
+
+
+def header_value(scope, name: bytes):
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestPipelineMiddleware:
+    """
+    Pure-ASGI replacement for the stacked @app.middleware("http") handlers.
+
+    Runs request-id assignment, security screening, Host allowlisting
+    (ALLOWED_HOSTS, off by default), rate limiting, security
+    headers, latency histograms and access logging in a single pass, without
+    BaseHTTPMiddleware's task hop or response wrapping, so streaming responses
+    pass through untouched. Each stage can be switched off individually.
+
+    Access logging writes one "Request completed" line for errors, slow
+    requests and a sample of the rest; "Request started" is DEBUG only.
+
+    Every request counts its SQL statements. In DEBUG mode the count is sent
+    back as X-Query-Count, and a statement repeated more than
+    QUERY_REPEAT_WARN_THRESHOLD times (usually a lazy load per row) is logged
+    as a warning.
+    """
+
+    def __init__(
+        self,
+        app,
+        request_id: bool = None,
+        security: bool = None,
+        trusted_hosts: bool = None,
+        rate_limit: bool = None,
+        security_headers: bool = None,
+        access_log: bool = None,
+        latency_histograms: bool = None,
+        query_count_header: bool = None,
+    ):
+        self.app = app
+        self.request_id = settings.MIDDLEWARE_REQUEST_ID if request_id is None else request_id
+        self.security = settings.MIDDLEWARE_SECURITY if security is None else security
+        self.trusted_hosts = settings.MIDDLEWARE_TRUSTED_HOSTS if trusted_hosts is None else trusted_hosts
+        self.rate_limit = settings.MIDDLEWARE_RATE_LIMIT if rate_limit is None else rate_limit
+        self.security_headers = settings.MIDDLEWARE_SECURITY_HEADERS if security_headers is None else security_headers
+        self.access_log = settings.MIDDLEWARE_ACCESS_LOG if access_log is None else access_log
+        self.latency_histograms = (
+            settings.MIDDLEWARE_LATENCY_HISTOGRAMS if latency_histograms is None else latency_histograms
+        )
+        self.query_count_header = settings.DEBUG if query_count_header is None else query_count_header
+        self.repeat_threshold = settings.QUERY_REPEAT_WARN_THRESHOLD
+        self.sample_rate = settings.ACCESS_LOG_SAMPLE_RATE
+        self.slow_seconds = settings.ACCESS_LOG_SLOW_MS / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+
+        request_id = None
+        if self.request_id:
+            request_id = str(uuid.uuid4())
+            scope.setdefault("state", {})["request_id"] = request_id
+
+        if self.access_log and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Request started: {method} {path}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "query_string": scope.get("query_string", b"").decode("latin-1"),
+                    "client_ip": client_ip,
+                },
+            )
+
+        exempt = path.startswith(SECURITY_EXEMPT_PREFIXES)
+        extra_headers = []
+        if request_id:
+            extra_headers.append((b"x-request-id", request_id.encode()))
+        if self.security_headers and not exempt:
+            extra_headers.extend(SECURITY_HEADERS)
+
+        response_status = 500
+        response_size = 0
+        query_stats = QueryStats()
+
+        async def send_wrapper(message):
+            nonlocal response_status, response_size
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                headers = extra_headers
+                if self.query_count_header:
+                    # Statements run before the response started (all of them unless streaming)
+                    headers = extra_headers + [(b"x-query-count", str(query_stats.count).encode())]
+                if headers:
+                    message["headers"] = list(message.get("headers", [])) + headers
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        query_stats_token = current_query_stats.set(query_stats)
+        try:
+            rejection = await self.screen(scope, path, client_ip, exempt)
+            if rejection is not None:
+                await rejection(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(query_stats_token)
+            process_time = time.perf_counter() - start_time
+            if self.latency_histograms:
+                metrics.observe_request(method, route_template(scope), response_status, process_time, query_stats)
+            if self.access_log and self.should_log(response_status, process_time):
+                logger.info(
+                    f"Request completed: {method} {path} - {response_status}",
+                    extra={
+                        "request_id": request_id,
+                        "method": method,
+                        "path": path,
+                        "status_code": response_status,
+                        "process_time": process_time,
+                        "response_size": response_size,
+                        "query_count": query_stats.count,
+                    },
+                )
+            for statement, count in query_stats.repeated(self.repeat_threshold):
+                logger.warning(
+                    f"Repeated query: {method} {path} ran the same statement {count} times",
+                    extra={
+                        "request_id": request_id,
+                        "route": route_template(scope),
+                        "statement": statement,
+                        "count": count,
+                    },
+                )
+
+    def should_log(self, status_code: int, process_time: float) -> bool:
+        """Errors and slow requests are always logged; the rest are sampled."""
+        if not logger.isEnabledFor(logging.INFO):
+            return False
+        if status_code >= 400 or process_time >= self.slow_seconds:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    async def screen(self, scope, path: str, client_ip: str, exempt: bool):
+        """Return a rejection response if the request must not reach the app."""
+        if self.trusted_hosts and not is_allowed_host(header_value(scope, b"host")):
+            return JSONResponse(
+                status_code=400,
+                content={"error": True, "message": "Invalid host header", "status_code": 400}
+            )
+
+        if self.security and not exempt:
+            if security_middleware.is_ip_blocked(client_ip):
+                return JSONResponse(
+                    status_code=403,
+                    content={"error": True, "message": "Access denied", "status_code": 403}
+                )
+            query_string = scope.get("query_string", b"")
+            # Over-long input is refused, but does not block the client's IP
+            if security_middleware.is_too_long(path, query_string):
+                return JSONResponse(
+                    status_code=414,
+                    content={"error": True, "message": "Request URI too long", "status_code": 414}
+                )
+            if security_middleware.is_suspicious(path, query_string):
+                security_middleware.block_ip(client_ip, "Suspicious request pattern")
+                return JSONResponse(
+                    status_code=403,
+                    content={"error": True, "message": "Request blocked due to security concerns", "status_code": 403}
+                )
+
+        if self.rate_limit and path not in RATE_LIMIT_EXEMPT_PATHS:
+            hits = endpoint_limiter.hits(scope, client_ip)
+            window_seconds = hits[1][2]
+            # Both limits in one store call (one round-trip for shared stores)
+            global_ok, endpoint_ok = await rate_limit_store.check(hits)
+            if not global_ok:
+                return JSONResponse(
+                    status_code=429,
+                    content={
+                        "error": True,
+                        "message": "Rate limit exceeded. Please try again later.",
+                        "status_code": 429
+                    }
+                )
+            if not endpoint_ok:
+                return JSONResponse(
+                    status_code=429,
+                    content={
+                        "error": True,
+                        "message": f"Rate limit exceeded for {path}. Please try again later.",
+                        "status_code": 429,
+                        "retry_after": window_seconds
+                    }
+                )
+
+        return None
@@ -0,0 +1,149 @@
+# middleware/rate_limit_store.py
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from core.config import settings
+from core.database import execute_autocommit
+from middleware.rate_limiting import rate_limiter
+from models.rate_limit import RateLimitBucket
+
+# (key, max_requests, window_seconds)
+Hit = Tuple[str, int, int]
+
+
+class RateLimitStore(ABC):
+    """
+    Where rate-limit state lives.
+
+    check() evaluates every limit that applies to a request in one call so a
+    shared backend can answer them in a single round-trip.
+    """
+
+    @abstractmethod
+    async def check(self, hits: Sequence[Hit]) -> List[bool]:
+        """One result per hit: whether that limit admits the request"""
+
+    @abstractmethod
+    async def cleanup(self):
+        """Purge state that no longer limits anything"""
+
+    def size(self) -> Optional[int]:
+        """Keys held by this process, or None when state lives elsewhere"""
+        return None
+
+    async def run_cleanup(self, interval: int):
+        """Background loop started from the app lifespan"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.cleanup()
+            except Exception as e:
+                logging.error(f"Rate limit store cleanup failed: {str(e)}")
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process store backed by the configured limiter (limits are per worker)"""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    async def check(self, hits: Sequence[Hit]) -> List[bool]:
+        results = []
+        for key, max_requests, window_seconds in hits:
+            # Stop counting once one limit rejects, as the separate middlewares did
+            allowed = not results or results[-1]
+            results.append(allowed and self.limiter.is_allowed(key, max_requests, window_seconds))
+        return results
+
+    async def cleanup(self):
+        await self.limiter.cleanup()
+
+    def size(self) -> Optional[int]:
+        return len(self.limiter)
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """
+    Store shared by every worker and replica, in a Postgres UNLOGGED table
+    (models/rate_limit.py, created by the migrations).
+
+    Runs the same GCRA as TokenBucketRateLimiter: each bucket row holds its
+    theoretical arrival time. All hits for a request go out as one statement
+    of chained upserts (see _upsert) whose WHERE clauses refuse the update
+    when a bucket is empty, so RETURNING lists exactly the buckets that
+    admitted the request, and a rejection leaves later buckets untouched. It
+    runs on an autocommit connection (core.database.execute_autocommit), so a
+    check is a single round-trip. Uses the database clock so replicas agree
+    on time. Fails open on database errors.
+    """
+
+    TABLE = RateLimitBucket.__tablename__
+
+    DELETE_EXPIRED = text(f"DELETE FROM {TABLE} WHERE tat < extract(epoch from now())")
+
+    @staticmethod
+    def bucket_key(key: str, max_requests: int, window_seconds: int) -> str:
+        return f"{key}|{max_requests}|{window_seconds}"
+
+    def _upsert(self, buckets: List[Hit]):
+        """
+        One statement that charges the buckets in order, each only when every
+        bucket before it admitted the request: step i inserts nothing unless
+        step i - 1 returned its key, as InMemoryRateLimitStore stops counting
+        at the first rejection
+        """
+        steps = []
+        for i in range(len(buckets)):
+            gate = f" WHERE EXISTS (SELECT 1 FROM step_{i - 1})" if i else ""
+            steps.append(
+                f"step_{i} AS (INSERT INTO {self.TABLE} AS b (key, tat, tolerance) "
+                f"SELECT :key_{i}, extract(epoch from now()) + CAST(:interval_{i} AS double precision), "
+                f"CAST(:tolerance_{i} AS double precision){gate} "
+                "ON CONFLICT (key) DO UPDATE "
+                "SET tat = GREATEST(b.tat, extract(epoch from now())) + (EXCLUDED.tat - extract(epoch from now())), "
+                "tolerance = EXCLUDED.tolerance "
+                "WHERE GREATEST(b.tat, extract(epoch from now())) - extract(epoch from now()) <= EXCLUDED.tolerance "
+                "RETURNING key)"
+            )
+        statement = text(
+            f"WITH {', '.join(steps)} "
+            + " UNION ALL ".join(f"SELECT key FROM step_{i}" for i in range(len(buckets)))
+        )
+        params = {}
+        for i, (key, max_requests, window_seconds) in enumerate(buckets):
+            interval = window_seconds / max_requests
+            params[f"key_{i}"] = self.bucket_key(key, max_requests, window_seconds)
+            params[f"interval_{i}"] = interval
+            params[f"tolerance_{i}"] = window_seconds - interval
+        return statement, params
+
+    async def check(self, hits: Sequence[Hit]) -> List[bool]:
+        # A bucket may only appear once per upsert
+        buckets = list(dict.fromkeys(hits))
+        statement, params = self._upsert(buckets)
+        try:
+            rows = await execute_autocommit(statement, params, fetch=True)
+        except Exception as e:
+            logging.error(f"Rate limit store unavailable, allowing request: {str(e)}")
+            return [True] * len(hits)
+
+        admitted = {row[0] for row in rows}
+        return [self.bucket_key(*hit) in admitted for hit in hits]
+
+    async def cleanup(self):
+        await execute_autocommit(self.DELETE_EXPIRED)
+
+
+def create_rate_limit_store(backend: str) -> RateLimitStore:
+    """Build the store selected by RATE_LIMIT_STORE"""
+    if backend == "memory":
+        return InMemoryRateLimitStore(rate_limiter)
+    if backend == "postgres":
+        return PostgresRateLimitStore()
+    raise ValueError(f"Unknown rate limit store '{backend}'. Use 'memory' or 'postgres'")
+
+rate_limit_store = create_rate_limit_store(settings.RATE_LIMIT_STORE)
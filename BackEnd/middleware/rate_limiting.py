@@ -1,27 +1,28 @@
 # middleware/rate_limiting.py
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
+from starlette.routing import Match
 import time
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 from collections import defaultdict, deque
 import asyncio
+import logging
+from core.config import settings
+
+# Longest window any limit uses; sliding-window entries older than this are dead
+MAX_WINDOW_SECONDS = 3600
+# Keys examined per event-loop slice during background cleanup
+CLEANUP_BATCH_SIZE = 1000
 
 class RateLimiter:
+    """Sliding-window limiter: keeps one timestamp per request in the window."""
+
     def __init__(self):
         # Store request timestamps for each IP
         self.requests: Dict[str, deque] = defaultdict(lambda: deque())
-        # Cleanup old entries periodically
-        self.last_cleanup = time.time()
     
     def is_allowed(self, ip: str, max_requests: int = 100, window_seconds: int = 3600) -> bool:
         """Check if IP is within rate limit"""
         current_time = time.time()
         
-        # Clean up old entries every 5 minutes
-        if current_time - self.last_cleanup > 300:
-            self._cleanup_old_entries(current_time, window_seconds)
-            self.last_cleanup = current_time
-        
         # Get requests for this IP
         ip_requests = self.requests[ip]
         
@@ -38,43 +39,126 @@ class RateLimiter:
         ip_requests.append(current_time)
         return True
     
-    def _cleanup_old_entries(self, current_time: float, window_seconds: int):
-        """Remove old entries to prevent memory leaks"""
-        cutoff_time = current_time - window_seconds
-        for ip in list(self.requests.keys()):
-            ip_requests = self.requests[ip]
-            while ip_requests and ip_requests[0] < cutoff_time:
-                ip_requests.popleft()
-            
-            # Remove empty entries
-            if not ip_requests:
-                del self.requests[ip]
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def _is_expired(self, ip: str, current_time: float) -> bool:
+        ip_requests = self.requests.get(ip)
+        return not ip_requests or ip_requests[-1] < current_time - MAX_WINDOW_SECONDS
+
+    async def cleanup(self):
+        """Remove old entries to prevent memory leaks (see run_cleanup)"""
+        await _purge_in_batches(self.requests, self._is_expired)
+
+    async def run_cleanup(self, interval: int):
+        """Background loop started from the app lifespan"""
+        await _cleanup_loop(self, interval)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token-bucket limiter implemented as GCRA.
+
+    Each bucket is a single float (the theoretical arrival time), so memory is
+    constant per client no matter how many requests it makes. Buckets are keyed
+    on (key, max_requests, window_seconds) because the state only has meaning
+    for one rate.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, int, int], float] = {}
+
+    def is_allowed(self, ip: str, max_requests: int = 100, window_seconds: int = 3600) -> bool:
+        """Allow a burst of max_requests, refilling one every window/max_requests seconds"""
+        current_time = time.monotonic()
+        bucket = (ip, max_requests, window_seconds)
+        interval = window_seconds / max_requests
+
+        tat = self.buckets.get(bucket)
+        if tat is None or tat < current_time:
+            tat = current_time
+        elif tat - current_time > window_seconds - interval:
+            return False
+
+        self.buckets[bucket] = tat + interval
+        return True
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def _is_expired(self, bucket, current_time: float) -> bool:
+        # A bucket whose arrival time has passed is full again, same as a missing one
+        tat = self.buckets.get(bucket)
+        return tat is None or tat <= current_time
+
+    async def cleanup(self):
+        """Drop full buckets (see run_cleanup)"""
+        await _purge_in_batches(self.buckets, self._is_expired, clock=time.monotonic)
+
+    async def run_cleanup(self, interval: int):
+        """Background loop started from the app lifespan"""
+        await _cleanup_loop(self, interval)
+
+
+async def _purge_in_batches(state: dict, is_expired, clock=time.time):
+    """Delete expired keys, yielding to the event loop between batches"""
+    keys = list(state.keys())
+    for start in range(0, len(keys), CLEANUP_BATCH_SIZE):
+        current_time = clock()
+        for key in keys[start:start + CLEANUP_BATCH_SIZE]:
+            if is_expired(key, current_time):
+                state.pop(key, None)
+        await asyncio.sleep(0)
+
+
+async def _cleanup_loop(limiter, interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await limiter.cleanup()
+        except Exception as e:
+            logging.error(f"Rate limiter cleanup failed: {str(e)}")
+
+
+RATE_LIMITERS = {
+    "token_bucket": TokenBucketRateLimiter,
+    "sliding_window": RateLimiter,
+}
+
+def create_rate_limiter(algorithm: str):
+    """Build the limiter selected by RATE_LIMIT_ALGORITHM"""
+    try:
+        return RATE_LIMITERS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Unknown rate limit algorithm '{algorithm}'. Use one of: {', '.join(RATE_LIMITERS)}")
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter(settings.RATE_LIMIT_ALGORITHM)
 
-async def rate_limit_middleware(request: Request, call_next):
-    """Rate limiting middleware"""
-    # Get client IP
-    client_ip = request.client.host
-    
-    # Check rate limit (100 requests per hour by default)
-    if not rate_limiter.is_allowed(client_ip, max_requests=100, window_seconds=3600):
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "error": True,
-                "message": "Rate limit exceeded. Please try again later.",
-                "status_code": 429
-            }
-        )
-    
-    # Continue with the request
-    response = await call_next(request)
-    return response
+# Limit shared by every route for one client
+GLOBAL_LIMIT = (settings.RATE_LIMIT_PER_HOUR, 3600)
+# Per-route limit for routes not listed in EndpointRateLimiter.limits
+DEFAULT_ENDPOINT_LIMIT = (100, 3600)
+# Template recorded for paths that match no route, so scanners share one bucket
+UNMATCHED_ROUTE = "<unmatched>"
+# Distinct (method, path) pairs remembered by the route-template cache before it is reset
+ROUTE_CACHE_SIZE = 10000
+
+def limit_key(scope: str, template: str, client: str) -> str:
+    """Limiter state key; global and per-route limits never share state"""
+    return f"{scope}|{template}|{client}"
 
 # Specific rate limiters for different endpoints
 class EndpointRateLimiter:
+    """
+    Resolves the limits that apply to a request.
+
+    Limits are keyed on route templates (e.g. /api/v1/appointments/{appointment_id})
+    rather than raw paths. A key also covers every route nested under it, and
+    those routes share one bucket: /api/v1/auth/password-reset limits the
+    request, verify and confirm steps together.
+    """
+
     def __init__(self):
         self.limits = {
             "/api/v1/auth/signin": (5, 300),  # 5 requests per 5 minutes
@@ -82,30 +166,69 @@ class EndpointRateLimiter:
             "/api/v1/auth/refresh": (10, 60),  # 10 requests per minute
             "/api/v1/auth/password-reset": (3, 300),  # 3 requests per 5 minutes
         }
-    
-    def get_limit(self, path: str) -> Tuple[int, int]:
-        """Get rate limit for specific endpoint"""
-        return self.limits.get(path, (100, 3600))  # Default: 100 requests per hour
+        # route template -> (bucket template, max_requests, window_seconds)
+        self._resolved: Dict[str, Tuple[str, int, int]] = {}
 
-endpoint_limiter = EndpointRateLimiter()
+    def _limit_for_template(self, template: str) -> Tuple[str, int, int]:
+        if template in self.limits:
+            return (template, *self.limits[template])
+        for prefix, limit in self.limits.items():
+            if template.startswith(prefix + "/"):
+                return (prefix, *limit)
+        return (template, *DEFAULT_ENDPOINT_LIMIT)
 
-async def endpoint_rate_limit_middleware(request: Request, call_next):
-    """Endpoint-specific rate limiting"""
-    client_ip = request.client.host
-    path = request.url.path
-    
-    max_requests, window_seconds = endpoint_limiter.get_limit(path)
-    
-    if not rate_limiter.is_allowed(client_ip, max_requests, window_seconds):
-        return JSONResponse(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={
-                "error": True,
-                "message": f"Rate limit exceeded for {path}. Please try again later.",
-                "status_code": 429,
-                "retry_after": window_seconds
-            }
-        )
-    
-    response = await call_next(request)
-    return response
+    def _resolve(self, scope) -> Tuple[str, int, int]:
+        template = route_template(scope)
+        resolved = self._resolved.get(template)
+        if resolved is None:
+            # Bounded by the number of routes
+            resolved = self._resolved[template] = self._limit_for_template(template)
+        return resolved
+
+    def hits(self, scope, client_ip: str) -> List[Tuple[str, int, int]]:
+        """
+        Both limits for a request as (key, max_requests, window_seconds):
+        the global limit first, then the limit of the matched route.
+        """
+        template, max_requests, window_seconds = self._resolve(scope)
+        return [
+            (limit_key("global", "*", client_ip), *GLOBAL_LIMIT),
+            (limit_key("endpoint", template, client_ip), max_requests, window_seconds),
+        ]
+
+
+# (method, path) -> route template, shared by everything that groups requests by route
+_route_templates: Dict[Tuple[str, str], str] = {}
+
+def route_template(scope) -> str:
+    """Path template of the route the app will dispatch this request to"""
+    route = scope.get("route")
+    if route is not None:
+        # Already routed
+        return route.path
+
+    key = (scope.get("method"), scope["path"])
+    template = _route_templates.get(key)
+    if template is None:
+        template = _match_route_template(scope)
+        if len(_route_templates) >= ROUTE_CACHE_SIZE:
+            _route_templates.clear()
+        _route_templates[key] = template
+    return template
+
+def _match_route_template(scope) -> str:
+    app = scope.get("app")
+    if app is None:
+        return scope["path"]
+
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # Path matches but the method does not; the router answers 405 here
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+endpoint_limiter = EndpointRateLimiter()
@@ -1,159 +1,191 @@
 # middleware/security.py
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import Request
 import time
 import hashlib
 import hmac
+from threading import Lock
 from typing import Optional
+from urllib.parse import unquote_plus
 import re
 
+from cachetools import TTLCache
+
+from core.config import settings
+
+# Longest path or raw query string accepted; longer requests are refused with
+# 414 before screening, and is_suspicious() never scans past this many characters
+MAX_SCAN_LENGTH = 4096
+
+# Common attack patterns: a trigger literal, then literals that must follow it in
+# order within the same query parameter (or line)
+SUSPICIOUS_PATTERNS = {
+    "<script": (">", "</script>"),  # XSS
+    "union": ("select",),  # SQL injection
+    "<iframe": (">",),  # iframe injection
+    "javascript:": (),  # JavaScript injection
+    "vbscript:": (),  # VBScript injection
+    "onload=": (),  # Event handler injection
+    "onerror=": (),  # Event handler
+}
+
+# One pass over the input finds every trigger
+_TRIGGERS = re.compile("|".join(re.escape(trigger) for trigger in SUSPICIOUS_PATTERNS))
+
+def _matches_attack_pattern(text: str) -> bool:
+    """Match SUSPICIOUS_PATTERNS against one lowercased parameter (or path) in linear time"""
+    # Line end already searched for each trigger; a later occurrence of the
+    # same trigger on that line cannot match either
+    exhausted = {}
+    for match in _TRIGGERS.finditer(text):
+        trigger = match.group()
+        followers = SUSPICIOUS_PATTERNS[trigger]
+        if not followers:
+            return True
+        if match.start() < exhausted.get(trigger, -1):
+            continue
+
+        end = text.find("\n", match.start())
+        if end < 0:
+            end = len(text)
+        position = match.end()
+        for follower in followers:
+            found = text.find(follower, position, end)
+            if found < 0:
+                break
+            position = found + len(follower)
+        else:
+            return True
+        exhausted[trigger] = end
+    return False
+
+class ExpiringIPCache(TTLCache):
+    """
+    TTLCache that counts what it drops.
+
+    Entries expire block_duration after they were written; when the cache is
+    full the least recently used entry is evicted first. Membership checks are
+    O(1) and expired entries are unlinked in expiry order as writes happen.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+
 class SecurityMiddleware:
-    def __init__(self):
-        self.blocked_ips = set()
-        self.suspicious_ips = {}
+    def __init__(self, maxsize: int = None, block_duration: int = None):
+        self.block_duration = block_duration or settings.SECURITY_BLOCK_DURATION  # 1 hour
+        maxsize = maxsize or settings.SECURITY_TRACKED_IPS_MAXSIZE
+        self.blocked_ips = ExpiringIPCache(maxsize=maxsize, ttl=self.block_duration)
+        # Failed attempts are forgotten block_duration after the last one
+        self.suspicious_ips = ExpiringIPCache(maxsize=maxsize, ttl=self.block_duration)
         self.max_failed_attempts = 5
-        self.block_duration = 3600  # 1 hour
+        self.blocks = 0
+        # Failed attempts arrive from sync handlers on threadpool workers
+        self._lock = Lock()
     
     def is_suspicious_request(self, request: Request) -> bool:
         """Check if request appears suspicious"""
-        # Check for common attack patterns
-        suspicious_patterns = [
-            r'<script.*?>.*?</script>',  # XSS
-            r'union.*select',  # SQL injection
-            r'<iframe.*?>',  # iframe injection
-            r'javascript:',  # JavaScript injection
-            r'vbscript:',  # VBScript injection
-            r'onload=',  # Event handler injection
-            r'onerror=',  # Event handler
-        ]
-        
+        return self.is_suspicious(request.url.path, request.scope.get("query_string", b""))
+
+    @staticmethod
+    def is_too_long(path: str, query_string: bytes) -> bool:
+        """Path or raw query string over MAX_SCAN_LENGTH (answered with 414, not a block)"""
+        return len(path) > MAX_SCAN_LENGTH or len(query_string) > MAX_SCAN_LENGTH
+
+    def is_suspicious(self, path: str, query_string: bytes) -> bool:
+        """
+        Screen the path and raw query string for common attack patterns.
+
+        The raw query is split on "&" and each parameter on its first "=";
+        only the decoded value is screened, so parameter names like "onload"
+        or "script" are allowed and an encoded "&" (%26) stays inside its
+        value. Every character is scanned a bounded number of times, and at
+        most MAX_SCAN_LENGTH of each input.
+        """
         # Check URL path
-        path = request.url.path.lower()
-        for pattern in suspicious_patterns:
-            if re.search(pattern, path, re.IGNORECASE):
+        if _matches_attack_pattern(path[:MAX_SCAN_LENGTH].lower()):
+            return True
+
+        # Check query parameters. A trigger found in one decoded parameter is
+        # also in the whole decoded query, so a clean query costs one search
+        query_string = query_string[:MAX_SCAN_LENGTH].lower()
+        if not query_string or not _TRIGGERS.search(unquote_plus(query_string.decode("latin-1")).lower()):
+            return False
+        for parameter in query_string.split(b"&"):
+            value = parameter.partition(b"=")[2]
+            if not value:
+                continue
+            value = value.decode("latin-1")
+            if "%" in value or "+" in value:
+                value = unquote_plus(value).lower()
+            if _matches_attack_pattern(value):
                 return True
-        
-        # Check query parameters
-        for param_name, param_value in request.query_params.items():
-            param_value_lower = param_value.lower()
-            for pattern in suspicious_patterns:
-                if re.search(pattern, param_value_lower, re.IGNORECASE):
-                    return True
-        
+
         return False
     
     def is_ip_blocked(self, ip: str) -> bool:
         """Check if IP is currently blocked"""
-        if ip in self.blocked_ips:
-            return True
-        return False
+        with self._lock:
+            return ip in self.blocked_ips
     
     def block_ip(self, ip: str, reason: str = "Suspicious activity"):
-        """Block an IP address"""
-        self.blocked_ips.add(ip)
+        """Block an IP address for block_duration seconds"""
+        with self._lock:
+            self.blocked_ips[ip] = reason
+            self.blocks += 1
         # In a real application, you'd want to persist this to a database
     
     def record_failed_attempt(self, ip: str):
         """Record a failed authentication attempt"""
         current_time = time.time()
         
-        if ip not in self.suspicious_ips:
-            self.suspicious_ips[ip] = {
-                'attempts': 0,
-                'first_attempt': current_time,
-                'last_attempt': current_time
-            }
-        
-        self.suspicious_ips[ip]['attempts'] += 1
-        self.suspicious_ips[ip]['last_attempt'] = current_time
+        with self._lock:
+            attempts = self.suspicious_ips.get(ip)
+            if attempts is None:
+                attempts = {
+                    'attempts': 0,
+                    'first_attempt': current_time,
+                    'last_attempt': current_time
+                }
+            
+            attempts['attempts'] += 1
+            attempts['last_attempt'] = current_time
+            # Re-inserting restarts the expiry window from the latest attempt
+            self.suspicious_ips[ip] = attempts
         
         # Block IP if too many failed attempts
-        if self.suspicious_ips[ip]['attempts'] >= self.max_failed_attempts:
+        if attempts['attempts'] >= self.max_failed_attempts:
             self.block_ip(ip, "Too many failed authentication attempts")
     
     def reset_failed_attempts(self, ip: str):
         """Reset failed attempts for an IP"""
-        if ip in self.suspicious_ips:
-            del self.suspicious_ips[ip]
-
-security_middleware = SecurityMiddleware()
-
-# async def security_middleware_handler(request: Request, call_next):
-#     """Security middleware to detect and prevent attacks"""
-#     client_ip = request.client.host
-    
-#     # Check if IP is blocked
-#     if security_middleware.is_ip_blocked(client_ip):
-#         return JSONResponse(
-#             status_code=status.HTTP_403_FORBIDDEN,
-#             content={
-#                 "error": True,
-#                 "message": "Access denied",
-#                 "status_code": 403
-#             }
-#         )
-    
-#     # Check for suspicious requests
-#     if security_middleware.is_suspicious_request(request):
-#         security_middleware.block_ip(client_ip, "Suspicious request pattern")
-#         return JSONResponse(
-#             status_code=status.HTTP_403_FORBIDDEN,
-#             content={
-#                 "error": True,
-#                 "message": "Request blocked due to security concerns",
-#                 "status_code": 403
-#             }
-#         )
-    
-#     # Add security headers
-#     response = await call_next(request)
-    
-#     # Add security headers
-#     response.headers["X-Content-Type-Options"] = "nosniff"
-#     response.headers["X-Frame-Options"] = "DENY"
-#     response.headers["X-XSS-Protection"] = "1; mode=block"
-#     response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-#     response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-#     response.headers["Content-Security-Policy"] = "default-src 'self'"
-    
-#     return response
+        with self._lock:
+            self.suspicious_ips.pop(ip, None)
 
-async def security_middleware_handler(request: Request, call_next):
-    """Security middleware to detect and prevent attacks"""
-
-    # Skip docs and OpenAPI paths
-    if request.url.path.startswith("/docs") or request.url.path.startswith("/redoc") or request.url.path.startswith("/openapi.json"):
-        return await call_next(request)
-
-    client_ip = request.client.host
-    
-    # Check if IP is blocked
-    if security_middleware.is_ip_blocked(client_ip):
-        return JSONResponse(
-            status_code=403,
-            content={"error": True, "message": "Access denied", "status_code": 403}
-        )
-    
-    # Check for suspicious requests
-    if security_middleware.is_suspicious_request(request):
-        security_middleware.block_ip(client_ip, "Suspicious request pattern")
-        return JSONResponse(
-            status_code=403,
-            content={"error": True, "message": "Request blocked due to security concerns", "status_code": 403}
-        )
-    
-    response = await call_next(request)
-    
-    # Add security headers
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-    
-    return response
+    def get_stats(self) -> dict:
+        """Blocklist counters for this worker process"""
+        return {
+            "blocked_ips": len(self.blocked_ips),
+            "tracked_ips": len(self.suspicious_ips),
+            "capacity": self.blocked_ips.maxsize,
+            "blocks": self.blocks,
+            "evictions": self.blocked_ips.evictions,
+            "expirations": self.blocked_ips.expirations,
+        }
 
+security_middleware = SecurityMiddleware()
 
 def generate_csrf_token(user_id: int, secret_key: str) -> str:
     """Generate CSRF token"""
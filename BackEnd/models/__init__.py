@@ -6,4 +6,6 @@ import models.location       # Defines Province, City, Barangay
 import models.users          # Depends on Province/City/Barangay
 import models.doctor         # Depends on users + location
 import models.appointment    # Depends on users + doctor
-import models.notification   # Depends on appointment
\ No newline at end of file
+import models.notification   # Depends on appointment
+import models.rate_limit     # Standalone (rate limit store)
+import models.slot_cache     # Standalone (slot cache generations)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, Enum, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -14,6 +14,20 @@ class AppointmentStatus(str, enum.Enum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Per-doctor / per-patient listings, in keyset order (appointment_date, id)
+        Index("ix_appointments_doctor_id_appointment_date", "doctor_id", "appointment_date", "id"),
+        Index("ix_appointments_patient_id_appointment_date", "patient_id", "appointment_date", "id"),
+        # Bookings still holding a slot (upcoming listings, available-slots).
+        # Unique: one active booking per doctor and start time (core/booking.py)
+        Index(
+            "uq_appointments_doctor_id_active_slot",
+            "doctor_id", "appointment_date",
+            unique=True,
+            postgresql_where=text("status IN ('PENDING', 'CONFIRMED')"),
+            sqlite_where=text("status IN ('PENDING', 'CONFIRMED')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -34,3 +48,26 @@ class Appointment(Base):
 
     def __repr__(self):
         return f"<Appointment(id={self.id}, patient_id={self.patient_id}, doctor_id={self.doctor_id}, status={self.status})>"
+
+
+class SlotHold(Base):
+    """
+    A patient's short-lived reservation of a doctor's slot while they check
+    out. At most one per slot; an expired hold can be taken over.
+    """
+    __tablename__ = "slot_holds"
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "start_time", name="uq_slot_holds_doctor_id_start_time"),
+        Index("ix_slot_holds_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Users, like Appointment.doctor_id
+    doctor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    patient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SlotHold(doctor_id={self.doctor_id}, start_time={self.start_time}, patient_id={self.patient_id})>"
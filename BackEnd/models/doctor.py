@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Table, Boolean, Time, Text, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, Table, Boolean, Time, Text, Date, DateTime, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -37,6 +37,15 @@ class Specialization(Base):
 # ───────────────────────────────
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (
+        # Doctors awaiting admin approval, a small slice of the table
+        Index(
+            "ix_doctors_unverified",
+            "doctor_id",
+            postgresql_where=text("is_verified = false"),
+            sqlite_where=text("is_verified = 0"),
+        ),
+    )
 
     doctor_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True)
@@ -61,6 +70,11 @@ class Doctor(Base):
     bio = Column(Text, nullable=True)
     consultation_fee = Column(Integer, nullable=True)  # in cents
     is_accepting_patients = Column(Boolean, default=True)
+    # Appointment slot length and the gap kept around each booking (utils/slots.py)
+    slot_minutes = Column(Integer, nullable=False, default=30, server_default="30")
+    buffer_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    # Last day whose free slots are materialized in doctor_slots (core/slot_horizon.py)
+    slot_horizon = Column(Date, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -72,6 +86,16 @@ class Doctor(Base):
 
     specializations = relationship("Specialization", secondary=doctor_specializations, back_populates="doctors")
     availabilities = relationship("DoctorAvailability", back_populates="doctor", cascade="all, delete-orphan")
+    slots = relationship("DoctorSlot", back_populates="doctor", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def address(self) -> str:
+        """Barangay, city and province names (blank where unset)"""
+        return (
+            f"{self.barangay.name if self.barangay else ''}, "
+            f"{self.city.name if self.city else ''}, "
+            f"{self.province.name if self.province else ''}"
+        )
 
     def __repr__(self):
         return (
@@ -85,6 +109,9 @@ class Doctor(Base):
 # ───────────────────────────────
 class DoctorAvailability(Base):
     __tablename__ = "doctor_availabilities"
+    __table_args__ = (
+        Index("ix_doctor_availabilities_doctor_id_date", "doctor_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     doctor_id = Column(Integer, ForeignKey("doctors.doctor_id", ondelete="CASCADE"), nullable=False)
@@ -96,7 +123,7 @@ class DoctorAvailability(Base):
     is_available = Column(Boolean, default=True)
     notes = Column(Text, nullable=True)
     
-    # Weekly availability (for recurring schedules)
+    # Weekly availability (for recurring schedules, date is NULL)
     day_of_week = Column(String(10), nullable=True)  # e.g., "Monday"
     is_active = Column(Boolean, default=True)
 
@@ -104,3 +131,31 @@ class DoctorAvailability(Base):
 
     def __repr__(self):
         return f"<DoctorAvailability(doctor_id={self.doctor_id}, day={self.day_of_week})>"
+
+
+# ───────────────────────────────
+# Doctor Slot (materialized)
+# ───────────────────────────────
+class DoctorSlot(Base):
+    """
+    A free slot precomputed from the doctor's weekly rules, date-specific
+    rows and bookings, up to Doctor.slot_horizon. Rebuilt per day whenever
+    one of those changes (core/slot_horizon.py).
+    """
+    __tablename__ = "doctor_slots"
+    __table_args__ = (
+        # One doctor's day is a range scan on this
+        UniqueConstraint("doctor_id", "start_time", name="uq_doctor_slots_doctor_id_start_time"),
+        # Earliest slots across doctors
+        Index("ix_doctor_slots_start_time", "start_time"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.doctor_id", ondelete="CASCADE"), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+
+    doctor = relationship("Doctor", back_populates="slots")
+
+    def __repr__(self):
+        return f"<DoctorSlot(doctor_id={self.doctor_id}, start_time={self.start_time})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -6,6 +6,17 @@ from core.database import Base
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # A user's notifications in keyset order (created_at, id)
+        Index("ix_notifications_target_user_id_created_at", "target_user_id", "created_at", "id"),
+        # Unread only: unread-count and mark-all-read
+        Index(
+            "ix_notifications_target_user_id_unread",
+            "target_user_id", "created_at",
+            postgresql_where=text("is_read = false"),
+            sqlite_where=text("is_read = 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     source_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Double, Text
+from core.database import Base
+
+
+class RateLimitBucket(Base):
+    """
+    One GCRA bucket of middleware/rate_limit_store.PostgresRateLimitStore.
+    The migration creates the table UNLOGGED on Postgres: losing buckets in a
+    crash only resets the limits.
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    # "<scope key>|<max requests>|<window seconds>"
+    key = Column(Text, primary_key=True)
+    # Theoretical arrival time and burst tolerance, in epoch seconds
+    tat = Column(Double, nullable=False)
+    tolerance = Column(Double, nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket(key={self.key}, tat={self.tat})>"
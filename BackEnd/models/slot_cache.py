@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, Integer
+from core.database import Base
+
+
+class SlotCacheGeneration(Base):
+    """
+    Per-doctor counter of core/slot_cache.py. Every invalidation bumps it, and
+    each worker's cached entries carry the value they were computed under, so
+    a write on one worker retires the slots cached by all of them.
+    """
+    __tablename__ = "slot_cache_generations"
+
+    # doctors.doctor_id (no foreign key: a bump never waits on the doctors row)
+    doctor_id = Column(Integer, primary_key=True, autoincrement=False)
+    generation = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<SlotCacheGeneration(doctor_id={self.doctor_id}, generation={self.generation})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -14,6 +14,10 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin user listing in keyset order (created_at, id)
+        Index("ix_users_created_at", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -90,6 +94,11 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
+    @property
+    def name(self) -> str:
+        """Display name used by the API listings"""
+        return f"{self.fname} {self.lname}"
+
     @classmethod
     def from_oauth(cls, data: dict):
         """
@@ -1,24 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func
 from typing import List, Optional
 
 from core.database import get_db
+from core.responses import typed_json
+from core.principal_cache import Principal, principal_cache
 from models.users import User, UserRole
 from models.doctor import Doctor
 from models.appointment import Appointment
 from routers.v1.dependencies import get_current_admin
+from schemas.admin import AdminStats, AdminUserListItem, PendingDoctor
+from schemas.common import MessageResponse
+from utils.pagination import Keyset, PageRequest, page_request
 
 router = APIRouter()
 
-@router.get("/users", response_model=List[dict])
+USERS_NEWEST_FIRST = Keyset("users-newest", User.created_at, User.id, descending=True)
+
+USER_LIST = TypeAdapter(List[AdminUserListItem])
+PENDING_DOCTOR_LIST = TypeAdapter(List[PendingDoctor])
+
+@router.get("/users", response_model=List[AdminUserListItem])
 def get_all_users(
+    response: Response,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
-    current_user: User = Depends(get_current_admin),
+    page: PageRequest = Depends(page_request),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Get all users with optional filtering (admin only)"""
+    """Get users with optional filtering, newest first, one page at a time (admin only)"""
     query = db.query(User)
     
     if role:
@@ -26,57 +39,27 @@ def get_all_users(
     if is_active is not None:
         query = query.filter(User.is_active == is_active)
     
-    users = query.order_by(User.created_at.desc()).all()
-    
-    return [
-        {
-            "id": user.id,
-            "email": user.email,
-            "fname": user.fname,
-            "lname": user.lname,
-            "name": f"{user.fname} {user.lname}",
-            "role": user.role.value,
-            "is_active": user.is_active,
-            "is_verified": user.is_verified,
-            "is_profile_complete": user.is_profile_complete,
-            "created_at": user.created_at,
-            "last_login": user.last_login
-        }
-        for user in users
-    ]
+    users = USERS_NEWEST_FIRST.page(USERS_NEWEST_FIRST.paginate(query, page).all(), page, response)
+    
+    return typed_json(USER_LIST, users, response)
 
-@router.get("/doctors/pending", response_model=List[dict])
+@router.get("/doctors/pending", response_model=List[PendingDoctor])
 def get_pending_doctors(
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Get doctors pending approval (admin only)"""
-    doctors = db.query(Doctor).join(User).filter(
+    doctors = db.query(Doctor).join(User).options(contains_eager(Doctor.user)).filter(
         User.role == UserRole.DOCTOR,
         Doctor.is_verified == False
     ).all()
     
-    return [
-        {
-            "doctor_id": doctor.doctor_id,
-            "user_id": doctor.user_id,
-            "name": f"{doctor.user.fname} {doctor.user.lname}",
-            "email": doctor.user.email,
-            "license_number": doctor.license_number,
-            "years_of_experience": doctor.years_of_experience,
-            "specializations": doctor.specializations_json,
-            "created_at": doctor.user.created_at,
-            "prc_license_front": doctor.prc_license_front,
-            "prc_license_back": doctor.prc_license_back,
-            "prc_license_selfie": doctor.prc_license_selfie
-        }
-        for doctor in doctors
-    ]
+    return typed_json(PENDING_DOCTOR_LIST, doctors)
 
-@router.put("/doctors/{doctor_id}/approve")
+@router.put("/doctors/{doctor_id}/approve", response_model=MessageResponse)
 def approve_doctor(
     doctor_id: int,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Approve a doctor (admin only)"""
@@ -101,13 +84,13 @@ def approve_doctor(
     
     db.commit()
     
-    return {"message": "Doctor approved successfully"}
+    return MessageResponse(message="Doctor approved successfully")
 
-@router.put("/doctors/{doctor_id}/reject")
+@router.put("/doctors/{doctor_id}/reject", response_model=MessageResponse)
 def reject_doctor(
     doctor_id: int,
     reason: Optional[str] = None,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Reject a doctor application (admin only)"""
@@ -124,11 +107,11 @@ def reject_doctor(
     db.delete(doctor)
     db.commit()
     
-    return {"message": "Doctor application rejected"}
+    return MessageResponse(message="Doctor application rejected")
 
-@router.get("/stats", response_model=dict)
+@router.get("/stats", response_model=AdminStats)
 def get_admin_stats(
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Get admin dashboard statistics"""
@@ -140,19 +123,19 @@ def get_admin_stats(
     pending_doctors = db.query(Doctor).filter(Doctor.is_verified == False).count()
     total_appointments = db.query(Appointment).count()
     
-    return {
-        "total_users": total_users,
-        "total_doctors": total_doctors,
-        "total_patients": total_patients,
-        "pending_doctors": pending_doctors,
-        "total_appointments": total_appointments
-    }
+    return AdminStats(
+        total_users=total_users,
+        total_doctors=total_doctors,
+        total_patients=total_patients,
+        pending_doctors=pending_doctors,
+        total_appointments=total_appointments
+    )
 
-@router.put("/users/{user_id}/status")
+@router.put("/users/{user_id}/status", response_model=MessageResponse)
 def update_user_status(
     user_id: int,
     is_active: bool,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """Update user active status (admin only)"""
@@ -166,5 +149,6 @@ def update_user_status(
     
     user.is_active = is_active
     db.commit()
+    principal_cache.invalidate(user_id)
     
-    return {"message": f"User {'activated' if is_active else 'deactivated'} successfully"}
\ No newline at end of file
+    return MessageResponse(message=f"User {'activated' if is_active else 'deactivated'} successfully")
\ No newline at end of file
@@ -1,31 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from typing import List, Optional
 from datetime import datetime
 
-from core.database import get_db
+from core.booking import as_slot_time, book, claim_hold, confirm_hold, release_hold, set_status
+from core.database import get_async_db
+from core.responses import typed_json
+from core.slot_cache import slot_cache
+from core.principal_cache import Principal
 from models.appointment import Appointment, AppointmentStatus
 from models.users import User
-from routers.v1.dependencies import get_current_user
+from routers.v1.dependencies import get_current_principal
+from schemas.appointment import AppointmentListItem, AppointmentResponse, AppointmentStatusResponse, SlotHoldResponse
+from schemas.common import MessageResponse
+from utils.pagination import Keyset, PageRequest, page_request
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_appointments(
+PatientUser = aliased(User, name="patient_user")
+DoctorUser = aliased(User, name="doctor_user")
+
+# Listing orders, for keyset pagination
+APPOINTMENTS_LATEST_FIRST = Keyset(
+    "appointments-latest", Appointment.appointment_date, Appointment.id, descending=True
+)
+APPOINTMENTS_SOONEST_FIRST = Keyset(
+    "appointments-soonest", Appointment.appointment_date, Appointment.id
+)
+
+APPOINTMENT_LIST = TypeAdapter(List[AppointmentResponse])
+APPOINTMENT_LISTING = TypeAdapter(List[AppointmentListItem])
+
+@router.get("/", response_model=List[AppointmentResponse])
+async def get_appointments(
+    response: Response,
     patient_id: Optional[int] = None,
     doctor_id: Optional[int] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    page: PageRequest = Depends(page_request),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get appointments with optional filtering"""
-    query = db.query(Appointment)
+    """Get appointments with optional filtering, latest first, one page at a time"""
+    query = select(Appointment)
     
     # Filter based on user role
     if current_user.role.value == "patient":
-        query = query.filter(Appointment.patient_id == current_user.id)
+        query = query.where(Appointment.patient_id == current_user.id)
     elif current_user.role.value == "doctor":
-        query = query.filter(Appointment.doctor_id == current_user.id)
+        query = query.where(Appointment.doctor_id == current_user.id)
     elif current_user.role.value == "admin":
         # Admins can see all appointments
         pass
@@ -37,74 +63,107 @@ def get_appointments(
     
     # Apply additional filters
     if patient_id:
-        query = query.filter(Appointment.patient_id == patient_id)
+        query = query.where(Appointment.patient_id == patient_id)
     if doctor_id:
-        query = query.filter(Appointment.doctor_id == doctor_id)
+        query = query.where(Appointment.doctor_id == doctor_id)
     if status:
-        query = query.filter(Appointment.status == status)
+        query = query.where(Appointment.status == status)
     
-    appointments = query.order_by(Appointment.appointment_date.desc()).all()
+    query = APPOINTMENTS_LATEST_FIRST.paginate(query, page)
+    appointments = APPOINTMENTS_LATEST_FIRST.page((await db.scalars(query)).all(), page, response)
     
-    return [
-        {
-            "id": appointment.id,
-            "patient_id": appointment.patient_id,
-            "doctor_id": appointment.doctor_id,
-            "appointment_date": appointment.appointment_date,
-            "reason": appointment.reason,
-            "status": appointment.status.value,
-            "notes": appointment.notes,
-            "created_at": appointment.created_at,
-            "updated_at": appointment.updated_at
-        }
-        for appointment in appointments
-    ]
+    return typed_json(APPOINTMENT_LIST, appointments, response)
 
-@router.post("/", response_model=dict)
-def create_appointment(
+@router.post("/", response_model=AppointmentResponse)
+async def create_appointment(
     doctor_id: int,
     appointment_date: datetime,
     reason: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new appointment (patients only)"""
+    """
+    Book one of the doctor's free slots (patients only). doctor_id is the
+    doctor's user id. Answers 409 when the slot is taken or held.
+    """
     if current_user.role.value != "patient":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only patients can create appointments"
         )
     
-    appointment = Appointment(
-        patient_id=current_user.id,
-        doctor_id=doctor_id,
-        appointment_date=appointment_date,
-        reason=reason,
-        status=AppointmentStatus.PENDING
-    )
+    appointment, affected = await book(db, doctor_id, current_user.id, as_slot_time(appointment_date), reason)
+    await db.commit()
+    await slot_cache.invalidate(*affected)
+    await db.refresh(appointment)
     
-    db.add(appointment)
-    db.commit()
-    db.refresh(appointment)
+    return AppointmentResponse.model_validate(appointment)
+
+@router.post("/holds", response_model=SlotHoldResponse)
+async def hold_slot(
+    doctor_id: int,
+    appointment_date: datetime,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Reserve a free slot for BOOKING_HOLD_SECONDS while the patient checks out
+    (patients only), replacing any other hold on the same doctor. Confirm it
+    with POST /holds/{hold_id}/confirm.
+    """
+    if current_user.role.value != "patient":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only patients can hold slots"
+        )
+    
+    hold, affected = await claim_hold(db, doctor_id, current_user.id, as_slot_time(appointment_date))
+    await db.commit()
+    await slot_cache.invalidate(*affected)
+    
+    return SlotHoldResponse.model_validate(hold)
+
+@router.post("/holds/{hold_id}/confirm", response_model=AppointmentResponse)
+async def confirm_slot_hold(
+    hold_id: int,
+    reason: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Book the slot of one of the current patient's live holds"""
+    appointment, affected = await confirm_hold(db, hold_id, current_user.id, reason)
+    await db.commit()
+    await slot_cache.invalidate(*affected)
+    await db.refresh(appointment)
+    
+    return AppointmentResponse.model_validate(appointment)
+
+@router.delete("/holds/{hold_id}", response_model=MessageResponse)
+async def release_slot_hold(
+    hold_id: int,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Give up one of the current patient's holds"""
+    released = await release_hold(db, hold_id, current_user.id)
+    if released is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found"
+        )
+    await db.commit()
+    for affected in released:
+        await slot_cache.invalidate(*affected)
     
-    return {
-        "id": appointment.id,
-        "patient_id": appointment.patient_id,
-        "doctor_id": appointment.doctor_id,
-        "appointment_date": appointment.appointment_date,
-        "reason": appointment.reason,
-        "status": appointment.status.value,
-        "notes": appointment.notes,
-        "created_at": appointment.created_at
-    }
+    return MessageResponse(message="Hold released")
 
-@router.put("/{appointment_id}/status", response_model=dict)
-def update_appointment_status(
+@router.put("/{appointment_id}/status", response_model=AppointmentStatusResponse)
+async def update_appointment_status(
     appointment_id: int,
     status: str,
     notes: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update appointment status (doctors and admins only)"""
     if current_user.role.value not in ["doctor", "admin"]:
@@ -113,9 +172,9 @@ def update_appointment_status(
             detail="Only doctors and admins can update appointment status"
         )
     
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
+    appointment = await db.scalar(
+        select(Appointment).where(Appointment.id == appointment_id)
+    )
     
     if not appointment:
         raise HTTPException(
@@ -138,30 +197,32 @@ def update_appointment_status(
             detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
         )
     
-    appointment.status = AppointmentStatus(status)
     if notes:
         appointment.notes = notes
+    affected = await set_status(db, appointment, AppointmentStatus(status))
     
-    db.commit()
-    db.refresh(appointment)
+    await db.commit()
+    if affected:
+        await slot_cache.invalidate(*affected)
+    await db.refresh(appointment)
     
-    return {
-        "id": appointment.id,
-        "status": appointment.status.value,
-        "notes": appointment.notes,
-        "updated_at": appointment.updated_at
-    }
+    return AppointmentStatusResponse(
+        id=appointment.id,
+        status=appointment.status,
+        notes=appointment.notes,
+        updated_at=appointment.updated_at
+    )
 
-@router.delete("/{appointment_id}")
-def cancel_appointment(
+@router.delete("/{appointment_id}", response_model=MessageResponse)
+async def cancel_appointment(
     appointment_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel an appointment"""
-    appointment = db.query(Appointment).filter(
-        Appointment.id == appointment_id
-    ).first()
+    appointment = await db.scalar(
+        select(Appointment).where(Appointment.id == appointment_id)
+    )
     
     if not appointment:
         raise HTTPException(
@@ -178,84 +239,84 @@ def cancel_appointment(
                 detail="You can only cancel your own appointments"
             )
     
-    appointment.status = AppointmentStatus.CANCELLED
-    db.commit()
+    affected = await set_status(db, appointment, AppointmentStatus.CANCELLED)
+    await db.commit()
+    if affected:
+        await slot_cache.invalidate(*affected)
     
-    return {"message": "Appointment cancelled successfully"}
+    return MessageResponse(message="Appointment cancelled successfully")
 
-@router.get("/upcoming")
-def get_upcoming_appointments(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get upcoming appointments for the current user"""
-    from datetime import datetime
-    
+def appointment_listing_query():
+    """
+    Listing rows as one statement: appointment columns plus the patient's and
+    doctor's names, joined instead of loading two User objects per row
+    """
+    return select(
+        Appointment.id,
+        PatientUser.fname.label("patient_fname"),
+        PatientUser.lname.label("patient_lname"),
+        DoctorUser.fname.label("doctor_fname"),
+        DoctorUser.lname.label("doctor_lname"),
+        Appointment.appointment_date,
+        Appointment.reason,
+        Appointment.status,
+        Appointment.notes,
+    ).join(
+        PatientUser, PatientUser.id == Appointment.patient_id
+    ).join(
+        DoctorUser, DoctorUser.id == Appointment.doctor_id
+    )
+
+def scope_to_user(query, current_user: Principal):
+    """Patients see their own appointments, doctors theirs, admins all"""
     if current_user.role.value == "patient":
-        appointments = db.query(Appointment).filter(
-            Appointment.patient_id == current_user.id,
-            Appointment.appointment_date > datetime.utcnow(),
-            Appointment.status.in_(["confirmed", "pending"])
-        ).order_by(Appointment.appointment_date).all()
-    elif current_user.role.value == "doctor":
-        appointments = db.query(Appointment).filter(
-            Appointment.doctor_id == current_user.id,
-            Appointment.appointment_date > datetime.utcnow(),
-            Appointment.status.in_(["confirmed", "pending"])
-        ).order_by(Appointment.appointment_date).all()
-    else:
-        # Admin can see all upcoming appointments
-        appointments = db.query(Appointment).filter(
-            Appointment.appointment_date > datetime.utcnow(),
-            Appointment.status.in_(["confirmed", "pending"])
-        ).order_by(Appointment.appointment_date).all()
-    
-    return [
-        {
-            "id": appointment.id,
-            "patient_name": f"{appointment.patient.fname} {appointment.patient.lname}",
-            "doctor_name": f"{appointment.doctor.fname} {appointment.doctor.lname}",
-            "appointment_date": appointment.appointment_date,
-            "reason": appointment.reason,
-            "status": appointment.status.value,
-            "notes": appointment.notes
-        }
-        for appointment in appointments
-    ]
+        return query.where(Appointment.patient_id == current_user.id)
+    if current_user.role.value == "doctor":
+        return query.where(Appointment.doctor_id == current_user.id)
+    return query
+
+def to_list_item(row) -> AppointmentListItem:
+    return AppointmentListItem(
+        id=row.id,
+        patient_name=f"{row.patient_fname} {row.patient_lname}",
+        doctor_name=f"{row.doctor_fname} {row.doctor_lname}",
+        appointment_date=row.appointment_date,
+        reason=row.reason,
+        status=row.status,
+        notes=row.notes
+    )
 
-@router.get("/history")
-def get_appointment_history(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/upcoming", response_model=List[AppointmentListItem])
+async def get_upcoming_appointments(
+    response: Response,
+    page: PageRequest = Depends(page_request),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get appointment history for the current user"""
-    from datetime import datetime
+    """Get upcoming appointments for the current user, soonest first, one page at a time"""
+    query = appointment_listing_query().where(
+        Appointment.appointment_date > datetime.utcnow(),
+        Appointment.status.in_(["confirmed", "pending"])
+    )
+    query = scope_to_user(query, current_user)
     
-    if current_user.role.value == "patient":
-        appointments = db.query(Appointment).filter(
-            Appointment.patient_id == current_user.id,
-            Appointment.appointment_date < datetime.utcnow()
-        ).order_by(Appointment.appointment_date.desc()).all()
-    elif current_user.role.value == "doctor":
-        appointments = db.query(Appointment).filter(
-            Appointment.doctor_id == current_user.id,
-            Appointment.appointment_date < datetime.utcnow()
-        ).order_by(Appointment.appointment_date.desc()).all()
-    else:
-        # Admin can see all appointment history
-        appointments = db.query(Appointment).filter(
-            Appointment.appointment_date < datetime.utcnow()
-        ).order_by(Appointment.appointment_date.desc()).all()
+    query = APPOINTMENTS_SOONEST_FIRST.paginate(query, page)
+    rows = APPOINTMENTS_SOONEST_FIRST.page((await db.execute(query)).all(), page, response)
+    return typed_json(APPOINTMENT_LISTING, [to_list_item(row) for row in rows], response)
+
+@router.get("/history", response_model=List[AppointmentListItem])
+async def get_appointment_history(
+    response: Response,
+    page: PageRequest = Depends(page_request),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get appointment history for the current user, latest first, one page at a time"""
+    query = appointment_listing_query().where(
+        Appointment.appointment_date < datetime.utcnow()
+    )
+    query = scope_to_user(query, current_user)
     
-    return [
-        {
-            "id": appointment.id,
-            "patient_name": f"{appointment.patient.fname} {appointment.patient.lname}",
-            "doctor_name": f"{appointment.doctor.fname} {appointment.doctor.lname}",
-            "appointment_date": appointment.appointment_date,
-            "reason": appointment.reason,
-            "status": appointment.status.value,
-            "notes": appointment.notes
-        }
-        for appointment in appointments
-    ]
+    query = APPOINTMENTS_LATEST_FIRST.paginate(query, page)
+    rows = APPOINTMENTS_LATEST_FIRST.page((await db.execute(query)).all(), page, response)
+    return typed_json(APPOINTMENT_LISTING, [to_list_item(row) for row in rows], response)
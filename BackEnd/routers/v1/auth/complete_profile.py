@@ -3,13 +3,14 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional
 from core.database import get_db
+from core.principal_cache import principal_cache
 from models.users import User, UserRole
 from models.doctor import Doctor
 from models.location import Province, City, Barangay
-from core.security import create_access_token, create_refresh_token, get_password_hash
+from core.security import create_access_token, create_refresh_token, get_password_hash_async
 from core.config import settings
-import cloudinary.uploader
-from core.cloudinary_config import cloudinary
+from core.cloudinary_config import cloudinary_uploader
+from utils.validators import validate_file_upload
 import json
 
 router = APIRouter()
@@ -39,6 +40,11 @@ async def complete_profile(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Reject bad uploads before anything is written
+    for upload in (prc_license_front, prc_license_back, prc_license_selfie):
+        if upload:
+            validate_file_upload(upload.filename, upload.size)
+
     # ✅ Province: check if exists, if not create
     province_obj = db.query(Province).filter(
         Province.name.ilike(province.strip())
@@ -75,7 +81,10 @@ async def complete_profile(
     user.sex = sex == "1"
     user.dob = datetime.strptime(dob, "%Y-%m-%d").date()
     user.contact_number = contact_number
-    user.password = get_password_hash(password)
+    try:
+        user.password = await get_password_hash_async(password)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     user.is_profile_complete = True
     user.province_id = province_obj.id
     user.city_id = city_obj.id
@@ -102,16 +111,17 @@ async def complete_profile(
         )
 
         # Upload files to Cloudinary
+        uploader = cloudinary_uploader() if prc_license_front or prc_license_back or prc_license_selfie else None
         if prc_license_front:
-            result = cloudinary.uploader.upload(prc_license_front.file, folder=f"licenses/{user.id}")
+            result = uploader.upload(prc_license_front.file, folder=f"licenses/{user.id}")
             doctor.prc_license_front = result["secure_url"]
 
         if prc_license_back:
-            result = cloudinary.uploader.upload(prc_license_back.file, folder=f"licenses/{user.id}")
+            result = uploader.upload(prc_license_back.file, folder=f"licenses/{user.id}")
             doctor.prc_license_back = result["secure_url"]
 
         if prc_license_selfie:
-            result = cloudinary.uploader.upload(prc_license_selfie.file, folder=f"licenses/{user.id}")
+            result = uploader.upload(prc_license_selfie.file, folder=f"licenses/{user.id}")
             doctor.prc_license_selfie = result["secure_url"]
 
         # Parse specializations JSON string
@@ -126,6 +136,7 @@ async def complete_profile(
 
     # ✅ Commit all changes at once
     db.commit()
+    principal_cache.invalidate(user.id)
     db.refresh(user)
 
     # ✅ Generate tokens
@@ -1,19 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import secrets
-from core.database import get_db
+from core.database import get_db, get_async_db
+from core.security import get_password_hash_async
 from models.users import User
 from core.email import send_email
-from passlib.context import CryptContext
 
 # Initialize router with prefix and tag
 router = APIRouter(prefix="/password-reset", tags=["Password Reset"])
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 # -----------------------------
 # ✅ Schemas
@@ -95,23 +94,26 @@ def verify_otp(
 # ✅ Step 3: Confirm New Password
 # -----------------------------
 @router.post("/confirm", summary="Confirm new password after OTP verification")
-def confirm_password_reset(
+async def confirm_password_reset(
     data: PasswordResetConfirm,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     User submits their email + new password → Update the password.
     """
-    user = db.query(User).filter(User.email == data.email).first()
+    user = await db.scalar(select(User).where(User.email == data.email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Hash new password
-    hashed_pw = pwd_context.hash(data.new_password)
+    try:
+        hashed_pw = await get_password_hash_async(data.new_password)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     user.password = hashed_pw
     user.reset_token = None
     user.reset_token_expires = None
-    db.commit()
+    await db.commit()
 
     return {"message": "Password successfully reset."}
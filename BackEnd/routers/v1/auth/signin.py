@@ -1,20 +1,22 @@
 # routers/v1/auth/signin.py
 
 import urllib.parse
-import requests
+from types import SimpleNamespace
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 from core.config import settings
-from core.database import get_db
+from core.database import get_db, get_async_db
+from core.lazy_imports import deferred
+from core.principal_cache import principal_cache
 from core.security import (
     create_access_token,
     create_refresh_token,
-    verify_password,
+    verify_password_async,
     ACCESS_TOKEN_EXPIRE_SECONDS,
 )
 from models.users import User, UserRole
@@ -23,6 +25,19 @@ from schemas.auth import LoginRequest
 router = APIRouter()
 
 
+@deferred("google.auth")
+def google_auth():
+    """requests and a Google ID token verifier, imported on first use"""
+    import requests
+    from google.auth.transport import requests as google_requests
+    from google.oauth2 import id_token
+
+    def verify_oauth2_token(token: str, audience: str, **kwargs) -> dict:
+        return id_token.verify_oauth2_token(token, google_requests.Request(), audience, **kwargs)
+
+    return SimpleNamespace(requests=requests, verify_oauth2_token=verify_oauth2_token)
+
+
 # -----------------------------------------
 # Helper - Standard Response
 # -----------------------------------------
@@ -97,6 +112,7 @@ def handle_google_auth(idinfo: dict, db: Session, redirect_flow: bool = False):
             user.is_profile_complete = True  # admin always complete
 
         db.commit()
+        principal_cache.invalidate(user.id)
         db.refresh(user)
 
     # 🔐 Generate tokens
@@ -147,10 +163,10 @@ def handle_google_auth(idinfo: dict, db: Session, redirect_flow: bool = False):
 # Email/Password Signin
 # -----------------------------------------
 @router.post("/signin", summary="Email/Password Signin")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
 
-    if not user or not user.password or not verify_password(data.password, user.password):
+    if not user or not user.password or not await verify_password_async(data.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
     # 🛠 Ensure proper role assignment before tokens
@@ -175,8 +191,9 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
     if user.role == UserRole.ADMIN:
         user.is_profile_complete = True
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate(user.id)
+    await db.refresh(user)
 
     return build_response(user, access_token, refresh_token, "signin")
 
@@ -220,15 +237,14 @@ def google_callback(code: str = Query(None), error: str = Query(None), db: Sessi
             "grant_type": "authorization_code",
         }
 
-        response = requests.post(token_url, data=data)
+        response = google_auth().requests.post(token_url, data=data)
         if not response.ok:
             error_url = f"{settings.FRONTEND_URL}/auth/callback?error={urllib.parse.quote('Failed to exchange code for token')}"
             return RedirectResponse(url=error_url)
 
         tokens = response.json()
-        idinfo = id_token.verify_oauth2_token(
+        idinfo = google_auth().verify_oauth2_token(
             tokens["id_token"],
-            google_requests.Request(),
             settings.GOOGLE_CLIENT_ID,
             clock_skew_in_seconds=10
         )
@@ -247,9 +263,8 @@ def google_signin(payload: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Missing Google ID token")
 
     try:
-        idinfo = id_token.verify_oauth2_token(
+        idinfo = google_auth().verify_oauth2_token(
             id_token_str,
-            google_requests.Request(),
             settings.GOOGLE_CLIENT_ID
         )
     except Exception as e:
@@ -1,8 +1,10 @@
 # routers/v1/dependencies.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from core.database import get_db
+from core.database import get_db, get_async_db
+from core.principal_cache import Principal, principal_cache
 from models.users import User, UserRole
 from jose import JWTError
 
@@ -26,13 +28,50 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-        return user
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)) -> Principal:
+    """
+    Decode JWT access token and return a cached identity snapshot of the user.
+    Use this instead of get_current_user when the handler only needs id and role;
+    the users table is only read on a cache miss.
+    """
+    from core.security import decode_access_token
+
+    try:
+        payload = decode_access_token(token)
+        user_id = payload.get("user_id")
+        if not user_id:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            row = (await db.execute(
+                select(User.id, User.role, User.is_active, User.is_profile_complete).where(User.id == user_id)
+            )).first()
+            if not row:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+            principal = Principal.from_user(row)
+            principal_cache.set(principal)
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    # Deactivation invalidates the cached principal, so this sees it at once
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return principal
+
+def get_current_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
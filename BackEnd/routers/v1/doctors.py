@@ -1,48 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
 
-from core.database import get_db
+from core.database import get_async_db
+from core.responses import typed_json
 from models.doctor import Doctor
 from schemas.doctor import Doctor as DoctorSchema
 
 router = APIRouter()
 
+DOCTOR_LIST = TypeAdapter(List[DoctorSchema])
+
 @router.get("/", response_model=List[DoctorSchema])
-def get_doctors(db: Session = Depends(get_db)):
+async def get_doctors(db: AsyncSession = Depends(get_async_db)):
     """
     Get all doctors with their linked user info, specialization, and location
     """
     doctors = (
-        db.query(Doctor)
-        .options(
-            joinedload(Doctor.user),
-            joinedload(Doctor.specializations),
-            joinedload(Doctor.province),
-            joinedload(Doctor.city),
-            joinedload(Doctor.barangay),
+        await db.scalars(
+            select(Doctor)
+            .options(
+                joinedload(Doctor.user),
+                joinedload(Doctor.specializations),
+                joinedload(Doctor.province),
+                joinedload(Doctor.city),
+                joinedload(Doctor.barangay),
+            )
         )
-        .all()
-    )
+    ).unique().all()
 
     if not doctors:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No doctors found")
 
-    return [
-        DoctorSchema(
-            doctor_id=doc.doctor_id,
-            user_id=doc.user_id,
-            name=f"{doc.user.fname} {doc.user.lname}",
-            email=doc.user.email,
-            specialization=doc.specializations[0].name if doc.specializations else "General Practice",
-            license_number=doc.license_number,
-            years_of_experience=doc.years_of_experience,
-            address=f"{doc.barangay.name if doc.barangay else ''}, "
-                    f"{doc.city.name if doc.city else ''}, "
-                    f"{doc.province.name if doc.province else ''}",
-            is_verified=doc.is_verified,
-            created_at=doc.created_at,
-            updated_at=doc.updated_at
-        )
-        for doc in doctors
-    ]
+    return typed_json(DOCTOR_LIST, doctors)
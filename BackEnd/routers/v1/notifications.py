@@ -1,48 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from core.database import get_db
+from core.database import get_async_db
+from core.responses import typed_json
+from core.principal_cache import Principal
 from models.notification import Notification
-from routers.v1.dependencies import get_current_user
-from models.users import User
+from routers.v1.dependencies import get_current_principal
+from schemas.common import MessageResponse
+from schemas.notification import NotificationListItem, UnreadCountResponse
+from utils.pagination import Keyset, PageRequest, page_request
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_notifications(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+NOTIFICATIONS_NEWEST_FIRST = Keyset(
+    "notifications-newest", Notification.created_at, Notification.id, descending=True
+)
+
+NOTIFICATION_LIST = TypeAdapter(List[NotificationListItem])
+
+@router.get("/", response_model=List[NotificationListItem])
+async def get_notifications(
+    response: Response,
+    page: PageRequest = Depends(page_request),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all notifications for the current user"""
-    notifications = db.query(Notification).filter(
+    """Get notifications for the current user, newest first, one page at a time"""
+    query = NOTIFICATIONS_NEWEST_FIRST.paginate(select(Notification).where(
         Notification.target_user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).all()
+    ), page)
+    notifications = NOTIFICATIONS_NEWEST_FIRST.page((await db.scalars(query)).all(), page, response)
     
-    return [
-        {
-            "id": notification.id,
-            "title": notification.title,
-            "message": notification.message,
-            "type": notification.type,
-            "is_read": notification.is_read,
-            "created_at": notification.created_at,
-            "appointment_id": notification.appointment_id
-        }
-        for notification in notifications
-    ]
+    return typed_json(NOTIFICATION_LIST, notifications, response)
 
-@router.patch("/{notification_id}/read")
-def mark_notification_read(
+@router.patch("/{notification_id}/read", response_model=MessageResponse)
+async def mark_notification_read(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a notification as read"""
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.target_user_id == current_user.id
-    ).first()
+    ))
     
     if not notification:
         raise HTTPException(
@@ -51,21 +55,21 @@ def mark_notification_read(
         )
     
     notification.is_read = True
-    db.commit()
+    await db.commit()
     
-    return {"message": "Notification marked as read"}
+    return MessageResponse(message="Notification marked as read")
 
-@router.delete("/{notification_id}")
-def delete_notification(
+@router.delete("/{notification_id}", response_model=MessageResponse)
+async def delete_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a notification"""
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.target_user_id == current_user.id
-    ).first()
+    ))
     
     if not notification:
         raise HTTPException(
@@ -73,36 +77,36 @@ def delete_notification(
             detail="Notification not found"
         )
     
-    db.delete(notification)
-    db.commit()
+    await db.delete(notification)
+    await db.commit()
     
-    return {"message": "Notification deleted"}
+    return MessageResponse(message="Notification deleted")
 
-@router.patch("/mark-all-read")
-def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.patch("/mark-all-read", response_model=MessageResponse)
+async def mark_all_notifications_read(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark all notifications as read for the current user"""
-    db.query(Notification).filter(
+    await db.execute(update(Notification).where(
         Notification.target_user_id == current_user.id,
         Notification.is_read == False
-    ).update({"is_read": True})
+    ).values(is_read=True))
     
-    db.commit()
+    await db.commit()
     
-    return {"message": "All notifications marked as read"}
+    return MessageResponse(message="All notifications marked as read")
 
-@router.get("/unread-count")
-def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get count of unread notifications"""
-    unread_count = db.query(Notification).filter(
+    unread_count = await db.scalar(select(func.count(Notification.id)).where(
         Notification.target_user_id == current_user.id,
         Notification.is_read == False
-    ).count()
+    ))
     
-    return {"unread_count": unread_count}
+    return UnreadCountResponse(unread_count=unread_count)
 
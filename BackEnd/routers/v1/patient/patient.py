@@ -1,23 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from typing import List, Optional
 
 from core.database import get_db
+from core.responses import typed_json
+from core.principal_cache import principal_cache
 from models.users import User
 from models.doctor import Doctor
 from models.location import City, Province
 from routers.v1.dependencies import get_current_user
+from schemas.doctor import AvailableDoctor, AvailableDoctorDetail
+from schemas.users import PatientProfile, ProfileUpdateResponse
 
 router = APIRouter()
 
-@router.get("/doctors", response_model=List[dict])
+AVAILABLE_DOCTOR_LIST = TypeAdapter(List[AvailableDoctor])
+
+@router.get("/doctors", response_model=List[AvailableDoctor])
 def get_available_doctors(
     specialization: Optional[str] = None,
     city: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get list of available doctors with optional filtering"""
-    query = db.query(Doctor).join(User).filter(
+    # User, city and province come with the doctor row, not one query each
+    query = db.query(Doctor).join(User).options(
+        contains_eager(Doctor.user), joinedload(Doctor.city), joinedload(Doctor.province)
+    ).filter(
         User.is_active == True,
         User.role == "doctor",
         Doctor.is_verified == True
@@ -27,26 +37,13 @@ def get_available_doctors(
         query = query.filter(Doctor.specializations_json.contains(specialization))
     
     if city:
-        query = query.join(User).filter(User.city_id == city)
+        query = query.filter(User.city_id == city)
     
     doctors = query.all()
     
-    return [
-        {
-            "doctor_id": doctor.doctor_id,
-            "user_id": doctor.user_id,
-            "name": f"{doctor.user.fname} {doctor.user.lname}",
-            "email": doctor.user.email,
-            "specializations": doctor.specializations_json,
-            "years_of_experience": doctor.years_of_experience,
-            "is_verified": doctor.is_verified,
-            "city": doctor.city.name if doctor.city else None,
-            "province": doctor.province.name if doctor.province else None
-        }
-        for doctor in doctors
-    ]
+    return typed_json(AVAILABLE_DOCTOR_LIST, doctors)
 
-@router.get("/doctors/{doctor_id}", response_model=dict)
+@router.get("/doctors/{doctor_id}", response_model=AvailableDoctorDetail)
 def get_doctor_details(
     doctor_id: int,
     db: Session = Depends(get_db)
@@ -60,21 +57,9 @@ def get_doctor_details(
             detail="Doctor not found"
         )
     
-    return {
-        "doctor_id": doctor.doctor_id,
-        "user_id": doctor.user_id,
-        "name": f"{doctor.user.fname} {doctor.user.lname}",
-        "email": doctor.user.email,
-        "specializations": doctor.specializations_json,
-        "years_of_experience": doctor.years_of_experience,
-        "is_verified": doctor.is_verified,
-        "license_number": doctor.license_number,
-        "city": doctor.city.name if doctor.city else None,
-        "province": doctor.province.name if doctor.province else None,
-        "barangay": doctor.barangay.name if doctor.barangay else None
-    }
+    return doctor
 
-@router.get("/profile", response_model=dict)
+@router.get("/profile", response_model=PatientProfile)
 def get_patient_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -86,27 +71,27 @@ def get_patient_profile(
             detail="Only patients can access this endpoint"
         )
     
-    return {
-        "id": current_user.id,
-        "email": current_user.email,
-        "fname": current_user.fname,
-        "mname": current_user.mname,
-        "lname": current_user.lname,
-        "name": f"{current_user.fname} {current_user.lname}",
-        "sex": current_user.sex,
-        "dob": current_user.dob,
-        "contact_number": current_user.contact_number,
-        "picture": current_user.picture,
-        "is_verified": current_user.is_verified,
-        "is_profile_complete": current_user.is_profile_complete,
-        "province": current_user.province.name if current_user.province else None,
-        "city": current_user.city.name if current_user.city else None,
-        "barangay": current_user.barangay.name if current_user.barangay else None,
-        "created_at": current_user.created_at,
-        "last_login": current_user.last_login
-    }
+    return PatientProfile(
+        id=current_user.id,
+        email=current_user.email,
+        fname=current_user.fname,
+        mname=current_user.mname,
+        lname=current_user.lname,
+        name=f"{current_user.fname} {current_user.lname}",
+        sex=current_user.sex,
+        dob=current_user.dob,
+        contact_number=current_user.contact_number,
+        picture=current_user.picture,
+        is_verified=current_user.is_verified,
+        is_profile_complete=current_user.is_profile_complete,
+        province=current_user.province.name if current_user.province else None,
+        city=current_user.city.name if current_user.city else None,
+        barangay=current_user.barangay.name if current_user.barangay else None,
+        created_at=current_user.created_at,
+        last_login=current_user.last_login
+    )
 
-@router.put("/profile", response_model=dict)
+@router.put("/profile", response_model=ProfileUpdateResponse)
 def update_patient_profile(
     fname: Optional[str] = None,
     mname: Optional[str] = None,
@@ -153,10 +138,11 @@ def update_patient_profile(
     current_user.is_profile_complete = all(field is not None for field in required_fields)
     
     db.commit()
+    principal_cache.invalidate(current_user.id)
     db.refresh(current_user)
     
-    return {
-        "message": "Profile updated successfully",
-        "is_profile_complete": current_user.is_profile_complete
-    }
+    return ProfileUpdateResponse(
+        message="Profile updated successfully",
+        is_profile_complete=current_user.is_profile_complete
+    )
 
@@ -1,68 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import or_, select
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from datetime import datetime, date, time, timedelta
 
-from core.database import get_db
-from models.doctor import DoctorAvailability, Doctor
-from models.users import User
-from routers.v1.dependencies import get_current_user
+from core.config import settings
+from core.database import get_async_db
+from core.responses import typed_json
+from core.principal_cache import Principal
+from core.slot_cache import slot_cache
+from core.slot_horizon import compute_slots, day_slots, refresh_slots
+from models.appointment import SlotHold
+from models.doctor import DoctorAvailability, Doctor, DoctorSlot, Specialization
+from models.location import City
+from routers.v1.dependencies import get_current_principal
+from schemas.common import MessageResponse
+from schemas.schedule import AvailableSlot, AvailableSlotsResponse, ScheduleResponse, SlotPolicyResponse, SlotSearchResult
+from utils.slots import merge_earliest
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_doctor_schedules(
+SCHEDULE_LIST = TypeAdapter(List[ScheduleResponse])
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+def parse_time(value: str) -> time:
+    """Parse an HH:MM[:SS] string; asyncpg will not coerce strings for TIME columns."""
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid time format. Use HH:MM"
+        )
+
+def parse_weekday(value: str) -> str:
+    """Normalize a day name to its capitalized form (e.g. "Monday")"""
+    day = value.strip().capitalize()
+    if day not in WEEKDAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid day_of_week. Must be one of: {', '.join(WEEKDAYS)}"
+        )
+    return day
+
+async def refresh_schedule_slots(db: AsyncSession, schedule: DoctorAvailability) -> Tuple[int, Optional[date]]:
+    """
+    Rebuild the stored slots a schedule row affects: its date, or every day
+    for a weekly rule. Returns (doctor_id, date or None) for invalidate_cached_slots
+    """
+    day = schedule.date.date() if schedule.date is not None else None
+    await refresh_slots(db, schedule.doctor_id, day, day)
+    return schedule.doctor_id, day
+
+async def invalidate_cached_slots(doctor_id: int, day: Optional[date]):
+    """Drop cached slots after a schedule change is committed"""
+    if day is None:
+        await slot_cache.invalidate_doctor(doctor_id)
+    else:
+        await slot_cache.invalidate(doctor_id, [day])
+
+def candidate_doctors(doctor_ids: Optional[List[int]], specialization: Optional[str], city: Optional[str]) -> list:
+    """WHERE clauses on Doctor for the doctors a patient can book"""
+    clauses = [Doctor.is_verified == True, Doctor.is_accepting_patients.isnot(False)]
+    if doctor_ids:
+        clauses.append(Doctor.doctor_id.in_(doctor_ids))
+    if specialization:
+        clauses.append(Doctor.specializations.any(Specialization.name.ilike(specialization.strip())))
+    if city:
+        clauses.append(Doctor.city.has(City.name.ilike(city.strip())))
+    return clauses
+
+@router.get("/", response_model=List[ScheduleResponse])
+async def get_doctor_schedules(
     doctor_id: Optional[int] = None,
     date_filter: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get doctor schedules with optional filtering"""
-    query = db.query(DoctorAvailability)
+    query = select(DoctorAvailability)
     
     if doctor_id:
-        query = query.filter(DoctorAvailability.doctor_id == doctor_id)
+        query = query.where(DoctorAvailability.doctor_id == doctor_id)
     
     if date_filter:
-        query = query.filter(DoctorAvailability.date == date_filter)
-    
-    schedules = query.all()
-    
-    return [
-        {
-            "id": schedule.id,
-            "doctor_id": schedule.doctor_id,
-            "date": schedule.date,
-            "start_time": schedule.start_time,
-            "end_time": schedule.end_time,
-            "is_available": schedule.is_available,
-            "notes": schedule.notes
-        }
-        for schedule in schedules
-    ]
+        query = query.where(DoctorAvailability.date == datetime.combine(date_filter, datetime.min.time()))
+    
+    schedules = (await db.scalars(query)).all()
+    
+    return typed_json(SCHEDULE_LIST, schedules)
 
-@router.post("/", response_model=dict)
-def create_schedule(
+@router.post("/", response_model=ScheduleResponse)
+async def create_schedule(
     doctor_id: int,
-    date: date,
     start_time: str,
     end_time: str,
+    date: Optional[date] = None,
+    day_of_week: Optional[str] = None,
     is_available: bool = True,
     notes: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new schedule entry (doctors only)"""
+    """
+    Create a new schedule entry (doctors only): either a weekly rule
+    (day_of_week) or a date-specific entry (date). Open date entries replace
+    the weekly rules for that day; is_available=false ones block time off.
+    """
     if current_user.role.value != "doctor":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only doctors can create schedules"
         )
     
+    if (date is None) == (day_of_week is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give either date or day_of_week"
+        )
+    
     # Verify the doctor exists and belongs to the current user
-    doctor = db.query(Doctor).filter(
+    doctor = await db.scalar(select(Doctor).where(
         Doctor.doctor_id == doctor_id,
         Doctor.user_id == current_user.id
-    ).first()
+    ))
     
     if not doctor:
         raise HTTPException(
@@ -72,41 +136,167 @@ def create_schedule(
     
     schedule = DoctorAvailability(
         doctor_id=doctor_id,
-        date=date,
-        start_time=start_time,
-        end_time=end_time,
+        date=datetime.combine(date, datetime.min.time()) if date is not None else None,
+        day_of_week=parse_weekday(day_of_week) if day_of_week is not None else None,
+        start_time=parse_time(start_time),
+        end_time=parse_time(end_time),
         is_available=is_available,
         notes=notes
     )
     
     db.add(schedule)
-    db.commit()
-    db.refresh(schedule)
-    
-    return {
-        "id": schedule.id,
-        "doctor_id": schedule.doctor_id,
-        "date": schedule.date,
-        "start_time": schedule.start_time,
-        "end_time": schedule.end_time,
-        "is_available": schedule.is_available,
-        "notes": schedule.notes
+    affected = await refresh_schedule_slots(db, schedule)
+    await db.commit()
+    await invalidate_cached_slots(*affected)
+    await db.refresh(schedule)
+    
+    return ScheduleResponse.model_validate(schedule)
+
+@router.get(
+    "/available-slots",
+    response_class=StreamingResponse,
+    responses={200: {
+        "description": "Newline-delimited SlotSearchResult objects, earliest first",
+        "content": {"application/x-ndjson": {}}
+    }}
+)
+async def search_available_slots(
+    doctor_ids: Optional[List[int]] = Query(None),
+    specialization: Optional[str] = None,
+    city: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Earliest free slots across doctors over a date range (default: the next
+    7 days), streamed as NDJSON. Candidates are verified doctors accepting
+    patients, narrowed by doctor_ids, specialization and/or city. Slots held
+    during another patient's checkout are left out.
+    """
+    date_from = date_from or datetime.utcnow().date()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
+        )
+    if (date_to - date_from).days >= settings.SLOT_SEARCH_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Search at most {settings.SLOT_SEARCH_MAX_DAYS} days at a time"
+        )
+    
+    now = datetime.utcnow()
+    range_end = datetime.combine(date_to, datetime.min.time()) + timedelta(days=1)
+    not_before = max(datetime.combine(date_from, datetime.min.time()), now)
+    candidates = candidate_doctors(doctor_ids, specialization, city)
+    
+    # Doctors materialized through date_to: the earliest `limit` slots are one
+    # range scan on doctor_slots, skipping slots held during someone's checkout
+    # (one probe of the slot_holds unique index per slot)
+    stored = defaultdict(list)
+    for doctor_id, start, end in await db.execute(select(
+        DoctorSlot.doctor_id, DoctorSlot.start_time, DoctorSlot.end_time
+    ).join(Doctor, Doctor.doctor_id == DoctorSlot.doctor_id).where(
+        *candidates,
+        Doctor.slot_horizon >= date_to,
+        DoctorSlot.start_time >= not_before,
+        DoctorSlot.start_time < range_end,
+        ~select(SlotHold.id).where(
+            SlotHold.doctor_id == Doctor.user_id,
+            SlotHold.start_time == DoctorSlot.start_time,
+            SlotHold.expires_at > now
+        ).exists()
+    ).order_by(DoctorSlot.start_time).limit(limit)):
+        stored[doctor_id].append((start, end))
+    
+    # The rest (not reached by the horizon job yet, or a range past their
+    # horizon) are expanded on the fly
+    computed = await compute_slots(db, [
+        *candidates,
+        or_(Doctor.slot_horizon.is_(None), Doctor.slot_horizon < date_to)
+    ], date_from, date_to)
+    
+    held = set()
+    if computed:
+        held = set((await db.execute(select(Doctor.doctor_id, SlotHold.start_time).join(
+            Doctor, Doctor.user_id == SlotHold.doctor_id
+        ).where(
+            Doctor.doctor_id.in_(list(computed)),
+            SlotHold.start_time >= not_before,
+            SlotHold.start_time < range_end,
+            SlotHold.expires_at > now
+        ))).all())
+    
+    slots_by_doctor = {
+        **stored,
+        **{
+            doctor_id: (slot for slot in slots if slot[0] >= not_before and (doctor_id, slot[0]) not in held)
+            for doctor_id, slots in computed.items()
+        }
     }
+    
+    def stream():
+        for found, (doctor_id, (start, end)) in enumerate(merge_earliest(slots_by_doctor)):
+            if found == limit:
+                break
+            yield SlotSearchResult(doctor_id=doctor_id, start_time=start, end_time=end).model_dump_json() + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.put("/slot-policy", response_model=SlotPolicyResponse)
+async def update_slot_policy(
+    slot_minutes: Optional[int] = Query(None, ge=5, le=240),
+    buffer_minutes: Optional[int] = Query(None, ge=0, le=120),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Set the current doctor's appointment slot length and buffer time"""
+    if current_user.role.value != "doctor":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can change their slot policy"
+        )
+    
+    doctor = await db.scalar(select(Doctor).where(Doctor.user_id == current_user.id))
+    if not doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor profile not found"
+        )
+    
+    if slot_minutes is not None:
+        doctor.slot_minutes = slot_minutes
+    if buffer_minutes is not None:
+        doctor.buffer_minutes = buffer_minutes
+    
+    await refresh_slots(db, doctor.doctor_id)
+    await db.commit()
+    await slot_cache.invalidate_doctor(doctor.doctor_id)
+    
+    return SlotPolicyResponse(
+        doctor_id=doctor.doctor_id,
+        slot_minutes=doctor.slot_minutes,
+        buffer_minutes=doctor.buffer_minutes
+    )
 
-@router.put("/{schedule_id}", response_model=dict)
-def update_schedule(
+@router.put("/{schedule_id}", response_model=ScheduleResponse)
+async def update_schedule(
     schedule_id: int,
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     is_available: Optional[bool] = None,
+    is_active: Optional[bool] = None,
     notes: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a schedule entry"""
-    schedule = db.query(DoctorAvailability).filter(
+    schedule = await db.scalar(select(DoctorAvailability).where(
         DoctorAvailability.id == schedule_id
-    ).first()
+    ))
     
     if not schedule:
         raise HTTPException(
@@ -115,10 +305,10 @@ def update_schedule(
         )
     
     # Verify the schedule belongs to the current user's doctor profile
-    doctor = db.query(Doctor).filter(
+    doctor = await db.scalar(select(Doctor).where(
         Doctor.doctor_id == schedule.doctor_id,
         Doctor.user_id == current_user.id
-    ).first()
+    ))
     
     if not doctor:
         raise HTTPException(
@@ -127,37 +317,33 @@ def update_schedule(
         )
     
     if start_time is not None:
-        schedule.start_time = start_time
+        schedule.start_time = parse_time(start_time)
     if end_time is not None:
-        schedule.end_time = end_time
+        schedule.end_time = parse_time(end_time)
     if is_available is not None:
         schedule.is_available = is_available
+    if is_active is not None:
+        schedule.is_active = is_active
     if notes is not None:
         schedule.notes = notes
     
-    db.commit()
-    db.refresh(schedule)
-    
-    return {
-        "id": schedule.id,
-        "doctor_id": schedule.doctor_id,
-        "date": schedule.date,
-        "start_time": schedule.start_time,
-        "end_time": schedule.end_time,
-        "is_available": schedule.is_available,
-        "notes": schedule.notes
-    }
+    affected = await refresh_schedule_slots(db, schedule)
+    await db.commit()
+    await invalidate_cached_slots(*affected)
+    await db.refresh(schedule)
+    
+    return ScheduleResponse.model_validate(schedule)
 
-@router.delete("/{schedule_id}")
-def delete_schedule(
+@router.delete("/{schedule_id}", response_model=MessageResponse)
+async def delete_schedule(
     schedule_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a schedule entry"""
-    schedule = db.query(DoctorAvailability).filter(
+    schedule = await db.scalar(select(DoctorAvailability).where(
         DoctorAvailability.id == schedule_id
-    ).first()
+    ))
     
     if not schedule:
         raise HTTPException(
@@ -166,10 +352,10 @@ def delete_schedule(
         )
     
     # Verify the schedule belongs to the current user's doctor profile
-    doctor = db.query(Doctor).filter(
+    doctor = await db.scalar(select(Doctor).where(
         Doctor.doctor_id == schedule.doctor_id,
         Doctor.user_id == current_user.id
-    ).first()
+    ))
     
     if not doctor:
         raise HTTPException(
@@ -177,16 +363,18 @@ def delete_schedule(
             detail="You can only delete your own schedules"
         )
     
-    db.delete(schedule)
-    db.commit()
+    await db.delete(schedule)
+    affected = await refresh_schedule_slots(db, schedule)
+    await db.commit()
+    await invalidate_cached_slots(*affected)
     
-    return {"message": "Schedule deleted successfully"}
+    return MessageResponse(message="Schedule deleted successfully")
 
-@router.get("/doctor/{doctor_id}/available-slots")
-def get_available_slots(
+@router.get("/doctor/{doctor_id}/available-slots", response_model=AvailableSlotsResponse)
+async def get_available_slots(
     doctor_id: int,
     date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get available time slots for a doctor on a specific date"""
     try:
@@ -197,52 +385,27 @@ def get_available_slots(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Get doctor's availability for the specific date
-    availabilities = db.query(DoctorAvailability).filter(
-        DoctorAvailability.doctor_id == doctor_id,
-        DoctorAvailability.date == target_date,
-        DoctorAvailability.is_available == True
-    ).all()
-    
-    # Get existing appointments for the date
-    from models.appointment import Appointment
-    appointments = db.query(Appointment).filter(
-        Appointment.doctor_id == doctor_id,
-        Appointment.appointment_date >= datetime.combine(target_date, datetime.min.time()),
-        Appointment.appointment_date < datetime.combine(target_date, datetime.min.time()) + timedelta(days=1),
-        Appointment.status.in_(["confirmed", "pending"])
-    ).all()
-    
-    # Generate available slots
-    available_slots = []
-    for availability in availabilities:
-        start_time = availability.start_time
-        end_time = availability.end_time
-        
-        # Generate 30-minute slots
-        current_time = datetime.combine(target_date, start_time)
-        end_datetime = datetime.combine(target_date, end_time)
-        
-        while current_time < end_datetime:
-            slot_end = current_time + timedelta(minutes=30)
-            
-            # Check if slot is not booked
-            is_booked = any(
-                apt.appointment_date <= current_time < apt.appointment_date + timedelta(minutes=30)
-                for apt in appointments
+    # A hit only reads the doctor's cache generation; a miss reads the doctor row
+    slots, generation = await slot_cache.get(doctor_id, target_date)
+    if slots is None:
+        doctor = await db.scalar(select(Doctor).where(Doctor.doctor_id == doctor_id))
+        if not doctor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Doctor not found"
             )
-            
-            if not is_booked:
-                available_slots.append({
-                    "start_time": current_time.strftime("%H:%M"),
-                    "end_time": slot_end.strftime("%H:%M"),
-                    "datetime": current_time.isoformat()
-                })
-            
-            current_time += timedelta(minutes=30)
-    
-    return {
-        "doctor_id": doctor_id,
-        "date": date,
-        "available_slots": available_slots
-    }
+        slots = await day_slots(db, doctor, target_date)
+        await slot_cache.set(doctor_id, target_date, generation, slots)
+    
+    return AvailableSlotsResponse(
+        doctor_id=doctor_id,
+        date=date,
+        available_slots=[
+            AvailableSlot(
+                start_time=start.strftime("%H:%M"),
+                end_time=end.strftime("%H:%M"),
+                datetime=start.isoformat()
+            )
+            for start, end in slots
+        ]
+    )
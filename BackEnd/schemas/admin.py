@@ -0,0 +1,40 @@
+# schemas/admin.py
+from pydantic import AliasPath, BaseModel, ConfigDict, Field
+from typing import Optional
+from datetime import datetime
+from models.users import UserRole
+
+class AdminUserListItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    email: str
+    fname: str
+    lname: str
+    name: str
+    role: UserRole
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    is_profile_complete: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+class PendingDoctor(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    doctor_id: int
+    user_id: int
+    name: str = Field(validation_alias=AliasPath("user", "name"))
+    email: str = Field(validation_alias=AliasPath("user", "email"))
+    license_number: Optional[str] = None
+    years_of_experience: Optional[int] = None
+    specializations: Optional[str] = Field(None, validation_alias="specializations_json")
+    created_at: Optional[datetime] = Field(None, validation_alias=AliasPath("user", "created_at"))
+    prc_license_front: Optional[str] = None
+    prc_license_back: Optional[str] = None
+    prc_license_selfie: Optional[str] = None
+
+class AdminStats(BaseModel):
+    total_users: int
+    total_doctors: int
+    total_patients: int
+    pending_doctors: int
+    total_appointments: int
@@ -33,12 +33,34 @@ class AppointmentResponse(BaseModel):
     notes: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    patient_name: Optional[str] = None
-    doctor_name: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class AppointmentStatusResponse(BaseModel):
+    id: int
+    status: AppointmentStatus
+    notes: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class SlotHoldResponse(BaseModel):
+    """A slot reserved for the patient until expires_at (POST /appointments/holds)"""
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    doctor_id: int
+    start_time: datetime
+    expires_at: datetime
+
+class AppointmentListItem(BaseModel):
+    """One row of the upcoming/history listings, built from a joined column projection"""
+    id: int
+    patient_name: str
+    doctor_name: str
+    appointment_date: datetime
+    reason: Optional[str] = None
+    status: AppointmentStatus
+    notes: Optional[str] = None
+
 class Appointment(AppointmentBase):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -0,0 +1,6 @@
+# schemas/common.py
+from pydantic import BaseModel
+
+class MessageResponse(BaseModel):
+    """Acknowledgement returned by write endpoints with nothing else to report"""
+    message: str
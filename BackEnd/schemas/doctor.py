@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import AliasPath, BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -85,11 +85,33 @@ class Doctor(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     doctor_id: int
     user_id: int
-    name: str
-    email: str
-    specialization: str
+    name: str = Field(validation_alias=AliasPath("user", "name"))
+    email: str = Field(validation_alias=AliasPath("user", "email"))
+    # First linked specialization
+    specialization: str = Field("General Practice", validation_alias=AliasPath("specializations", 0, "name"))
     address: str
     is_verified: bool
     specializations: List[Specialization] = []
     created_at: datetime
     updated_at: datetime
+
+
+# ---------------------------
+# Patient-facing doctor listings
+# ---------------------------
+class AvailableDoctor(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    doctor_id: int
+    user_id: int
+    name: str = Field(validation_alias=AliasPath("user", "name"))
+    email: str = Field(validation_alias=AliasPath("user", "email"))
+    specializations: Optional[str] = Field(None, validation_alias="specializations_json")
+    years_of_experience: Optional[int] = None
+    is_verified: Optional[bool] = None
+    city: Optional[str] = Field(None, validation_alias=AliasPath("city", "name"))
+    province: Optional[str] = Field(None, validation_alias=AliasPath("province", "name"))
+
+
+class AvailableDoctorDetail(AvailableDoctor):
+    license_number: Optional[str] = None
+    barangay: Optional[str] = Field(None, validation_alias=AliasPath("barangay", "name"))
@@ -2,6 +2,8 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 from datetime import datetime
+from schemas.appointment import Appointment
+from schemas.users import UserResponse
 
 class NotificationBase(BaseModel):
     target_user_id: int
@@ -22,6 +24,19 @@ class Notification(NotificationBase):
     created_at: datetime
     updated_at: datetime
     status: bool
-    source_user: Optional[User] = None
-    target_user: Optional[User] = None
-    appointment: Optional[Appointment] = None
\ No newline at end of file
+    source_user: Optional[UserResponse] = None
+    target_user: Optional[UserResponse] = None
+    appointment: Optional[Appointment] = None
+
+class NotificationListItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    title: str
+    message: str
+    type: str
+    is_read: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    appointment_id: Optional[int] = None
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
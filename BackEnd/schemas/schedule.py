@@ -0,0 +1,37 @@
+# schemas/schedule.py
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import datetime, time
+
+class ScheduleResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    doctor_id: int
+    date: Optional[datetime] = None
+    day_of_week: Optional[str] = None
+    start_time: time
+    end_time: time
+    is_available: Optional[bool] = None
+    is_active: Optional[bool] = None
+    notes: Optional[str] = None
+
+class AvailableSlot(BaseModel):
+    start_time: str
+    end_time: str
+    datetime: str
+
+class AvailableSlotsResponse(BaseModel):
+    doctor_id: int
+    date: str
+    available_slots: List[AvailableSlot]
+
+class SlotPolicyResponse(BaseModel):
+    doctor_id: int
+    slot_minutes: int
+    buffer_minutes: int
+
+class SlotSearchResult(BaseModel):
+    """One line of the availability search stream"""
+    doctor_id: int
+    start_time: datetime
+    end_time: datetime
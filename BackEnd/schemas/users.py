@@ -72,3 +72,26 @@ class UserProfile(BaseModel):
         from_attributes = True
 
 
+
+class PatientProfile(BaseModel):
+    id: int
+    email: str
+    fname: str
+    mname: Optional[str] = None
+    lname: str
+    name: str
+    sex: Optional[bool] = None
+    dob: Optional[datetime] = None
+    contact_number: Optional[str] = None
+    picture: Optional[str] = None
+    is_verified: Optional[bool] = None
+    is_profile_complete: Optional[bool] = None
+    province: Optional[str] = None
+    city: Optional[str] = None
+    barangay: Optional[str] = None
+    created_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+class ProfileUpdateResponse(BaseModel):
+    message: str
+    is_profile_complete: bool
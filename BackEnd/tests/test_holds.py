@@ -0,0 +1,177 @@
+"""
+Slot holds during checkout (core/booking.py): one hold per patient and
+doctor, a cap across doctors, held slots missing from the availability
+search and the per-doctor slot list (cached or not), and request times with
+an offset converted to the UTC slot grid.
+"""
+import asyncio
+import json
+from datetime import datetime, time, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from core.booking import claim_hold, purge_expired_holds
+from core.config import settings
+from core.database import engine, new_async_session
+from models.appointment import SlotHold
+from models.doctor import Doctor, DoctorAvailability
+from models.users import UserRole
+
+
+@pytest.fixture
+def book_doctor(db, make_user):
+    """make_doctor(materialized=False): a doctor open 09:00-11:00 in three days; returns (user id, doctor_id, day, headers)"""
+    day = (datetime.utcnow() + timedelta(days=3)).date()
+
+    def make_doctor(materialized: bool = False):
+        user, headers = make_user(UserRole.DOCTOR)
+        doctor = Doctor(user_id=user.id, is_verified=True, slot_horizon=day if materialized else None)
+        db.add(doctor)
+        db.flush()
+        db.add(DoctorAvailability(doctor_id=doctor.doctor_id, date=datetime.combine(day, time()),
+                                  start_time=time(9), end_time=time(11)))
+        db.commit()
+        return user.id, doctor.doctor_id, day, headers
+
+    return make_doctor
+
+
+def hold(client, headers, doctor_user_id, start):
+    return client.post("/api/v1/appointments/holds",
+                       params={"doctor_id": doctor_user_id, "appointment_date": start}, headers=headers)
+
+
+def searched(client, doctor_id, day):
+    response = client.get("/api/v1/schedules/available-slots", params={
+        "doctor_ids": doctor_id, "date_from": day.isoformat(), "date_to": day.isoformat()
+    })
+    assert response.status_code == 200
+    return [json.loads(line)["start_time"] for line in response.text.splitlines()]
+
+
+def test_new_hold_replaces_the_previous_one_on_that_doctor(client, make_user, book_doctor):
+    doctor_user_id, _, day, _ = book_doctor()
+    _, patient = make_user(UserRole.PATIENT)
+    _, other = make_user(UserRole.PATIENT)
+    nine, half_past = f"{day}T09:00:00", f"{day}T09:30:00"
+
+    assert hold(client, patient, doctor_user_id, nine).status_code == 200
+    assert hold(client, patient, doctor_user_id, half_past).status_code == 200
+    # 09:00 was released by the second hold
+    assert hold(client, other, doctor_user_id, nine).status_code == 200
+    assert hold(client, other, doctor_user_id, half_past).status_code == 409
+
+
+def test_holds_are_capped_across_doctors(client, make_user, book_doctor):
+    _, patient = make_user(UserRole.PATIENT)
+    for _ in range(settings.BOOKING_HOLDS_PER_PATIENT):
+        doctor_user_id, _, day, _ = book_doctor()
+        assert hold(client, patient, doctor_user_id, f"{day}T09:00:00").status_code == 200
+
+    doctor_user_id, _, day, _ = book_doctor()
+    response = hold(client, patient, doctor_user_id, f"{day}T09:00:00")
+    assert response.status_code == 409
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="row locks need Postgres (set TEST_DATABASE_URL)")
+def test_concurrent_claims_respect_the_cap(client, make_user, book_doctor):
+    patient, headers = make_user(UserRole.PATIENT)
+    for _ in range(settings.BOOKING_HOLDS_PER_PATIENT - 1):
+        doctor_user_id, _, day, _ = book_doctor()
+        assert hold(client, headers, doctor_user_id, f"{day}T09:00:00").status_code == 200
+    racing = [book_doctor() for _ in range(2)]
+
+    async def race():
+        first, second = new_async_session(), new_async_session()
+        try:
+            doctor_user_id, _, day, _ = racing[0]
+            await claim_hold(first, doctor_user_id, patient.id, datetime.combine(day, time(9)))
+            doctor_user_id, _, day, _ = racing[1]
+            waiting = asyncio.ensure_future(claim_hold(second, doctor_user_id, patient.id, datetime.combine(day, time(9))))
+            await asyncio.sleep(0.2)
+            blocked = not waiting.done()
+            await first.commit()
+            try:
+                await waiting
+            except HTTPException as e:
+                return blocked, e.status_code
+            return blocked, 200
+        finally:
+            await first.close()
+            await second.close()
+
+    # The second claim waits for the first to commit, then finds the cap reached
+    assert client.portal.call(race) == (True, 409)
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+def test_search_leaves_out_held_slots(client, make_user, book_doctor, materialized):
+    doctor_user_id, doctor_id, day, doctor_headers = book_doctor(materialized)
+    if materialized:
+        # Rebuilds the stored slots up to the horizon
+        assert client.put("/api/v1/schedules/slot-policy", headers=doctor_headers).status_code == 200
+    _, patient = make_user(UserRole.PATIENT)
+
+    assert searched(client, doctor_id, day)[0] == f"{day}T09:00:00"
+    assert hold(client, patient, doctor_user_id, f"{day}T09:00:00").status_code == 200
+    assert searched(client, doctor_id, day) == [f"{day}T09:30:00", f"{day}T10:00:00", f"{day}T10:30:00"]
+
+
+def listed(client, doctor_id, day):
+    response = client.get(f"/api/v1/schedules/doctor/{doctor_id}/available-slots", params={"date": day.isoformat()})
+    assert response.status_code == 200
+    return [slot["datetime"] for slot in response.json()["available_slots"]]
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+def test_slot_list_follows_holds(client, db, make_user, book_doctor, materialized):
+    doctor_user_id, doctor_id, day, doctor_headers = book_doctor(materialized)
+    if materialized:
+        assert client.put("/api/v1/schedules/slot-policy", headers=doctor_headers).status_code == 200
+    _, patient = make_user(UserRole.PATIENT)
+    nine = f"{day}T09:00:00"
+
+    # Cached before the hold
+    assert listed(client, doctor_id, day)[0] == nine
+    held = hold(client, patient, doctor_user_id, nine)
+    assert held.status_code == 200
+    assert nine not in listed(client, doctor_id, day)
+
+    assert client.delete(f"/api/v1/appointments/holds/{held.json()['id']}", headers=patient).status_code == 200
+    assert listed(client, doctor_id, day)[0] == nine
+
+    held = hold(client, patient, doctor_user_id, nine)
+    assert nine not in listed(client, doctor_id, day)
+    db.query(SlotHold).filter(SlotHold.id == held.json()["id"]).update(
+        {SlotHold.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+    assert client.portal.call(purge_expired_holds) >= 1
+    assert listed(client, doctor_id, day)[0] == nine
+
+
+def test_offset_is_converted_to_utc(client, make_user, book_doctor):
+    doctor_user_id, _, day, _ = book_doctor()
+    _, patient = make_user(UserRole.PATIENT)
+
+    response = hold(client, patient, doctor_user_id, f"{day}T17:30:00+08:00")
+    assert response.status_code == 200
+    assert response.json()["start_time"] == f"{day}T09:30:00"
+    # 01:30 UTC, before the doctor's hours
+    assert hold(client, patient, doctor_user_id, f"{day}T09:30:00+08:00").status_code == 409
+
+
+def test_offset_time_in_the_past_is_refused(client, make_user, book_doctor):
+    doctor_user_id, _, _, _ = book_doctor()
+    _, patient = make_user(UserRole.PATIENT)
+    # An hour ago in UTC, though the wall-clock reading is seven hours ahead
+    an_hour_ago = (datetime.utcnow() - timedelta(hours=1)).replace(microsecond=0)
+    local = (an_hour_ago + timedelta(hours=8)).isoformat() + "+08:00"
+
+    response = hold(client, patient, doctor_user_id, local)
+    assert response.status_code == 400
+    assert "past" in response.text
+    response = client.post("/api/v1/appointments/",
+                           params={"doctor_id": doctor_user_id, "appointment_date": local}, headers=patient)
+    assert response.status_code == 400
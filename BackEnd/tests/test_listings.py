@@ -0,0 +1,77 @@
+"""
+Payloads of the listings that hand ORM rows straight to typed_json(): the
+schemas read nested and renamed attributes themselves (user.name,
+specializations_json, city.name, ...).
+"""
+import uuid
+
+import pytest
+
+from models.doctor import Doctor, Specialization
+from models.location import Barangay, City, Province
+from models.users import UserRole
+
+
+@pytest.fixture
+def listed_doctor(db, make_user):
+    """One verified and one unverified doctor; the verified one has a full address and a specialization"""
+    province = Province(name=f"Province {uuid.uuid4().hex[:8]}")
+    db.add(province)
+    db.flush()
+    city = City(name="Tagum", province_id=province.id)
+    db.add(city)
+    db.flush()
+    barangay = Barangay(name="Apokon", city_id=city.id)
+    db.add(barangay)
+    db.flush()
+
+    user, _ = make_user(UserRole.DOCTOR, fname="Ana", lname="Reyes")
+    doctor = Doctor(user_id=user.id, province_id=province.id, city_id=city.id, barangay_id=barangay.id,
+                    license_number="PRC-1", specializations_json='["Cardiology"]', is_verified=True)
+    doctor.specializations.append(Specialization(name="Cardiology"))
+    pending_user, _ = make_user(UserRole.DOCTOR, fname="Ben", lname="Cruz")
+    pending = Doctor(user_id=pending_user.id, is_verified=False)
+    db.add_all([doctor, pending])
+    db.commit()
+    return doctor, pending
+
+
+def test_doctor_list(client, listed_doctor):
+    doctor, pending = listed_doctor
+    listed = {item["doctor_id"]: item for item in client.get("/api/v1/doctors/").json()}
+
+    item = listed[doctor.doctor_id]
+    assert item["name"] == "Ana Reyes"
+    assert item["email"] == doctor.user.email
+    assert item["specialization"] == "Cardiology"
+    assert item["address"] == f"Apokon, Tagum, {doctor.province.name}"
+    assert listed[pending.doctor_id]["specialization"] == "General Practice"
+    assert listed[pending.doctor_id]["address"] == ", , "
+
+
+def test_available_doctors_and_detail(client, listed_doctor):
+    doctor, pending = listed_doctor
+    listed = {item["doctor_id"]: item for item in client.get("/api/v1/patient/doctors").json()}
+    assert pending.doctor_id not in listed
+    assert listed[doctor.doctor_id]["name"] == "Ana Reyes"
+    assert listed[doctor.doctor_id]["specializations"] == '["Cardiology"]'
+    assert listed[doctor.doctor_id]["city"] == "Tagum"
+
+    detail = client.get(f"/api/v1/patient/doctors/{doctor.doctor_id}").json()
+    assert detail["barangay"] == "Apokon"
+    assert detail["license_number"] == "PRC-1"
+
+
+def test_admin_listings(client, make_user, listed_doctor):
+    doctor, pending = listed_doctor
+    _, headers = make_user(UserRole.ADMIN)
+
+    pending_doctors = {item["doctor_id"]: item for item in
+                       client.get("/api/v1/admin/doctors/pending", headers=headers).json()}
+    assert doctor.doctor_id not in pending_doctors
+    assert pending_doctors[pending.doctor_id]["name"] == "Ben Cruz"
+    assert pending_doctors[pending.doctor_id]["created_at"] is not None
+
+    users = client.get("/api/v1/admin/users?role=doctor", headers=headers).json()
+    assert {"name": "Ana Reyes", "email": doctor.user.email}.items() <= next(
+        user for user in users if user["id"] == doctor.user_id).items()
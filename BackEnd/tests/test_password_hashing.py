@@ -0,0 +1,41 @@
+"""
+The bounded bcrypt pool (core/security.PasswordHashPool) and how the
+password endpoints surface its errors.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from core.security import PasswordHashPool
+from models.users import UserRole
+
+
+def test_in_flight_counts_running_and_queued_jobs():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.in_flight == 2
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(release.wait)
+        assert rejected.value.status_code == 503
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(scenario())
+    assert pool.in_flight == 0
+    assert pool.rejected == 1
+
+
+def test_complete_profile_rejects_a_short_password(client, make_user):
+    user, _ = make_user(UserRole.PATIENT, is_profile_complete=False)
+    response = client.post("/api/v1/auth/complete-profile", data={
+        "user_id": user.id, "role": "patient", "sex": "1", "dob": "1990-01-01",
+        "contact_number": "09170000000", "province": "Cebu", "city": "Cebu City",
+        "barangay": "Lahug", "password": "short",
+    })
+    assert response.status_code == 400
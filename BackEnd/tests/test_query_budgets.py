@@ -0,0 +1,96 @@
+"""
+Query budgets for the listing endpoints: the statement count must not grow
+with the number of rows returned (no N+1). Every test seeds several rows and
+allows one statement for the principal lookup plus the listing itself.
+"""
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from models.appointment import Appointment, AppointmentStatus
+from models.doctor import Doctor, DoctorAvailability
+from models.location import City, Province
+from models.users import UserRole
+
+ROWS = 5
+
+
+@pytest.fixture
+def patient_with_appointments(db, make_user):
+    """A patient with ROWS upcoming and ROWS past appointments, each with a different doctor"""
+    patient, headers = make_user(UserRole.PATIENT)
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    for n in range(ROWS):
+        doctor, _ = make_user(UserRole.DOCTOR)
+        db.add_all([
+            Appointment(patient_id=patient.id, doctor_id=doctor.id,
+                        appointment_date=now + timedelta(days=n + 1), status=AppointmentStatus.CONFIRMED),
+            Appointment(patient_id=patient.id, doctor_id=doctor.id,
+                        appointment_date=now - timedelta(days=n + 1), status=AppointmentStatus.COMPLETED),
+        ])
+    db.commit()
+    return headers
+
+
+@pytest.fixture
+def doctors(db, make_user):
+    """ROWS verified and ROWS unverified doctors, each in a city of its own"""
+    province = Province(name=f"Province {datetime.utcnow().timestamp()}")
+    db.add(province)
+    db.flush()
+    for n in range(2 * ROWS):
+        city = City(name=f"City {n}", province_id=province.id)
+        db.add(city)
+        db.flush()
+        user, _ = make_user(UserRole.DOCTOR)
+        db.add(Doctor(user_id=user.id, province_id=province.id, city_id=city.id, is_verified=n < ROWS))
+    db.commit()
+
+
+def test_upcoming_appointments(client, query_budget, patient_with_appointments):
+    with query_budget(2):
+        response = client.get("/api/v1/appointments/upcoming", headers=patient_with_appointments)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+
+
+def test_appointment_history(client, query_budget, patient_with_appointments):
+    with query_budget(2):
+        response = client.get("/api/v1/appointments/history", headers=patient_with_appointments)
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+
+
+def test_available_doctors(client, query_budget, doctors):
+    with query_budget(2):
+        response = client.get("/api/v1/patient/doctors")
+    assert response.status_code == 200
+    assert len(response.json()) >= ROWS
+
+
+def test_pending_doctors(client, query_budget, make_user, doctors):
+    _, headers = make_user(UserRole.ADMIN)
+    with query_budget(2):
+        response = client.get("/api/v1/admin/doctors/pending", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= ROWS
+
+
+def test_cached_available_slots(client, query_budget, db, make_user):
+    user, _ = make_user(UserRole.DOCTOR)
+    doctor = Doctor(user_id=user.id, is_verified=True)
+    db.add(doctor)
+    db.flush()
+    day = (datetime.utcnow() + timedelta(days=3)).date()
+    db.add(DoctorAvailability(doctor_id=doctor.doctor_id, date=datetime.combine(day, time()),
+                              start_time=time(9), end_time=time(12)))
+    db.commit()
+    url = f"/api/v1/schedules/doctor/{doctor.doctor_id}/available-slots?date={day.isoformat()}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert len(first.json()["available_slots"]) == 6
+    # A cache hit only reads the doctor's cache generation
+    with query_budget(1):
+        second = client.get(url)
+    assert second.json() == first.json()
@@ -0,0 +1,58 @@
+"""
+Index use of the hot listing queries on Postgres (skipped on SQLite): the
+statements behind upcoming, history, notifications, pending doctors and the
+rest of benchmarks/check_query_plans.py must not fall back to a sequential
+scan on a realistically shaped data set.
+"""
+import pytest
+from sqlalchemy import text
+
+from benchmarks.check_query_plans import cleanup, hot_queries, seed, sequential_scans
+from core.database import engine
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="query plans are checked on Postgres (set TEST_DATABASE_URL)"
+)
+
+QUERIES = [
+    "upcoming (doctor)",
+    "upcoming (patient)",
+    "history (doctor)",
+    "history page 2 (doctor)",
+    "history (patient)",
+    "notifications",
+    "notifications page 2",
+    "unread count",
+    "doctors pending approval",
+    "appointments (doctor)",
+    "appointments (patient)",
+    "booked slots (doctor, day)",
+    "stored slots (doctor, day)",
+    "admin users",
+    "admin users page 2",
+]
+
+
+@pytest.fixture(scope="module")
+def plans():
+    """EXPLAIN of every hot query, against the benchmark's seeded data"""
+    cleanup()
+    try:
+        statements = hot_queries(*seed(doctors=1000, patients=4000, appointments=10000))
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+            yield {
+                name: sequential_scans(
+                    conn, str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+                )
+                for name, statement in statements.items()
+            }
+    finally:
+        cleanup()
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_uses_an_index(plans, name):
+    scans, plan = plans[name]
+    assert not scans, f"{name}: full scan of {', '.join(scans)}\n{plan}"
+    assert "Index" in plan, f"{name}: no index in the plan\n{plan}"
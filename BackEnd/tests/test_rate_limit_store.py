@@ -0,0 +1,56 @@
+"""
+Parity of the rate limit stores: the shared Postgres store must admit and
+reject exactly what the in-memory token bucket does for the same hits,
+including leaving later buckets untouched once an earlier one rejects.
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from core.config import settings
+from core.database import engine
+from middleware.rate_limit_store import InMemoryRateLimitStore, PostgresRateLimitStore
+from middleware.rate_limiting import TokenBucketRateLimiter, endpoint_limiter
+
+# Windows are long enough that nothing refills mid-test
+_prefix = uuid.uuid4().hex
+FIRST_CLIENT = (f"{_prefix}|global|first", 2, 3600)
+SECOND_CLIENT = (f"{_prefix}|global|second", 10, 3600)
+ENDPOINT = (f"{_prefix}|endpoint", 3, 3600)
+
+# (hits of one request, expected results)
+REQUESTS = [
+    ([FIRST_CLIENT, ENDPOINT], [True, True]),
+    ([FIRST_CLIENT, ENDPOINT], [True, True]),
+    # The global bucket is empty, so the endpoint bucket is not charged...
+    ([FIRST_CLIENT, ENDPOINT], [False, False]),
+    ([FIRST_CLIENT, ENDPOINT], [False, False]),
+    # ...and still has one request left for another client
+    ([SECOND_CLIENT, ENDPOINT], [True, True]),
+    ([SECOND_CLIENT, ENDPOINT], [True, False]),
+]
+
+
+async def replay(store):
+    return [await store.check(hits) for hits, _ in REQUESTS]
+
+
+def test_memory_store():
+    results = asyncio.run(replay(InMemoryRateLimitStore(TokenBucketRateLimiter())))
+    assert results == [expected for _, expected in REQUESTS]
+
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="the shared store needs Postgres (set TEST_DATABASE_URL)")
+def test_postgres_store_matches_memory(client):
+    memory = asyncio.run(replay(InMemoryRateLimitStore(TokenBucketRateLimiter())))
+    # On the client's event loop, which the pooled autocommit connections belong to
+    assert client.portal.call(replay, PostgresRateLimitStore()) == memory
+
+
+def test_global_limit_follows_settings():
+    scope = {"route": SimpleNamespace(path="/api/v1/appointments/")}
+    global_hit, endpoint_hit = endpoint_limiter.hits(scope, "10.0.0.1")
+    assert global_hit[1:] == (settings.RATE_LIMIT_PER_HOUR, 3600)
+    assert endpoint_hit[0].startswith("endpoint|/api/v1/appointments/|")
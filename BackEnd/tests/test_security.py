@@ -0,0 +1,26 @@
+"""
+Screening of request paths and query strings (middleware/security.SecurityMiddleware).
+"""
+import pytest
+
+from middleware.security import SecurityMiddleware
+
+
+@pytest.mark.parametrize("query_string", [
+    b"onload=1",
+    b"script=main.js",
+    b"union=select",
+    b"q=doctor&javascript:=1",
+])
+def test_parameter_names_are_not_screened(query_string):
+    assert not SecurityMiddleware().is_suspicious("/api/v1/doctors/", query_string)
+
+
+@pytest.mark.parametrize("path,query_string", [
+    ("/api/v1/doctors/", b"q=%3Cscript%3Ealert(1)%3C/script%3E"),
+    ("/api/v1/doctors/", b"name=x&q=1+union+select+password"),
+    ("/api/v1/doctors/", b"img=%3Cimg+onload=alert(1)%3E"),
+    ("/api/v1/<iframe>/", b""),
+])
+def test_values_and_path_are_screened(path, query_string):
+    assert SecurityMiddleware().is_suspicious(path, query_string)
@@ -0,0 +1,59 @@
+"""
+Cross-worker invalidation of the slot cache (core/slot_cache.py): two
+InMemorySlotCache instances stand in for two workers sharing one database.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from core.slot_cache import InMemorySlotCache
+
+DAY = date(2030, 1, 7)
+SLOTS = [(datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 9, 30))]
+
+
+@pytest.fixture
+def doctor_id(db, make_user):
+    # Any id works: generations are keyed on it without a foreign key
+    user, _ = make_user()
+    return user.id
+
+
+async def cache_on_both(doctor_id):
+    workers = InMemorySlotCache(100, 60), InMemorySlotCache(100, 60)
+    for worker in workers:
+        _, generation = await worker.get(doctor_id, DAY)
+        await worker.set(doctor_id, DAY, generation, SLOTS)
+    return workers
+
+
+def test_invalidation_reaches_other_workers(client, doctor_id):
+    async def scenario():
+        first, second = await cache_on_both(doctor_id)
+        assert (await first.get(doctor_id, DAY))[0] == SLOTS
+        await second.invalidate(doctor_id, [DAY])
+        return (await first.get(doctor_id, DAY))[0], (await second.get(doctor_id, DAY))[0]
+
+    assert client.portal.call(scenario) == (None, None)
+
+
+def test_invalidate_doctor_reaches_other_workers(client, doctor_id):
+    async def scenario():
+        first, second = await cache_on_both(doctor_id)
+        await first.invalidate_doctor(doctor_id)
+        return (await second.get(doctor_id, DAY))[0]
+
+    assert client.portal.call(scenario) is None
+
+
+def test_entry_computed_before_a_write_is_never_served(client, doctor_id):
+    async def scenario():
+        reader, writer = InMemorySlotCache(100, 60), InMemorySlotCache(100, 60)
+        _, generation = await reader.get(doctor_id, DAY)
+        # The write commits while the reader is still computing the slots
+        await writer.invalidate(doctor_id, [DAY])
+        await reader.set(doctor_id, DAY, generation, SLOTS)
+        return (await reader.get(doctor_id, DAY))[0]
+
+    assert client.portal.call(scenario) is None
+
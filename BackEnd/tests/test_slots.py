@@ -0,0 +1,151 @@
+"""
+Randomized property tests for utils/slots.py, against the baseline
+30-minute walk (benchmarks/bench_slots.legacy_slots) where it was correct
+and a brute-force reference everywhere else. Seeds are fixed, so a failure
+reproduces; the message carries the case.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.bench_slots import legacy_slots, reference_slots
+from utils.slots import SlotPolicy, booking_days, busy_intervals, day_windows, free_slots, iter_free_slots
+
+DAY = datetime(2026, 10, 19)  # a Monday
+CASES = 500
+
+
+def at(minutes: int) -> datetime:
+    return DAY + timedelta(minutes=minutes)
+
+
+def random_windows(rng, first: int, last: int, count: int = 5):
+    """Up to count windows starting in [first, last], overlapping, empty or reversed ones included"""
+    windows = []
+    for _ in range(rng.randint(0, count)):
+        start = rng.randint(first, last)
+        windows.append((at(start), at(start + rng.randint(-15, 300))))
+    return windows
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_baseline_walk(seed):
+    """Disjoint windows a whole number of 30-minute slots long, bookings on the grid, no buffer"""
+    rng = random.Random(seed)
+    for _ in range(CASES):
+        windows, cursor = [], rng.randrange(0, 24 * 60, 30)
+        for _ in range(rng.randint(0, 4)):
+            start = cursor + 30 * rng.randrange(0, 4)
+            end = start + 30 * rng.randint(1, 12)
+            windows.append((at(start), at(end)))
+            cursor = end
+        rng.shuffle(windows)
+        bookings = [at(30 * rng.randrange(0, cursor // 30 + 2)) for _ in range(rng.randint(0, 10))]
+
+        expected = sorted(legacy_slots(windows, bookings))
+        assert free_slots(windows, bookings) == expected, (windows, bookings)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_buffers_and_overlaps(seed):
+    """Overlapping windows, off-grid and overlapping bookings, buffers and odd slot lengths"""
+    rng = random.Random(100 + seed)
+    for _ in range(CASES):
+        policy = SlotPolicy(slot_minutes=rng.choice([5, 7, 15, 25, 30, 45, 60]),
+                            buffer_minutes=rng.choice([0, 5, 10, 13, 30]))
+        windows = random_windows(rng, 0, 600)
+        bookings = [at(rng.randint(-90, 960)) for _ in range(rng.randint(0, 15))]
+        bookings += [rng.choice(bookings) for _ in range(rng.randint(0, 2)) if bookings]  # same slot twice
+
+        expected = reference_slots(windows, bookings, policy)
+        assert free_slots(windows, bookings, policy) == expected, (windows, bookings, policy)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_day_edges(seed):
+    """Windows touching midnight on either side, bookings (and buffers) on the neighbouring days"""
+    rng = random.Random(200 + seed)
+    for _ in range(CASES):
+        policy = SlotPolicy(slot_minutes=rng.choice([10, 15, 30, 60]), buffer_minutes=rng.choice([0, 10, 30]))
+        windows = rng.choice([
+            [(at(0), at(rng.randint(1, 8) * 60))],
+            [(at(rng.randint(16, 23) * 60), at(24 * 60))],
+            [(at(0), at(24 * 60))],
+            [(at(-120), at(120)), (at(22 * 60), at(26 * 60))],
+        ]) + random_windows(rng, -60, 24 * 60, count=2)
+        bookings = [at(rng.choice([-1, 0, 1]) * 24 * 60 + rng.randint(-60, 60)) for _ in range(rng.randint(0, 6))]
+
+        expected = reference_slots(windows, bookings, policy)
+        assert free_slots(windows, bookings, policy) == expected, (windows, bookings, policy)
+
+        # Every day a booking can block is reported, so cache invalidation reaches it
+        for booked in bookings:
+            (start, end), = busy_intervals([booked], policy)
+            days = {start.date() + timedelta(days=n) for n in range((end - start).days + 2)}
+            blocked = {blocked_day for blocked_day in days if datetime.combine(blocked_day, time()) < end}
+            assert blocked <= set(booking_days(booked, policy)), (booked, policy)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_iter_free_slots_is_a_lazy_free_slots(seed):
+    rng = random.Random(300 + seed)
+    for _ in range(CASES):
+        policy = SlotPolicy(slot_minutes=rng.choice([5, 15, 30]), buffer_minutes=rng.choice([0, 10]))
+        windows = random_windows(rng, 0, 600)
+        bookings = [at(rng.randint(0, 900)) for _ in range(rng.randint(0, 10))]
+
+        slots = free_slots(windows, bookings, policy)
+        assert list(iter_free_slots(windows, bookings, policy)) == slots
+        stop = rng.randint(0, 5)
+        assert list(islice(iter_free_slots(windows, bookings, policy), stop)) == slots[:stop]
+
+
+def availability(rng, day: date):
+    """A DoctorAvailability-like row: weekly rule, date-specific opening or closure, sometimes another day"""
+    start = rng.randint(0, 22 * 60)
+    end = min(start + rng.randint(15, 8 * 60), 24 * 60 - 1)
+    kind = rng.choice(["weekly", "weekly", "open", "closed", "other day"])
+    return SimpleNamespace(
+        date=None if kind == "weekly" else datetime.combine(day + timedelta(days=kind == "other day"), time()),
+        day_of_week=rng.choice([day.strftime("%A"), "tuesday"]) if kind == "weekly" else None,
+        start_time=time(start // 60, start % 60),
+        end_time=time(end // 60, end % 60),
+        is_available=kind != "closed",
+        is_active=rng.random() > 0.1,
+    )
+
+
+def open_minutes(rows, day: date):
+    """Brute force: each minute of the day is open by a date-specific row or, failing any, a weekly one"""
+    def covers(row, minute):
+        return row.start_time.hour * 60 + row.start_time.minute <= minute < row.end_time.hour * 60 + row.end_time.minute
+
+    weekday = day.strftime("%A").lower()
+    dated = [row for row in rows if row.date is not None and row.date.date() == day]
+    opened = [row for row in dated if row.is_available]
+    closed = [row for row in dated if not row.is_available]
+    weekly = [row for row in rows if row.date is None and row.day_of_week.lower() == weekday and row.is_active]
+    return {
+        minute for minute in range(24 * 60)
+        if any(covers(row, minute) for row in opened or weekly) and not any(covers(row, minute) for row in closed)
+    }
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_day_windows(seed):
+    rng = random.Random(400 + seed)
+    day = DAY.date()
+    for _ in range(CASES):
+        rows = [availability(rng, day) for _ in range(rng.randint(0, 6))]
+        windows = day_windows(rows, day)
+        minutes = {
+            minute
+            for start, end in windows
+            for minute in range((start - DAY) // timedelta(minutes=1), (end - DAY) // timedelta(minutes=1))
+        }
+        assert minutes == open_minutes(rows, day), rows
+        # Disjoint, sorted and never touching, or they would have been merged
+        assert all(earlier[1] < later[0] for earlier, later in zip(windows, windows[1:])), windows
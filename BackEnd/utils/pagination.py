@@ -0,0 +1,106 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination for listing endpoints.
+
+A listing sorts on a Keyset whose last column is the primary key, so the sort
+is total. Each page fetches one row more than it returns. When that extra
+row exists, the sort values of the page's last row are sent back as an
+opaque cursor in the X-Next-Cursor header. The next request resumes strictly
+after them with a row-value comparison the matching index can seek to, so
+the cost of a page does not grow with how deep it is.
+
+    @router.get("/", response_model=List[dict])
+    async def get_things(response: Response, page: PageRequest = Depends(page_request), ...):
+        query = THINGS_NEWEST_FIRST.paginate(select(Thing), page)
+        return THINGS_NEWEST_FIRST.page((await db.scalars(query)).all(), page, response)
+
+Callers that send neither limit nor cursor get the first PAGE_SIZE_DEFAULT
+rows.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import bindparam, tuple_
+
+from core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    limit: int
+    cursor: Optional[str] = None
+
+
+def page_request(
+    limit: Optional[int] = Query(None, ge=1, description="Rows per page (clamped to PAGE_SIZE_MAX)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+) -> PageRequest:
+    """Pagination query parameters shared by every paginated listing"""
+    if limit is None:
+        limit = settings.PAGE_SIZE_DEFAULT
+    return PageRequest(limit=min(limit, settings.PAGE_SIZE_MAX), cursor=cursor)
+
+
+def _dump(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _load(column, value: Any) -> Any:
+    if value is not None and column.type.python_type is datetime:
+        return datetime.fromisoformat(value)
+    return value
+
+
+class Keyset:
+    """Sort order of a listing: columns ending with the primary key, all in one direction"""
+
+    def __init__(self, name: str, *columns, descending: bool = False):
+        self.name = name
+        self.columns = columns
+        self.descending = descending
+
+    def encode(self, row) -> str:
+        """Cursor pointing just past row (an ORM object or a result row)"""
+        values = [_dump(getattr(row, column.key)) for column in self.columns]
+        payload = json.dumps([self.name, values], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            name, values = json.loads(payload)
+            if name != self.name or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            return [_load(column, value) for column, value in zip(self.columns, values)]
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+
+    def paginate(self, query, page: PageRequest):
+        """Order query by the keyset, resume after the cursor and fetch one row extra"""
+        if page.cursor:
+            values = self.decode(page.cursor)
+            key = tuple_(*self.columns)
+            after = tuple_(*(
+                bindparam(None, value, type_=column.type)
+                for column, value in zip(self.columns, values)
+            ))
+            query = query.where(key < after if self.descending else key > after)
+        order = [column.desc() if self.descending else column.asc() for column in self.columns]
+        return query.order_by(*order).limit(page.limit + 1)
+
+    def page(self, rows: Sequence, page: PageRequest, response: Response) -> list:
+        """Trim the extra row and, if there was one, send the next cursor"""
+        rows = list(rows)
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            response.headers[NEXT_CURSOR_HEADER] = self.encode(rows[-1])
+        return rows
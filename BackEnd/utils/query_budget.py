@@ -0,0 +1,45 @@
+# utils/query_budget.py
+"""
+Counting the SQL statements the app's engines execute inside a block,
+whatever thread or event loop runs them (TestClient serves requests on its
+own loop). The query_budget test fixture (tests/conftest.py) and the listing
+benchmark build on it.
+"""
+import threading
+from typing import Dict, List
+
+from sqlalchemy import event
+
+from core.database import async_engine, engine
+
+
+class QueryCounter:
+    """Statements executed on the app's engines while active, by statement text"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+        self._engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        for target in self._engines:
+            event.listen(target, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        for target in self._engines:
+            event.remove(target, "after_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def by_statement(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for statement in self.statements:
+            counts[statement] = counts.get(statement, 0) + 1
+        return counts
@@ -0,0 +1,157 @@
+# utils/slots.py
+"""
+Free appointment slots for one doctor over one day (or any span).
+
+Availability windows (DoctorAvailability rows, which may overlap) are sorted
+and merged. Each booking becomes a busy interval one slot long, padded by the
+doctor's buffer on both sides, and those are merged too. A single sweep then
+walks both sorted lists, so the cost is the two sorts, O(n log n), plus a
+linear pass, instead of checking every slot against every booking.
+
+Slots sit on a grid that starts at each merged window's start and must fit
+inside the window. When a candidate overlaps a busy interval the sweep jumps
+straight to the first grid point past it.
+
+day_windows() turns DoctorAvailability rows into one day's windows: weekly
+rules (day_of_week, no date) apply unless the day has date-specific open
+rows, which replace them, and date-specific rows with is_available false
+are cut out as exceptions.
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Hashable, Iterable, Iterator, List, Mapping, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+@dataclass(frozen=True)
+class SlotPolicy:
+    """A doctor's slot length and the gap kept around each booking"""
+    slot_minutes: int = 30
+    buffer_minutes: int = 0
+
+    @property
+    def length(self) -> timedelta:
+        return timedelta(minutes=self.slot_minutes)
+
+    @property
+    def buffer(self) -> timedelta:
+        return timedelta(minutes=self.buffer_minutes)
+
+
+DEFAULT_POLICY = SlotPolicy()
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and coalesce overlapping or touching intervals; empty ones are dropped"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(windows: Iterable[Interval], holes: Iterable[Interval]) -> List[Interval]:
+    """Parts of the windows not covered by any hole"""
+    holes = merge_intervals(holes)
+    remaining: List[Interval] = []
+    i = 0
+    for start, end in merge_intervals(windows):
+        while i < len(holes) and holes[i][1] <= start:
+            i += 1
+        j = i
+        while j < len(holes) and holes[j][0] < end:
+            if holes[j][0] > start:
+                remaining.append((start, holes[j][0]))
+            start = max(start, holes[j][1])
+            j += 1
+        if start < end:
+            remaining.append((start, end))
+    return remaining
+
+
+def day_windows(rows: Iterable, day: date) -> List[Interval]:
+    """
+    Availability windows on one day from DoctorAvailability-like rows (date,
+    day_of_week, start_time, end_time, is_available, is_active)
+    """
+    weekday = day.strftime("%A").lower()
+    weekly, opened, closed = [], [], []
+    for row in rows:
+        window = (datetime.combine(day, row.start_time), datetime.combine(day, row.end_time))
+        if row.date is not None:
+            if row.date.date() != day:
+                continue
+            (closed if row.is_available is False else opened).append(window)
+        elif (row.day_of_week or "").lower() == weekday and row.is_active is not False and row.is_available is not False:
+            weekly.append(window)
+    return subtract_intervals(opened or weekly, closed)
+
+
+def busy_intervals(bookings: Iterable[datetime], policy: SlotPolicy = DEFAULT_POLICY) -> List[Interval]:
+    """Booked start times as merged busy intervals, buffer included"""
+    length, buffer = policy.length, policy.buffer
+    return merge_intervals((start - buffer, start + length + buffer) for start in bookings)
+
+
+def booking_days(appointment_date: datetime, policy: SlotPolicy = DEFAULT_POLICY) -> List[date]:
+    """Days whose free slots a booking at appointment_date can block"""
+    first_day = (appointment_date - policy.buffer).date()
+    last_day = (appointment_date + policy.length + policy.buffer).date()
+    return [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+
+
+def free_slots(
+    windows: Iterable[Interval],
+    bookings: Iterable[datetime],
+    policy: SlotPolicy = DEFAULT_POLICY,
+) -> List[Interval]:
+    """(start, end) of every free slot, in time order"""
+    return list(iter_free_slots(windows, bookings, policy))
+
+
+def iter_free_slots(
+    windows: Iterable[Interval],
+    bookings: Iterable[datetime],
+    policy: SlotPolicy = DEFAULT_POLICY,
+) -> Iterator[Interval]:
+    """free_slots() lazily: the sweep stops where the consumer does"""
+    length = policy.length
+    busy = busy_intervals(bookings, policy)
+    i = 0
+    for window_start, window_end in merge_intervals(windows):
+        start = window_start
+        while start + length <= window_end:
+            end = start + length
+            # Windows are disjoint and sorted, so passed busy intervals never matter again
+            while i < len(busy) and busy[i][1] <= start:
+                i += 1
+            if i < len(busy) and busy[i][0] < end:
+                steps = -((window_start - busy[i][1]) // length)  # ceil
+                start = window_start + steps * length
+                continue
+            yield start, end
+            start = end
+
+
+def merge_earliest(slots_by_key: Mapping[Hashable, Iterable[Interval]]) -> Iterator[Tuple[Hashable, Interval]]:
+    """
+    (key, slot) across several time-ordered slot streams, earliest first.
+
+    A heap merge: each stream is only advanced when its head is taken, so
+    stopping after the first N results leaves the rest of every sweep undone.
+    """
+    def tagged(key, slots):
+        for start, end in slots:
+            yield start, end, key
+
+    # Ties on start go to the first stream given, never comparing keys
+    streams = [tagged(key, slots) for key, slots in slots_by_key.items()]
+    for start, end, key in heapq.merge(*streams, key=lambda slot: slot[0]):
+        yield key, (start, end)
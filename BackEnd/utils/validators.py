@@ -1,7 +1,8 @@
 # utils/validators.py
 import re
-from typing import Optional
+from typing import FrozenSet, Optional
 from fastapi import HTTPException, status
+from core.config import settings
 
 def validate_email(email: str) -> str:
     """Validate email format"""
@@ -130,27 +131,41 @@ def validate_appointment_date(appointment_date: str) -> str:
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format")
 
-def validate_file_upload(filename: str, file_size: int, allowed_extensions: list = None) -> bool:
-    """Validate file upload"""
+def validate_file_upload(filename: str, file_size: Optional[int], allowed_extensions: Optional[FrozenSet[str]] = None) -> bool:
+    """Validate file upload against ALLOWED_EXTENSIONS and MAX_UPLOAD_SIZE"""
     if not filename:
         raise HTTPException(status_code=400, detail="Filename is required")
     
     # Check file extension
-    if allowed_extensions:
-        file_ext = filename.split('.')[-1].lower()
-        if file_ext not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
-            )
-    
-    # Check file size (10MB max)
-    max_size = 10 * 1024 * 1024  # 10MB
-    if file_size > max_size:
-        raise HTTPException(status_code=400, detail="File size too large. Maximum size is 10MB")
+    allowed = allowed_extensions if allowed_extensions is not None else settings.allowed_extensions
+    file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ""
+    if file_ext not in allowed:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File type not allowed. Allowed types: {', '.join(sorted(allowed))}"
+        )
+    
+    # Check file size
+    if file_size is not None and file_size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File size too large. Maximum size is {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB"
+        )
     
     return True
 
+def is_allowed_host(host: Optional[str]) -> bool:
+    """Check a Host header (port optional) against ALLOWED_HOSTS"""
+    if "*" in settings.allowed_hosts:
+        return True
+    if not host:
+        return False
+    if host.startswith("["):
+        hostname = host[:host.find("]") + 1]  # IPv6 literal
+    else:
+        hostname = host.rsplit(":", 1)[0]
+    return hostname.lower() in settings.allowed_hosts
+
 def validate_json_input(data: dict, required_fields: list = None) -> dict:
     """Validate JSON input data"""
     if not isinstance(data, dict):